@@ -1,3 +1,5 @@
+import os
+
 SYSTEM_PROMPT = """Jsi Robí, přátelská a profesionální virtuální recepční na VŠCHT. Mluvíš česky přirozeně, stručně a s příjemným tónem. Působíš sebejistě a ochotně pomoci.
 
 Mluvíš jako člověk, ne jako robot. Používej krátké, přirozené věty. Měň formulace, aby to znělo lidsky. Vždy zníš klidně a jistě, i když si nejsi jistá.
@@ -49,3 +51,10 @@ WEB_SEARCH_ALLOWED_DOMAINS = ["vscht.cz", "www.vscht.cz"]
 
 GREETING_USER_INPUT = "Ahoj!"
 GREETING_INSTRUCTIONS = "Pozdrav uživatele česky jako recepční na VŠCHT a zeptej se, s čím můžeš pomoci."
+
+# Replay of the previous session into the realtime model context.
+HISTORY_TOKEN_BUDGET = 1200
+HISTORY_RECENT_TURNS = 6
+HISTORY_SUMMARIZER = os.getenv("HISTORY_SUMMARIZER", "openai")  # openai | stub
+HISTORY_SUMMARY_MODEL = "gpt-4o-mini"
+HISTORY_SUMMARY_MAX_TOKENS = 300
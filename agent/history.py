@@ -0,0 +1,165 @@
+"""Token-bounded replay of the previous session into the chat context.
+
+The most recent turns are kept verbatim; anything older is represented by a
+summary of just those older turns, generated once when the previous session
+ended (stored with the transcript). Token counts use a characters/4 estimate, which is close enough
+for budgeting and needs no tokenizer.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import Protocol
+
+from config import (
+    HISTORY_RECENT_TURNS,
+    HISTORY_SUMMARIZER,
+    HISTORY_SUMMARY_MAX_TOKENS,
+    HISTORY_SUMMARY_MODEL,
+    HISTORY_TOKEN_BUDGET,
+)
+
+
+SUMMARY_PREFIX = "Summary of the previous conversation with this user: "
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text or "") / 4)
+
+
+def _transcript_lines(items: list[dict]) -> str:
+    return "\n".join(f"{item['role']}: {item['content']}" for item in items)
+
+
+def _trim_to_tokens(text: str, tokens: int) -> str:
+    limit = max(0, tokens) * 4
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0]
+    return cut.rstrip(" ,;:") + " …"
+
+
+class Summarizer(Protocol):
+    def summarize(self, items: list[dict]) -> str:
+        ...
+
+
+class StubSummarizer:
+    """Offline summariser: the first sentence of every user turn."""
+
+    def __init__(self, max_tokens: int = HISTORY_SUMMARY_MAX_TOKENS) -> None:
+        self.max_tokens = max_tokens
+
+    def summarize(self, items: list[dict]) -> str:
+        topics = []
+        for item in items:
+            if item["role"] != "user":
+                continue
+            first = _SENTENCE_RE.split(item["content"].strip(), maxsplit=1)[0]
+            if first:
+                topics.append(first)
+        if not topics:
+            return ""
+        return _trim_to_tokens("The user asked: " + " | ".join(topics), self.max_tokens)
+
+
+class OpenAISummarizer:
+    def __init__(
+        self,
+        model: str = HISTORY_SUMMARY_MODEL,
+        max_tokens: int = HISTORY_SUMMARY_MAX_TOKENS,
+    ) -> None:
+        from openai import OpenAI
+
+        self.model = model
+        self.max_tokens = max_tokens
+        self._client = OpenAI()
+
+    def summarize(self, items: list[dict]) -> str:
+        response = self._client.chat.completions.create(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            messages=[
+                {
+                    "role": "system",
+                    "content": (
+                        "Summarise this voice conversation between a user and a university "
+                        "receptionist for use as memory in the next call. Keep the user's "
+                        "questions, answers they received, stated facts about the user and open "
+                        "follow-ups. Write in the conversation's language, as short prose."
+                    ),
+                },
+                {"role": "user", "content": _transcript_lines(items)},
+            ],
+        )
+        return (response.choices[0].message.content or "").strip()
+
+
+def make_summarizer(name: str = HISTORY_SUMMARIZER) -> Summarizer:
+    if name.strip().lower() == "stub":
+        return StubSummarizer()
+    return OpenAISummarizer()
+
+
+def needs_summary(items: list[dict], token_budget: int = HISTORY_TOKEN_BUDGET) -> bool:
+    return sum(estimate_tokens(item["content"]) for item in items) > token_budget
+
+
+def _conversation(items: list[dict]) -> list[dict]:
+    return [
+        item
+        for item in items
+        if item.get("role") in ("user", "assistant")
+        and isinstance(item.get("content"), str)
+        and item["content"].strip()
+    ]
+
+
+def split_history(
+    items: list[dict],
+    token_budget: int = HISTORY_TOKEN_BUDGET,
+    recent_turns: int = HISTORY_RECENT_TURNS,
+) -> tuple[list[dict], list[dict]]:
+    """``(older, recent)``: the turns a replay drops and the ones it keeps verbatim.
+
+    Recent turns are taken newest-first while they fit the budget, leaving
+    room for the summary. Everything fits when the session is under budget.
+    """
+    items = _conversation(items)
+    if not needs_summary(items, token_budget):
+        return [], items
+    kept: list[dict] = []
+    used = 0
+    # Reserve room for the summary so recent turns cannot starve it.
+    verbatim_budget = max(0, token_budget - HISTORY_SUMMARY_MAX_TOKENS)
+    for item in reversed(items):
+        cost = estimate_tokens(item["content"])
+        if len(kept) >= recent_turns or used + cost > verbatim_budget:
+            break
+        kept.append(item)
+        used += cost
+    kept.reverse()
+    return items[: len(items) - len(kept)], kept
+
+
+def compact_history(
+    items: list[dict],
+    summary: str | None,
+    token_budget: int = HISTORY_TOKEN_BUDGET,
+    recent_turns: int = HISTORY_RECENT_TURNS,
+) -> tuple[str | None, list[dict]]:
+    """Split ``items`` into an optional summary line and verbatim recent turns.
+
+    If older turns are dropped, the stored ``summary`` (which covers exactly
+    those turns, see ``split_history``), or a stub summary when none was
+    saved, is trimmed to whatever budget is left.
+    """
+    older, kept = split_history(items, token_budget, recent_turns)
+    if not older:
+        return None, kept
+    used = sum(estimate_tokens(item["content"]) for item in kept)
+    text = summary or StubSummarizer().summarize(older)
+    text = _trim_to_tokens(text, token_budget - used - estimate_tokens(SUMMARY_PREFIX))
+    return (SUMMARY_PREFIX + text if text else None), kept
@@ -0,0 +1,210 @@
+"""Speculative knowledge-base searches driven by interim user transcripts.
+
+The realtime model only calls ``query_search`` after the user has finished
+speaking. While they are still talking, ``SearchPrefetcher`` debounces the
+interim transcript and starts the same search in the background; when the
+tool call arrives, ``take`` hands back a speculative result whose transcript
+covers enough of the tool query instead of searching again.
+
+Matching is lexical: the share of query tokens (cut to a short prefix, which
+is a crude but effective stemmer for Czech inflection) found in the
+transcript. Completed searches that no tool call used are counted as wasted.
+
+Prefetches share the Weaviate connection pool with real searches, so at most
+``PREFETCH_MAX_CONCURRENT`` run at a time, and ``take`` cancels the ones
+still in flight before the tool call searches for itself.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import time
+import unicodedata
+from typing import Awaitable, Callable
+
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "1").strip().lower() not in {"0", "false", "no"}
+PREFETCH_DEBOUNCE_S = float(os.getenv("PREFETCH_DEBOUNCE_S", "0.35"))
+PREFETCH_MIN_WORDS = int(os.getenv("PREFETCH_MIN_WORDS", "3"))
+PREFETCH_LIMIT = int(os.getenv("PREFETCH_LIMIT", "5"))
+PREFETCH_MAX_ENTRIES = int(os.getenv("PREFETCH_MAX_ENTRIES", "4"))
+PREFETCH_TTL_S = float(os.getenv("PREFETCH_TTL_S", "20"))
+PREFETCH_MATCH_THRESHOLD = float(os.getenv("PREFETCH_MATCH_THRESHOLD", "0.6"))
+PREFETCH_MAX_CONCURRENT = int(os.getenv("PREFETCH_MAX_CONCURRENT", "1"))
+PREFETCH_STEM_CHARS = 5
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _words(text: str) -> list[str]:
+    return _WORD_RE.findall(unicodedata.normalize("NFKC", text or "").casefold())
+
+
+def _tokens(text: str) -> set[str]:
+    return {word[:PREFETCH_STEM_CHARS] for word in _words(text) if len(word) > 1}
+
+
+def query_coverage(query: str, transcript: str) -> float:
+    query_tokens = _tokens(query)
+    if not query_tokens:
+        return 0.0
+    return len(query_tokens & _tokens(transcript)) / len(query_tokens)
+
+
+class SearchPrefetcher:
+    def __init__(
+        self,
+        search: Callable[[str, int], Awaitable[dict]],
+        debounce_s: float = PREFETCH_DEBOUNCE_S,
+        min_words: int = PREFETCH_MIN_WORDS,
+        limit: int = PREFETCH_LIMIT,
+        max_entries: int = PREFETCH_MAX_ENTRIES,
+        ttl_s: float = PREFETCH_TTL_S,
+        threshold: float = PREFETCH_MATCH_THRESHOLD,
+        max_concurrent: int = PREFETCH_MAX_CONCURRENT,
+    ) -> None:
+        self._search = search
+        self._debounce_s = debounce_s
+        self._min_words = min_words
+        self._limit = limit
+        self._max_entries = max(1, max_entries)
+        self._ttl_s = ttl_s
+        self._threshold = threshold
+        self._slots = asyncio.Semaphore(max(1, max_concurrent))
+        self._entries: list[dict] = []
+        self._pending: asyncio.TimerHandle | None = None
+        self._last_key = ""
+        self.stats = {
+            "launched": 0,
+            "hits": 0,
+            "misses": 0,
+            "wasted": 0,
+            "cancelled": 0,
+            "latency_saved_s": 0.0,
+        }
+
+    def on_transcript(self, text: str, is_final: bool) -> None:
+        text = " ".join((text or "").split())
+        words = _words(text)
+        # Interim and final transcripts often differ only in casing and punctuation.
+        if len(words) < self._min_words or " ".join(words) == self._last_key:
+            return
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+        if is_final:
+            self._launch(text)
+            return
+        loop = asyncio.get_running_loop()
+        self._pending = loop.call_later(self._debounce_s, self._launch, text)
+
+    def _launch(self, text: str) -> None:
+        self._pending = None
+        key = " ".join(_words(text))
+        if key == self._last_key:
+            return
+        self._last_key = key
+        self._expire()
+        while len(self._entries) >= self._max_entries:
+            self._retire(self._entries.pop(0))
+        entry = {"text": text, "task": None, "started": time.monotonic(), "finished": None}
+        entry["task"] = asyncio.ensure_future(self._run(text))
+        entry["task"].add_done_callback(lambda task: self._finished(entry, task))
+        self._entries.append(entry)
+        self.stats["launched"] += 1
+
+    async def _run(self, text: str) -> dict:
+        async with self._slots:
+            return await self._search(text, self._limit)
+
+    @staticmethod
+    def _finished(entry: dict, task: asyncio.Future) -> None:
+        entry["finished"] = time.monotonic()
+        if not task.cancelled() and task.exception() is not None:
+            print(f"[prefetch] search failed for {entry['text']!r}: {task.exception()!r}")
+
+    def _retire(self, entry: dict) -> None:
+        task = entry["task"]
+        if task.done():
+            self.stats["wasted"] += 1
+        else:
+            task.cancel()
+            self.stats["cancelled"] += 1
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        fresh = []
+        for entry in self._entries:
+            if now - entry["started"] > self._ttl_s:
+                self._retire(entry)
+            else:
+                fresh.append(entry)
+        self._entries = fresh
+
+    async def take(self, query: str, limit: int, min_limit: int | None = None) -> dict | None:
+        """Return a speculative search covering ``query``, or ``None`` on a miss.
+
+        Prefetches fetch ``self._limit`` hits, so any ``limit`` up to that is
+        served and trimmed. A caller that over-fetches (for reranking) can pass
+        the count it really needs as ``min_limit`` to accept fewer hits than
+        ``limit`` instead of missing.
+        """
+        self._expire()
+        best, best_score = None, self._threshold
+        needed = limit if min_limit is None else min(limit, min_limit)
+        if needed <= self._limit:
+            # Newest first: later transcripts are longer and closer to the final wording.
+            for entry in reversed(self._entries):
+                score = query_coverage(query, entry["text"])
+                if score >= best_score:
+                    best, best_score = entry, score
+        if best is not None:
+            self._entries.remove(best)
+        self._cancel_in_flight()
+        if best is None:
+            self.stats["misses"] += 1
+            return None
+        taken_at = time.monotonic()
+        try:
+            search = await asyncio.shield(best["task"])
+        except Exception:
+            self.stats["misses"] += 1
+            return None
+        if search.get("partial"):
+            self.stats["misses"] += 1
+            return None
+        finished = best["finished"] or time.monotonic()
+        self.stats["hits"] += 1
+        self.stats["latency_saved_s"] += max(0.0, min(finished, taken_at) - best["started"])
+        return {**search, "results": search["results"][:limit], "prefetched_from": best["text"]}
+
+    def _cancel_in_flight(self) -> None:
+        # The tool call is about to search; unfinished prefetches would only compete for the pool.
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+        running = [entry for entry in self._entries if not entry["task"].done()]
+        for entry in running:
+            self._retire(entry)
+        self._entries = [entry for entry in self._entries if entry["task"].done()]
+
+    def close(self) -> dict:
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+        for entry in self._entries:
+            self._retire(entry)
+        self._entries = []
+        return self.summary()
+
+    def summary(self) -> dict:
+        stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["waste_rate"] = (
+            (stats["wasted"] + stats["cancelled"]) / stats["launched"] if stats["launched"] else 0.0
+        )
+        stats["latency_saved_s"] = round(stats["latency_saved_s"], 3)
+        return stats
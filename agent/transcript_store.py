@@ -0,0 +1,343 @@
+"""Append-only transcript storage in SQLite (WAL mode).
+
+Each conversation item is one ``INSERT`` and a user's previous session is one
+indexed lookup, so neither cost grows with total history. WAL lets several
+agent worker processes share the database. The legacy
+``local/session_transcripts.json`` is imported once, on first open, and then
+renamed to ``*.migrated``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+TRANSCRIPT_DB_PATH = Path(
+    os.getenv("TRANSCRIPT_DB_PATH", str(BASE_DIR / "local" / "transcripts.sqlite3"))
+)
+LEGACY_TRANSCRIPT_STORE = BASE_DIR / "local" / "session_transcripts.json"
+TRANSCRIPT_FLUSH_INTERVAL_S = float(os.getenv("TRANSCRIPT_FLUSH_INTERVAL_S", "1.0"))
+TRANSCRIPT_FLUSH_MAX_ITEMS = int(os.getenv("TRANSCRIPT_FLUSH_MAX_ITEMS", "32"))
+# After a failed flush, retry after flush_interval_s doubling per failure, capped.
+TRANSCRIPT_RETRY_MAX_S = float(os.getenv("TRANSCRIPT_RETRY_MAX_S", "30"))
+# Items kept queued while the database is unavailable; the oldest are dropped beyond this.
+TRANSCRIPT_MAX_PENDING = int(os.getenv("TRANSCRIPT_MAX_PENDING", "2000"))
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS sessions ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+    " user TEXT NOT NULL,"
+    " room TEXT NOT NULL DEFAULT '',"
+    " started_at REAL NOT NULL,"
+    " ended_at REAL)",
+    "CREATE INDEX IF NOT EXISTS sessions_user ON sessions (user, id)",
+    "CREATE TABLE IF NOT EXISTS items ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+    " session_id INTEGER NOT NULL REFERENCES sessions (id),"
+    " role TEXT NOT NULL,"
+    " content TEXT NOT NULL,"
+    " created_at REAL)",
+    "CREATE INDEX IF NOT EXISTS items_session ON items (session_id, id)",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS session_summaries ("
+    " session_id INTEGER PRIMARY KEY REFERENCES sessions (id),"
+    " summary TEXT NOT NULL,"
+    " created_at REAL NOT NULL)",
+)
+
+
+class TranscriptStore:
+    def __init__(
+        self,
+        path: Path = TRANSCRIPT_DB_PATH,
+        legacy_path: Path | None = LEGACY_TRANSCRIPT_STORE,
+    ) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+        if legacy_path is not None:
+            self.migrate_legacy(legacy_path)
+
+    def start_session(self, user: str, room: str = "", started_at: float | None = None) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO sessions (user, room, started_at) VALUES (?, ?, ?)",
+                (user, room, started_at if started_at is not None else time.time()),
+            )
+        return int(cursor.lastrowid)
+
+    def end_session(self, session_id: int, ended_at: float | None = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE sessions SET ended_at = ? WHERE id = ?",
+                (ended_at if ended_at is not None else time.time(), session_id),
+            )
+
+    def append_items(self, session_id: int, items: list[dict]) -> None:
+        if not items:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO items (session_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                [
+                    (session_id, item["role"], item["content"], item.get("created_at"))
+                    for item in items
+                ],
+            )
+
+    def append_item(self, session_id: int, role: str, content: str, created_at: float | None = None) -> None:
+        self.append_items(session_id, [{"role": role, "content": content, "created_at": created_at}])
+
+    def set_summary(self, session_id: int, summary: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO session_summaries (session_id, summary, created_at) VALUES (?, ?, ?)",
+                (session_id, summary, time.time()),
+            )
+
+    def _session_items(self, session_id: int) -> list[dict]:
+        rows = self._conn.execute(
+            "SELECT role, content, created_at FROM items WHERE session_id = ? ORDER BY id",
+            (session_id,),
+        ).fetchall()
+        return [
+            {"role": role, "content": content, "created_at": created_at}
+            for role, content, created_at in rows
+        ]
+
+    def session_items(self, session_id: int) -> list[dict]:
+        with self._lock:
+            return self._session_items(session_id)
+
+    def last_session(self, user: str, before_id: int | None = None) -> dict | None:
+        """The user's most recent session (optionally older than ``before_id``) with its items."""
+        query = (
+            "SELECT s.id, s.room, s.started_at, s.ended_at, m.summary FROM sessions s"
+            " LEFT JOIN session_summaries m ON m.session_id = s.id WHERE s.user = ?"
+        )
+        params: list = [user]
+        if before_id is not None:
+            query += " AND s.id < ?"
+            params.append(before_id)
+        query += " ORDER BY s.id DESC LIMIT 1"
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+            if row is None:
+                return None
+            items = self._session_items(row[0])
+        return {
+            "id": row[0],
+            "room": row[1],
+            "started_at": row[2],
+            "ended_at": row[3],
+            "summary": row[4],
+            "items": items,
+        }
+
+    def migrate_legacy(self, legacy_path: Path) -> int:
+        """Import the old JSON store once; returns the number of sessions imported."""
+        if not legacy_path.exists():
+            return 0
+        try:
+            with legacy_path.open("r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (json.JSONDecodeError, OSError) as exc:
+            print(f"[transcripts] legacy store unreadable, skipping migration: {exc!r}")
+            return 0
+        users = data.get("users", {}) if isinstance(data, dict) else {}
+        imported = 0
+        with self._lock:
+            # BEGIN IMMEDIATE serialises concurrent workers racing to migrate.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                done = self._conn.execute(
+                    "SELECT 1 FROM meta WHERE key = 'legacy_migrated'"
+                ).fetchone()
+                if done is None:
+                    for user, record in users.items():
+                        for session in (record or {}).get("sessions", []):
+                            cursor = self._conn.execute(
+                                "INSERT INTO sessions (user, room, started_at, ended_at) VALUES (?, ?, ?, ?)",
+                                (
+                                    user,
+                                    session.get("room") or "",
+                                    session.get("started_at") or 0.0,
+                                    session.get("ended_at"),
+                                ),
+                            )
+                            self._conn.executemany(
+                                "INSERT INTO items (session_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                                [
+                                    (cursor.lastrowid, item.get("role"), item.get("content"), item.get("created_at"))
+                                    for item in session.get("items", [])
+                                    if isinstance(item.get("content"), str) and item.get("role")
+                                ],
+                            )
+                            imported += 1
+                    self._conn.execute(
+                        "INSERT INTO meta (key, value) VALUES ('legacy_migrated', ?)",
+                        (str(time.time()),),
+                    )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        if legacy_path.exists():
+            legacy_path.replace(legacy_path.with_suffix(legacy_path.suffix + ".migrated"))
+        if imported:
+            print(f"[transcripts] migrated {imported} sessions from {legacy_path}")
+        return imported
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TranscriptWriter:
+    """Write-behind persistence for one session.
+
+    ``append`` only queues the item, so it is safe to call from LiveKit event
+    callbacks. A background thread flushes once ``flush_max_items`` are queued
+    or ``flush_interval_s`` after the oldest queued item. A failed flush keeps
+    its items and backs off exponentially up to ``retry_max_s``; at most
+    ``max_pending`` items are retained meanwhile. ``close`` triggers a final
+    flush plus ``end_session``; ``wait`` blocks until that is done.
+    """
+
+    def __init__(
+        self,
+        store: TranscriptStore,
+        session_id: int,
+        flush_interval_s: float = TRANSCRIPT_FLUSH_INTERVAL_S,
+        flush_max_items: int = TRANSCRIPT_FLUSH_MAX_ITEMS,
+        retry_max_s: float = TRANSCRIPT_RETRY_MAX_S,
+        max_pending: int = TRANSCRIPT_MAX_PENDING,
+    ) -> None:
+        self._store = store
+        self._session_id = session_id
+        self._flush_interval_s = flush_interval_s
+        self._flush_max_items = max(1, flush_max_items)
+        self._retry_max_s = retry_max_s
+        self._max_pending = max(self._flush_max_items, max_pending)
+        self._pending: list[dict] = []
+        self._oldest_at: float | None = None
+        self._failures = 0
+        self._retry_at: float | None = None
+        self._closing = False
+        self._ended_at: float | None = None
+        self._cond = threading.Condition()
+        self.stats = {"flushes": 0, "written": 0, "errors": 0, "dropped": 0, "max_depth": 0, "last_flush_ms": 0.0}
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"transcript-writer-{session_id}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def append(self, role: str, content: str, created_at: float | None = None) -> None:
+        with self._cond:
+            if self._closing:
+                print(f"[transcripts] dropped item after close for session {self._session_id}")
+                return
+            self._pending.append({"role": role, "content": content, "created_at": created_at})
+            if self._oldest_at is None:
+                self._oldest_at = time.monotonic()
+            self._drop_overflow()
+            self.stats["max_depth"] = max(self.stats["max_depth"], len(self._pending))
+            self._cond.notify()
+
+    def depth(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def metrics(self) -> dict:
+        return {**self.stats, "queue_depth": self.depth()}
+
+    def close(self, ended_at: float | None = None) -> None:
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._ended_at = ended_at if ended_at is not None else time.time()
+            self._cond.notify()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def _drop_overflow(self) -> None:
+        overflow = len(self._pending) - self._max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.stats["dropped"] += overflow
+            print(f"[transcripts] dropped {overflow} oldest items for session {self._session_id}")
+
+    def _next_batch(self) -> tuple[list[dict], bool]:
+        with self._cond:
+            while not self._closing:
+                if self._retry_at is not None:
+                    backoff = self._retry_at - time.monotonic()
+                    if backoff > 0:
+                        self._cond.wait(backoff)
+                        continue
+                if len(self._pending) >= self._flush_max_items:
+                    break
+                if self._oldest_at is None:
+                    self._cond.wait()
+                    continue
+                remaining = self._oldest_at + self._flush_interval_s - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch, self._pending = self._pending, []
+            self._oldest_at = None
+            return batch, self._closing
+
+    def _flush(self, batch: list[dict], final: bool) -> None:
+        if not batch:
+            return
+        started = time.perf_counter()
+        try:
+            self._store.append_items(self._session_id, batch)
+        except Exception as exc:
+            self.stats["errors"] += 1
+            print(f"[transcripts] flush of {len(batch)} items failed: {exc!r}")
+            if final:
+                return
+            with self._cond:
+                # Keep order and retry once the back-off has passed.
+                self._failures += 1
+                delay = min(self._retry_max_s, self._flush_interval_s * 2 ** (self._failures - 1))
+                self._retry_at = time.monotonic() + delay
+                self._pending[:0] = batch
+                self._oldest_at = time.monotonic()
+                self._drop_overflow()
+            return
+        with self._cond:
+            self._failures = 0
+            self._retry_at = None
+        self.stats["flushes"] += 1
+        self.stats["written"] += len(batch)
+        self.stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    def _run(self) -> None:
+        while True:
+            batch, closing = self._next_batch()
+            self._flush(batch, final=closing)
+            if closing:
+                break
+        try:
+            self._store.end_session(self._session_id, self._ended_at)
+        except Exception as exc:
+            print(f"[transcripts] end_session failed: {exc!r}")
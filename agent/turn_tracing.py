@@ -0,0 +1,75 @@
+"""Per-turn latency spans for the voice agent.
+
+A turn starts when the user stops speaking and ends at the first agent audio.
+The root ``turn`` span covers the whole gap; ``turn.to_tool`` and
+``turn.tool_to_audio`` split it around the ``query_search`` tool call, whose
+own span (and the nested Weaviate spans) share the turn's trace id.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import telemetry
+
+
+class TurnTracer:
+    def __init__(self, **attributes) -> None:
+        self._attributes = attributes
+        self._turn: dict | None = None
+        self.turns = 0
+
+    def on_user_state(self, old_state: str, new_state: str, at: float | None = None) -> None:
+        if old_state == "speaking" and new_state != "speaking":
+            self._turn = {
+                "trace_id": telemetry.new_id(16),
+                "span_id": telemetry.new_id(),
+                "speech_end": at or time.time(),
+                "tool_start": None,
+                "tool_end": None,
+                "tools": 0,
+            }
+
+    @contextmanager
+    def tool_span(self, name: str, **attributes) -> Iterator[dict]:
+        turn = self._turn
+        if turn is None:
+            with telemetry.span(name, **self._attributes, **attributes) as span_attributes:
+                yield span_attributes
+            return
+        turn["tools"] += 1
+        turn["tool_start"] = turn["tool_start"] or time.time()
+        try:
+            with telemetry.span(
+                name,
+                trace_id=turn["trace_id"],
+                parent_id=turn["span_id"],
+                **self._attributes,
+                **attributes,
+            ) as span_attributes:
+                yield span_attributes
+        finally:
+            turn["tool_end"] = time.time()
+
+    def on_agent_state(self, new_state: str, at: float | None = None) -> None:
+        turn = self._turn
+        if turn is None or new_state != "speaking":
+            return
+        self._turn = None
+        self.turns += 1
+        first_audio = at or time.time()
+        ids = {"trace_id": turn["trace_id"], "parent_id": turn["span_id"]}
+        if turn["tool_start"] is not None:
+            telemetry.record_span("turn.to_tool", turn["speech_end"], turn["tool_start"], **ids)
+            telemetry.record_span("turn.tool_to_audio", turn["tool_end"] or first_audio, first_audio, **ids)
+        telemetry.record_span(
+            "turn",
+            turn["speech_end"],
+            first_audio,
+            trace_id=turn["trace_id"],
+            span_id=turn["span_id"],
+            tools=turn["tools"],
+            **self._attributes,
+        )
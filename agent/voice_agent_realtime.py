@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 import time
@@ -10,9 +11,11 @@ from livekit.agents import (
     AgentSession,
     AutoSubscribe,
     JobContext,
+    JobProcess,
     WorkerOptions,
     cli,
     function_tool,
+    inference,
     llm,
     RunContext,
 )
@@ -20,12 +23,18 @@ from livekit.plugins import openai
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-TRANSCRIPT_STORE = BASE_DIR / "local" / "session_transcripts.json"
 SRC_DIR = BASE_DIR / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.append(str(SRC_DIR))
 
 import weaviate_utils  
+import rerank  
+import snippets  
+from prefetch import PREFETCH_ENABLED, PREFETCH_LIMIT, SearchPrefetcher  
+from transcript_store import TranscriptStore, TranscriptWriter  
+from history import compact_history, make_summarizer, split_history  
+from turn_tracing import TurnTracer  
+import telemetry  
 from config import (  
     GREETING_INSTRUCTIONS,
     GREETING_USER_INPUT,
@@ -36,28 +45,62 @@ from config import (
 load_dotenv(BASE_DIR / ".env")
 
 FALLBACK_TTS = False
+LOCAL_VAD = os.getenv("AGENT_LOCAL_VAD", "1").strip().lower() not in {"0", "false", "no"}
+# livekit fails a process whose prewarm exceeds initialize_process_timeout (10 s),
+# so prewarm only probes Weaviate briefly; the entrypoint waits longer if it must.
+PREWARM_WEAVIATE_PROBE_S = float(os.getenv("PREWARM_WEAVIATE_PROBE_S", "2"))
 
 
-def _load_store() -> dict:
-    if not TRANSCRIPT_STORE.exists():
-        return {"users": {}}
-    try:
-        with TRANSCRIPT_STORE.open("r", encoding="utf-8") as handle:
-            data = json.load(handle)
-    except (json.JSONDecodeError, OSError):
-        return {"users": {}}
-    if not isinstance(data, dict):
-        return {"users": {}}
-    data.setdefault("users", {})
-    return data
+_transcript_store: TranscriptStore | None = None
 
 
-def _save_store(data: dict) -> None:
-    TRANSCRIPT_STORE.parent.mkdir(parents=True, exist_ok=True)
-    tmp_path = TRANSCRIPT_STORE.with_suffix(".json.tmp")
-    with tmp_path.open("w", encoding="utf-8") as handle:
-        json.dump(data, handle, indent=2, ensure_ascii=True)
-    tmp_path.replace(TRANSCRIPT_STORE)
+def _get_transcript_store() -> TranscriptStore:
+    global _transcript_store
+    if _transcript_store is None:
+        _transcript_store = TranscriptStore()
+    return _transcript_store
+
+
+def prewarm(proc: JobProcess) -> None:
+    """Per-process setup that would otherwise run before every greeting.
+
+    Idle job processes run this once: a shared VAD instance (the native Silero
+    weights are already resident from the worker's forkserver), the Weaviate
+    connection pool with a verified seed collection, the transcript store and,
+    in client vectorizer mode, the embedder and its cache. The async pool is
+    bound to the job's event loop, so it still connects lazily on the first
+    search.
+    """
+    started = time.perf_counter()
+    timings = {}
+    if LOCAL_VAD:
+        proc.userdata["vad"] = inference.VAD(model="silero")
+        timings["vad_ms"] = round((time.perf_counter() - started) * 1000)
+
+    step = time.perf_counter()
+    weaviate_ready = not weaviate_utils.uses_local_backend() and weaviate_utils.wait_for_weaviate(
+        max_wait_s=PREWARM_WEAVIATE_PROBE_S, interval_s=0.5, debug=True
+    )
+    if weaviate_ready:
+        try:
+            with weaviate_utils.pooled_client() as client:
+                weaviate_utils.ensure_collection(client, weaviate_utils.seed_collection_name())
+        except Exception as exc:
+            print(f"[prewarm] seed collection check failed: {exc!r}")
+            weaviate_ready = False
+    proc.userdata["weaviate_ready"] = weaviate_ready
+    timings["weaviate_ms"] = round((time.perf_counter() - step) * 1000)
+
+    step = time.perf_counter()
+    _get_transcript_store()
+    if weaviate_utils.uses_client_vectors():
+        weaviate_utils.embeddings.get_embedder()
+    if rerank.RERANK_ENABLED:
+        rerank.get_scorer()
+    timings["stores_ms"] = round((time.perf_counter() - step) * 1000)
+    timings["total_ms"] = round((time.perf_counter() - started) * 1000)
+    proc.userdata["prewarm_ms"] = timings["total_ms"]
+    print(f"[prewarm] pid={os.getpid()} weaviate_ready={weaviate_ready} {timings}")
 
 
 async def entrypoint(ctx: JobContext):
@@ -65,33 +108,63 @@ async def entrypoint(ctx: JobContext):
 
     # Wait until a participant joins before speaking.
     participant = await ctx.wait_for_participant()
+    joined_at = time.perf_counter()
     user_name = (participant.name or "").strip() or "Guest"
     collection_name = weaviate_utils.normalize_collection_name(user_name)
     seed_collection = weaviate_utils.seed_collection_name()
 
-    weaviate_ready = weaviate_utils.wait_for_weaviate(debug=True)
-    if not weaviate_ready:
-        print("[weaviate] not ready within timeout")
-    with weaviate_utils.connect_client() as client:
-        weaviate_utils.ensure_collection(client, collection_name)
-    print(f"[weaviate] using collection: {collection_name} for user: {user_name}")
+    if weaviate_utils.uses_local_backend():
+        print(f"[weaviate] local backend; searching {seed_collection} from the on-disk index")
+    else:
+        weaviate_ready = ctx.proc.userdata.get("weaviate_ready")
+        if not weaviate_ready and weaviate_utils.has_local_fallback(seed_collection):
+            # The seed collection is served from the local index meanwhile; don't hold up the greeting.
+            print("[weaviate] not ready at prewarm; searches fall back to the local index")
+        elif not weaviate_ready:
+            weaviate_ready = await asyncio.to_thread(weaviate_utils.wait_for_weaviate, debug=True)
+            if not weaviate_ready:
+                print("[weaviate] not ready within timeout; searches fall back to the local index")
+            ctx.proc.userdata["weaviate_ready"] = weaviate_ready
+
+        def ensure_user_collection() -> None:
+            with weaviate_utils.pooled_client() as client:
+                weaviate_utils.ensure_collection(client, collection_name)
 
-    store = _load_store()
-    user_record = store.setdefault("users", {}).setdefault(user_name, {"sessions": []})
-    previous_session = user_record["sessions"][-1] if user_record["sessions"] else None
-    previous_items = previous_session.get("items", []) if previous_session else []
+        try:
+            await asyncio.to_thread(ensure_user_collection)
+            print(f"[weaviate] using collection: {collection_name} for user: {user_name}")
+        except Exception as exc:
+            print(f"[weaviate] could not prepare {collection_name}: {exc!r}")
+
+    store = await asyncio.to_thread(_get_transcript_store)
+    previous_session = await asyncio.to_thread(store.last_session, user_name)
+    summary, previous_items = compact_history(
+        previous_session["items"] if previous_session else [],
+        previous_session["summary"] if previous_session else None,
+    )
 
     chat_ctx = llm.ChatContext.empty()
     chat_ctx.add_message(role="system", content=f"The user's name is {user_name}.")
+    if summary:
+        chat_ctx.add_message(role="system", content=summary)
     for item in previous_items:
-        role = item.get("role")
-        content = item.get("content")
         created_at = item.get("created_at")
-        if role in ("user", "assistant") and isinstance(content, str) and content.strip():
-            if isinstance(created_at, (int, float)):
-                chat_ctx.add_message(role=role, content=content, created_at=created_at)
-            else:
-                chat_ctx.add_message(role=role, content=content)
+        if isinstance(created_at, (int, float)):
+            chat_ctx.add_message(role=item["role"], content=item["content"], created_at=created_at)
+        else:
+            chat_ctx.add_message(role=item["role"], content=item["content"])
+
+    async def run_search(query: str, limit: int) -> dict:
+        return await weaviate_utils.search_across_collections_async(
+            query=query,
+            limit=limit,
+            collection_names=[collection_name, seed_collection],
+        )
+
+    prefetcher = (
+        SearchPrefetcher(run_search, limit=rerank.candidate_count(PREFETCH_LIMIT)) if PREFETCH_ENABLED else None
+    )
+    tracer = TurnTracer(room=getattr(ctx.room, "name", ""))
 
     @function_tool
     async def query_search(context: RunContext, query: str, limit: int = 5):
@@ -100,13 +173,43 @@ async def entrypoint(ctx: JobContext):
         payload = json.dumps({"state": "start", "query": query}, ensure_ascii=False)
         await ctx.room.local_participant.publish_data(payload, topic="search_status")
         try:
-            results = weaviate_utils.search_across_collections(
-                query=query,
-                limit=limit,
-                collection_names=[collection_name, seed_collection],
+            candidates = rerank.candidate_count(limit)
+            with tracer.tool_span("tool.query_search", limit=limit, candidates=candidates) as span_attributes:
+                # A prefetch holds candidate_count(PREFETCH_LIMIT) hits; a larger request still
+                # uses it as long as it covers ``limit``, the reranker just sees fewer candidates.
+                search = await prefetcher.take(query, candidates, min_limit=limit) if prefetcher else None
+                span_attributes["prefetched"] = search is not None
+                if search is None:
+                    search = await run_search(query, candidates)
+                else:
+                    print(f"[prefetch] hit from transcript {search['prefetched_from']!r}")
+                results = search["results"]
+                if rerank.RERANK_ENABLED:
+                    results, rerank_info = await rerank.rerank_hits(query, results, limit)
+                    span_attributes.update(rerank_info)
+                    print(f"[rerank] {rerank_info}")
+                results = results[:limit]
+                if snippets.SNIPPET_ENABLED:
+                    results, snippet_info = snippets.select_snippets(query, results)
+                    span_attributes.update(snippet_info)
+                    print(f"[snippets] {snippet_info}")
+                span_attributes.update(results=len(results), partial=search["partial"])
+            print(
+                f"[search] results={len(results)} missing={search['missing']} "
+                f"cached={search['cached']} search_cache={weaviate_utils.search_cache.cache_stats()} "
+                f"schema_cache={weaviate_utils.collection_cache_stats()}"
+            )
+            # Only what the model needs to answer and cite; ids, scores and timestamps cost tokens.
+            return json.dumps(
+                {
+                    "results": [
+                        {field: hit.get(field, "") for field in ("title", "source", "content")}
+                        for hit in results
+                    ],
+                    "partial": search["partial"],
+                },
+                ensure_ascii=False,
             )
-            print(f"[search] results={len(results)}")
-            return json.dumps({"results": results}, ensure_ascii=False)
         finally:
             payload = json.dumps({"state": "end"}, ensure_ascii=False)
             await ctx.room.local_participant.publish_data(payload, topic="search_status")
@@ -117,14 +220,34 @@ async def entrypoint(ctx: JobContext):
         chat_ctx=chat_ctx,
     )
 
-    session_record = {
-        "room": getattr(ctx.room, "name", ""),
-        "started_at": time.time(),
-        "ended_at": None,
-        "items": [],
-    }
-    user_record["sessions"].append(session_record)
-    _save_store(store)
+    session_id = await asyncio.to_thread(
+        store.start_session, user_name, getattr(ctx.room, "name", "")
+    )
+    transcript_writer = TranscriptWriter(store, session_id)
+
+    def summarize_session() -> None:
+        # Done once here so the next session start never waits on a model call.
+        # Only the turns the next replay drops; the recent ones are replayed verbatim.
+        older, _ = split_history(store.session_items(session_id))
+        if not older:
+            return
+        try:
+            summary = make_summarizer().summarize(older)
+        except Exception as exc:
+            print(f"[history] summary of session {session_id} failed: {exc!r}")
+            return
+        if summary:
+            store.set_summary(session_id, summary)
+
+    async def flush_transcript() -> None:
+        transcript_writer.close()
+        if not await asyncio.to_thread(transcript_writer.wait, 10.0):
+            print(f"[transcripts] final flush of session {session_id} timed out")
+        print(f"[transcripts] session {session_id} {transcript_writer.metrics()}")
+        await asyncio.to_thread(summarize_session)
+        await asyncio.to_thread(telemetry.flush)
+
+    ctx.add_shutdown_callback(flush_transcript)
 
     session_kwargs = {
         "llm": openai.realtime.RealtimeModel(
@@ -135,6 +258,8 @@ async def entrypoint(ctx: JobContext):
     }
     if FALLBACK_TTS:
         session_kwargs["tts"] = openai.TTS(model="gpt-4o-mini-tts", voice="Marin")
+    if "vad" in ctx.proc.userdata:
+        session_kwargs["vad"] = ctx.proc.userdata["vad"]
     session = AgentSession(**session_kwargs)
 
     def handle_conversation_item(event) -> None:
@@ -146,20 +271,45 @@ async def entrypoint(ctx: JobContext):
         text = message.text_content
         if not text or not text.strip():
             return
-        session_record["items"].append(
-            {
-                "role": message.role,
-                "content": text,
-                "created_at": message.created_at,
-            }
-        )
-        _save_store(store)
+        transcript_writer.append(message.role, text, message.created_at)
+
+    def handle_user_transcript(event) -> None:
+        if prefetcher is not None:
+            prefetcher.on_transcript(event.transcript, event.is_final)
 
     def handle_close(event) -> None:
-        session_record["ended_at"] = time.time()
-        _save_store(store)
+        # Non-blocking; the shutdown callback waits for the final flush.
+        transcript_writer.close()
+        if prefetcher is not None:
+            print(f"[prefetch] {prefetcher.close()}")
+
+    first_audio_logged = False
+
+    def handle_user_state(event) -> None:
+        tracer.on_user_state(event.old_state, event.new_state, event.created_at)
+
+    def handle_agent_state(event) -> None:
+        nonlocal first_audio_logged
+        tracer.on_agent_state(event.new_state, event.created_at)
+        if first_audio_logged or event.new_state != "speaking":
+            return
+        first_audio_logged = True
+        join_to_first_audio = time.perf_counter() - joined_at
+        print(
+            f"[latency] join_to_first_audio_ms={join_to_first_audio * 1000:.0f} "
+            f"prewarmed={'prewarm_ms' in ctx.proc.userdata}"
+        )
+        telemetry.record_span(
+            "session.join_to_first_audio",
+            event.created_at - join_to_first_audio,
+            event.created_at,
+            prewarmed="prewarm_ms" in ctx.proc.userdata,
+        )
 
     session.on("conversation_item_added", handle_conversation_item)
+    session.on("agent_state_changed", handle_agent_state)
+    session.on("user_state_changed", handle_user_state)
+    session.on("user_input_transcribed", handle_user_transcript)
     session.on("close", handle_close)
 
     await session.start(agent=agent, room=ctx.room)
@@ -176,5 +326,6 @@ if __name__ == "__main__":
     cli.run_app(
         WorkerOptions(
             entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
         )
     )
@@ -7,6 +7,7 @@ from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from livekit.api import AccessToken, VideoGrants
 
 
@@ -20,7 +21,12 @@ if str(SRC_DIR) not in sys.path:
 AGENT_DIR = BASE_DIR / "agent"
 if str(AGENT_DIR) not in sys.path:
     sys.path.append(str(AGENT_DIR))
+API_DIR = BASE_DIR / "api_server"
+if str(API_DIR) not in sys.path:
+    sys.path.append(str(API_DIR))
 
+import ingest_jobs  
+import metrics  
 import pdf_ingest  
 import weaviate_utils  
 try: 
@@ -39,6 +45,9 @@ ALLOWED_ORIGINS = [
 ]
 ROOM_PREFIX = os.getenv("ROOM_PREFIX", "realtime-demo")
 UPLOADS_DIR = BASE_DIR / "local" / "uploads"
+# 0 (the default) accepts uploads of any size; they are streamed to disk either way.
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", "0"))
+UPLOAD_COPY_CHUNK_BYTES = 1024 * 1024
 
 
 def _mask(value: str) -> str:
@@ -117,6 +126,37 @@ def _safe_filename(name: str) -> str:
     return cleaned or "document.pdf"
 
 
+class UploadTooLargeError(Exception):
+    pass
+
+
+def _save_upload(source, destination: Path, max_bytes: int | None = None) -> int:
+    """Copy the spooled upload to ``destination`` in chunks, never holding it in memory.
+
+    Writes to a ``.part`` file first, so a rejected or failed upload never
+    replaces an existing document. ``max_bytes`` defaults to
+    ``UPLOAD_MAX_BYTES``; zero or less means no limit.
+    """
+    if max_bytes is None:
+        max_bytes = UPLOAD_MAX_BYTES
+    partial = destination.with_name(destination.name + ".part")
+    written = 0
+    try:
+        with partial.open("wb") as handle:
+            while True:
+                chunk = source.read(UPLOAD_COPY_CHUNK_BYTES)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if 0 < max_bytes < written:
+                    raise UploadTooLargeError(f"Upload exceeds {max_bytes} bytes")
+                handle.write(chunk)
+        partial.replace(destination)
+    finally:
+        partial.unlink(missing_ok=True)
+    return written
+
+
 @app.post("/token", response_model=TokenResponse)
 def mint_token(payload: TokenRequest) -> TokenResponse:
     _require_env()
@@ -158,7 +198,63 @@ def session_meta():
     return {"model_name": AGENT_MODEL_NAME}
 
 
-@app.post("/documents/upload")
+def _run_ingest_job(job: dict, progress) -> dict:
+    params = job["params"]
+    collection_name = params["collection"]
+    if not weaviate_utils.wait_for_weaviate(max_wait_s=20, interval_s=1.5, debug=True):
+        raise RuntimeError("Weaviate is unavailable")
+    with weaviate_utils.pooled_client() as client:
+        weaviate_utils.ensure_collection(client, collection_name)
+    result = pdf_ingest.ingest_pdf_file(
+        Path(params["file_path"]),
+        collection_name=collection_name,
+        progress=progress,
+    )
+    print(
+        "[documents] ingested",
+        {
+            "job": job["id"],
+            "user": params["user"],
+            "collection": collection_name,
+            "file": params["file_name"],
+            "chunks": result["chunks"],
+            "skipped": result.get("skipped", 0),
+            "deleted": result.get("deleted", 0),
+            "failed": result.get("failed", 0),
+            "objects_per_s": result.get("objects_per_s", 0.0),
+            "pages": result["pages"],
+        },
+    )
+    return {
+        "chunks": result["chunks"],
+        "skipped": result.get("skipped", 0),
+        "deleted": result.get("deleted", 0),
+        "failed": result.get("failed", 0),
+        "pages": result["pages"],
+        "source": result["source_base"],
+    }
+
+
+ingest_queue = ingest_jobs.IngestJobQueue(_run_ingest_job)
+metrics.install(app, active_uploads=ingest_queue.active)
+
+
+def _job_response(job: dict) -> dict:
+    params = job["params"]
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "file_name": params["file_name"],
+        "collection": params["collection"],
+        "source": params["file_path"],
+        "attempts": job["attempts"],
+        "progress": job["progress"],
+        "result": job["result"],
+        "error": job["error"],
+    }
+
+
+@app.post("/documents/upload", status_code=202)
 async def upload_document(
     name: str = Form(...),
     file: UploadFile = File(...),
@@ -177,33 +273,49 @@ async def upload_document(
 
     filename = _safe_filename(file.filename)
     file_path = target_dir / filename
-    contents = await file.read()
-    file_path.write_bytes(contents)
+    try:
+        await run_in_threadpool(_save_upload, file.file, file_path)
+    except UploadTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
 
-    if not weaviate_utils.wait_for_weaviate(max_wait_s=20, interval_s=1.5, debug=True):
-        raise HTTPException(status_code=503, detail="Weaviate is unavailable")
+    try:
+        job = ingest_queue.submit(
+            {
+                "user": user_name,
+                "collection": collection_name,
+                "file_name": filename,
+                "file_path": str(file_path),
+            }
+        )
+    except ingest_jobs.QueueFullError:
+        raise HTTPException(status_code=429, detail="Too many uploads in progress, try again shortly")
+    return _job_response(job)
 
-    with weaviate_utils.connect_client() as client:
-        weaviate_utils.ensure_collection(client, collection_name)
 
-    result = pdf_ingest.ingest_pdf_file(file_path, collection_name=collection_name)
-    print(
-        "[documents] ingested",
-        {
-            "user": user_name,
-            "collection": collection_name,
-            "file": filename,
-            "chunks": result["chunks"],
-            "pages": result["pages"],
-        },
-    )
+@app.get("/documents/jobs/{job_id}")
+def ingest_job_status(job_id: str, passcode: str | None = None):
+    _verify_passcode(passcode)
+    job = ingest_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return _job_response(job)
+
+
+def _document_entry(entry: dict, origin: str) -> dict:
+    base = entry.get("source", "")
+    size = 0
+    if base:
+        try:
+            size = Path(base).stat().st_size
+        except OSError:
+            size = 0
     return {
-        "status": "ok",
-        "file_name": filename,
-        "collection": collection_name,
-        "source": result["source_base"],
-        "chunks": result["chunks"],
-        "pages": result["pages"],
+        "source": base,
+        "name": Path(base).name if base else "document.pdf",
+        "size": size,
+        "chunks": entry.get("count", 0),
+        "origin": origin,
+        "deletable": origin != "seed",
     }
 
 
@@ -212,9 +324,7 @@ def delete_document(payload: DeleteDocumentRequest):
     _verify_passcode(payload.passcode)
     user_name = payload.name.strip() or "Guest"
     collection_name = weaviate_utils.normalize_collection_name(user_name)
-    seed_collection = weaviate_utils.seed_collection_name()
-    seed_sources = weaviate_utils.list_sources(collection_name=seed_collection)
-    if any((entry.get("source", "").split("#", 1)[0] == payload.source) for entry in seed_sources):
+    if weaviate_utils.is_seed_source(payload.source):
         raise HTTPException(status_code=403, detail="Seed documents cannot be deleted")
     deleted = weaviate_utils.delete_source(payload.source, collection_name=collection_name)
     return {"status": "ok", "deleted": deleted}
@@ -226,47 +336,8 @@ def list_documents(payload: ListDocumentsRequest):
     user_name = payload.name.strip() or "Guest"
     collection_name = weaviate_utils.normalize_collection_name(user_name)
     seed_collection = weaviate_utils.seed_collection_name()
-    user_sources = weaviate_utils.list_sources(collection_name=collection_name)
     seed_sources = weaviate_utils.list_sources(collection_name=seed_collection)
-    items = []
-    for entry in seed_sources:
-        source = entry.get("source", "")
-        base = source.split("#", 1)[0] if source else ""
-        name = Path(base).name if base else "document.pdf"
-        size = 0
-        if base and Path(base).exists():
-            try:
-                size = Path(base).stat().st_size
-            except OSError:
-                size = 0
-        items.append(
-            {
-                "source": base,
-                "name": name,
-                "size": size,
-                "chunks": entry.get("count", 0),
-                "origin": "seed",
-                "deletable": False,
-            }
-        )
-    for entry in user_sources:
-        source = entry.get("source", "")
-        base = source.split("#", 1)[0] if source else ""
-        name = Path(base).name if base else "document.pdf"
-        size = 0
-        if base and Path(base).exists():
-            try:
-                size = Path(base).stat().st_size
-            except OSError:
-                size = 0
-        items.append(
-            {
-                "source": base,
-                "name": name,
-                "size": size,
-                "chunks": entry.get("count", 0),
-                "origin": "user",
-                "deletable": True,
-            }
-        )
+    user_sources = weaviate_utils.list_sources(collection_name=collection_name)
+    items = [_document_entry(entry, "seed") for entry in seed_sources]
+    items.extend(_document_entry(entry, "user") for entry in user_sources)
     return {"status": "ok", "documents": items}
@@ -0,0 +1,103 @@
+"""Prometheus metrics for the API server.
+
+Per-route request timing comes from an HTTP middleware. Weaviate operation
+counters and ingested-chunk counters are fed from ``telemetry`` spans
+emitted by ``weaviate_utils``, so the library itself needs no Prometheus
+dependency. Scrape ``GET /metrics``.
+"""
+
+from __future__ import annotations
+
+import time
+
+from fastapi import FastAPI, Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+import telemetry
+
+
+REQUEST_SECONDS = Histogram(
+    "api_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "api_requests_in_flight",
+    "HTTP requests currently being handled.",
+)
+WEAVIATE_OPERATIONS = Counter(
+    "weaviate_operations_total",
+    "Weaviate operations issued by this process.",
+    ["operation", "status"],
+)
+WEAVIATE_SECONDS = Histogram(
+    "weaviate_operation_duration_seconds",
+    "Weaviate operation latency.",
+    ["operation"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+CHUNKS_INGESTED = Counter(
+    "chunks_ingested_total",
+    "Chunks processed by ingestion, by outcome.",
+    ["outcome"],
+)
+UPLOADS_IN_FLIGHT = Gauge(
+    "document_uploads_in_flight",
+    "Uploaded documents queued, ingesting or waiting to retry.",
+)
+
+_CHUNK_OUTCOMES = ("inserted", "skipped", "deleted", "failed")
+
+
+def _on_span(span: dict) -> None:
+    name = span["name"]
+    if not name.startswith("weaviate."):
+        return
+    operation = name.split(".", 1)[1]
+    status = "ok" if span["status"] == "ok" else "error"
+    WEAVIATE_OPERATIONS.labels(operation=operation, status=status).inc()
+    WEAVIATE_SECONDS.labels(operation=operation).observe(span["duration_ms"] / 1000)
+    if operation == "ingest":
+        for outcome in _CHUNK_OUTCOMES:
+            count = span["attributes"].get(outcome)
+            if count:
+                CHUNKS_INGESTED.labels(outcome=outcome).inc(count)
+
+
+def _route_template(request: Request) -> str:
+    # Label by template (/documents/jobs/{job_id}), never the raw path, to bound cardinality.
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def install(app: FastAPI, active_uploads=None) -> None:
+    """Add the timing middleware and ``/metrics`` route to ``app``.
+
+    ``active_uploads`` is an optional zero-argument callable sampled for the
+    in-flight uploads gauge at scrape time.
+    """
+    telemetry.add_listener(_on_span)
+    if active_uploads is not None:
+        UPLOADS_IN_FLIGHT.set_function(active_uploads)
+
+    @app.middleware("http")
+    async def time_requests(request: Request, call_next):
+        started = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            REQUEST_SECONDS.labels(
+                method=request.method,
+                route=_route_template(request),
+                status=str(status),
+            ).observe(time.perf_counter() - started)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics() -> Response:
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -25,6 +25,7 @@ const LOCAL_TOKEN_ENDPOINT = "http://localhost:8001/token";
 const ENV_STORAGE_KEY = "lk-env";
 
 const CHAT_TOPIC = "lk.chat";
+const INGEST_POLL_INTERVAL_MS = 1000;
 
 function resolveEnvironment() {
   const params = new URLSearchParams(window.location.search);
@@ -81,7 +82,32 @@ async function uploadDocument(activeEnv, name, passcode, file) {
     throw new Error(error.detail || "Failed to upload document");
   }
 
-  return response.json();
+  const job = await response.json();
+  return waitForIngestJob(activeEnv, passcode, job);
+}
+
+async function waitForIngestJob(activeEnv, passcode, job) {
+  let current = job;
+  while (current.status !== "done") {
+    if (current.status === "failed") {
+      throw new Error(current.error || "Failed to process document");
+    }
+    await new Promise((resolve) => setTimeout(resolve, INGEST_POLL_INTERVAL_MS));
+    const params = new URLSearchParams();
+    if (passcode) {
+      params.set("passcode", passcode);
+    }
+    const response = await fetch(
+      `${getApiBase(activeEnv)}/documents/jobs/${current.job_id}?${params.toString()}`,
+      { method: "GET" }
+    );
+    if (!response.ok) {
+      const error = await response.json().catch(() => ({}));
+      throw new Error(error.detail || "Failed to fetch upload status");
+    }
+    current = await response.json();
+  }
+  return current;
 }
 
 async function deleteDocument(activeEnv, name, passcode, source) {
@@ -0,0 +1,48 @@
+"""Write the ``source_base`` property on objects ingested before it existed.
+
+Usage: python src/backfill_source_base.py [collection ...]
+Without arguments every collection is processed; multi-tenant collections
+are walked tenant by tenant.
+"""
+
+from __future__ import annotations
+
+import sys
+
+import weaviate_utils
+
+
+def _backfill(collection) -> tuple[int, int]:
+    scanned = 0
+    updated = 0
+    for obj in collection.iterator(
+        return_properties=[weaviate_utils.DOC_SOURCE_FIELD, weaviate_utils.DOC_SOURCE_BASE_FIELD]
+    ):
+        scanned += 1
+        props = obj.properties or {}
+        base = weaviate_utils.source_base_of(props.get(weaviate_utils.DOC_SOURCE_FIELD) or "")
+        if not base or props.get(weaviate_utils.DOC_SOURCE_BASE_FIELD) == base:
+            continue
+        collection.data.update(uuid=obj.uuid, properties={weaviate_utils.DOC_SOURCE_BASE_FIELD: base})
+        updated += 1
+    return scanned, updated
+
+
+def main() -> None:
+    names = sys.argv[1:] or weaviate_utils.list_collections()
+    with weaviate_utils.pooled_client() as client:
+        for name in names:
+            collection = client.collections.use(name)
+            # Adds the missing source_base property to the schema.
+            weaviate_utils._verify_collection(client, name)
+            if collection.config.get().multi_tenancy_config.enabled:
+                targets = [(f"{name}/{tenant}", collection.with_tenant(tenant)) for tenant in collection.tenants.get()]
+            else:
+                targets = [(name, collection)]
+            for label, target in targets:
+                scanned, updated = _backfill(target)
+                print(f"{label}: scanned={scanned} updated={updated}")
+
+
+if __name__ == "__main__":
+    main()
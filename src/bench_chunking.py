@@ -0,0 +1,130 @@
+"""Page splitter vs structured chunker: volume and retrieval.
+
+For each chunker the seed PDFs (plus, for volume only, a synthetic PDF of
+``--synthetic-pages`` pages) are chunked exactly like ingestion. Reported:
+
+- chunks, characters and estimated embedding tokens (chars / 4), and
+  characters embedded per character of extracted text (overlap shows up
+  as > 1.0)
+- retrieval over data/VSCHT/relevance.jsonl with a local index in the
+  configured ``WEAVIATE_SEARCH_MODE``: a query counts as answered at rank r
+  when the r-th chunk is from a relevant PDF and contains the labelled
+  answer string. Shows answer@1, answer@k, MRR and the characters of the
+  top-k chunks a search would hand to the model.
+
+    EMBEDDER=fake python src/bench_chunking.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import tempfile
+import time
+from pathlib import Path
+
+import embeddings
+import local_index
+import pdf_ingest
+from bench_pdf_extract import make_synthetic_pdf
+import weaviate_utils
+
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data" / "VSCHT"
+CHUNKERS = ("page", "structured")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _extracted_chars(pdf_paths: list[Path]) -> int:
+    return sum(len(text) for pdf_path in pdf_paths for _, text in pdf_ingest.extract_pages_text(pdf_path))
+
+
+def _volume(chunker: str, pdf_paths: list[Path]) -> tuple[list[dict], float]:
+    started = time.perf_counter()
+    chunks = [chunk for pdf_path in pdf_paths for chunk in pdf_ingest.chunk_pdf(pdf_path, chunker=chunker)]
+    return chunks, time.perf_counter() - started
+
+
+def _embedded_text(chunk: dict) -> str:
+    return f"{chunk['title']}\n{chunk['content']}"
+
+
+def _answer_rank(hits: list[dict], judgement: dict) -> int | None:
+    answer = _normalize(judgement["answer"])
+    for rank, hit in enumerate(hits, start=1):
+        stem = Path(str(hit["source"]).split("#", 1)[0]).stem
+        if stem in judgement["relevant"] and answer in _normalize(hit["content"]):
+            return rank
+    return None
+
+
+def _retrieval(chunks: list[dict], judgements: list[dict], limit: int) -> dict:
+    embedder = embeddings.get_embedder()
+    items = [{**chunk, "id": str(position)} for position, chunk in enumerate(chunks)]
+    index = local_index.build_index(items, embedder.model, embedder.embed([_embedded_text(c) for c in chunks]))
+    mode = weaviate_utils._normalize_search_mode(weaviate_utils.WEAVIATE_SEARCH_MODE)
+    ranks, context = [], []
+    for judgement in judgements:
+        vector = embedder.embed_one(judgement["query"]) if mode != "keyword" else None
+        if mode == "keyword":
+            hits = index.search_keyword(judgement["query"], limit)
+        elif mode == "semantic":
+            hits = index.search_semantic(vector, limit)
+        else:
+            hits = index.search_hybrid(judgement["query"], vector, limit, weaviate_utils.WEAVIATE_HYBRID_ALPHA)
+        ranks.append(_answer_rank(hits, judgement))
+        context.append(sum(len(hit["content"]) for hit in hits))
+    count = len(judgements) or 1
+    return {
+        "mode": mode,
+        "answer@1": sum(1 for rank in ranks if rank == 1) / count,
+        f"answer@{limit}": sum(1 for rank in ranks if rank) / count,
+        "mrr": sum(1 / rank for rank in ranks if rank) / count,
+        "context_chars": sum(context) / count,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=3)
+    parser.add_argument("--synthetic-pages", type=int, default=60, help="0 to skip the synthetic PDF")
+    parser.add_argument("--judgements", type=Path, default=DATA_DIR / "relevance.jsonl")
+    args = parser.parse_args()
+
+    with args.judgements.open("r", encoding="utf-8") as handle:
+        judgements = [json.loads(line) for line in handle if line.strip()]
+    seed_pdfs = sorted((DATA_DIR / "pdfs").glob("*.pdf"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpora = {"seed": seed_pdfs}
+        if args.synthetic_pages:
+            synthetic = Path(tmp) / "synthetic.pdf"
+            make_synthetic_pdf(synthetic, args.synthetic_pages)
+            corpora["synthetic"] = [synthetic]
+        for corpus, pdf_paths in corpora.items():
+            source_chars = _extracted_chars(pdf_paths)
+            print(f"[{corpus}] {len(pdf_paths)} PDFs, {source_chars} extracted chars")
+            for chunker in CHUNKERS:
+                chunks, seconds = _volume(chunker, pdf_paths)
+                chars = sum(len(_embedded_text(chunk)) for chunk in chunks)
+                tokens = sum(math.ceil(len(_embedded_text(chunk)) / 4) for chunk in chunks)
+                print(
+                    f"  {chunker:<10} chunks={len(chunks):<5} chars={chars:<8} tokens~{tokens:<7} "
+                    f"embedded/extracted={chars / source_chars if source_chars else 0.0:.2f}  "
+                    f"chunking={seconds * 1000:.0f} ms"
+                )
+                if corpus == "seed":
+                    result = _retrieval(chunks, judgements, args.limit)
+                    print(
+                        f"  {'':<10} mode={result['mode']} answer@1={result['answer@1']:.3f}  "
+                        f"answer@{args.limit}={result[f'answer@{args.limit}']:.3f}  mrr={result['mrr']:.3f}  "
+                        f"top-{args.limit} chars={result['context_chars']:.0f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Per-query latency of connect-per-call vs the shared client pool.
+
+By default runs against an in-process stand-in client whose connect and query
+costs are simulated with sleeps, so it works without Docker. Pass ``--live``
+to measure against the local Weaviate instead (a collection must exist).
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+import weaviate_utils
+
+
+class StandInClient:
+    def __init__(self, connect_ms: float, query_ms: float) -> None:
+        self._query_s = query_ms / 1000.0
+        time.sleep(connect_ms / 1000.0)
+
+    def is_ready(self) -> bool:
+        return True
+
+    def query(self) -> None:
+        time.sleep(self._query_s)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _summary(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(
+        f"{label:<22} mean={statistics.mean(samples):7.2f} ms "
+        f"p50={statistics.median(samples):7.2f} ms p95={p95:7.2f} ms"
+    )
+
+
+def bench_stand_in(iterations: int, connect_ms: float, query_ms: float) -> None:
+    def factory():
+        return StandInClient(connect_ms, query_ms)
+
+    before: list[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        with factory() as client:
+            client.query()
+        before.append((time.perf_counter() - started) * 1000.0)
+
+    pool = weaviate_utils.ClientPool(factory=factory, max_size=2)
+    after: list[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        with pool.client() as client:
+            client.query()
+        after.append((time.perf_counter() - started) * 1000.0)
+    pool.close()
+
+    _summary("connect-per-call", before)
+    _summary("pooled", after)
+    print(f"pool stats: {pool.stats}")
+
+
+def bench_live(iterations: int, collection_name: str, query: str) -> None:
+    before: list[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        with weaviate_utils.connect_client() as client:
+            client.collections.use(collection_name).query.bm25(query=query, limit=5)
+        before.append((time.perf_counter() - started) * 1000.0)
+
+    after: list[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        with weaviate_utils.pooled_client() as client:
+            client.collections.use(collection_name).query.bm25(query=query, limit=5)
+        after.append((time.perf_counter() - started) * 1000.0)
+
+    _summary("connect-per-call", before)
+    _summary("pooled", after)
+    print(f"pool stats: {weaviate_utils.get_client_pool().stats}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--connect-ms", type=float, default=25.0)
+    parser.add_argument("--query-ms", type=float, default=5.0)
+    parser.add_argument("--live", action="store_true")
+    parser.add_argument("--collection", default=weaviate_utils.seed_collection_name())
+    parser.add_argument("--query", default="děkanát úřední hodiny")
+    args = parser.parse_args()
+    if args.live:
+        bench_live(args.iterations, args.collection, args.query)
+    else:
+        bench_stand_in(args.iterations, args.connect_ms, args.query_ms)
+
+
+if __name__ == "__main__":
+    main()
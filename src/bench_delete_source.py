@@ -0,0 +1,107 @@
+"""Compare the old scan-and-delete_by_id path with the filtered delete_source.
+
+Needs the local Weaviate. Builds a throwaway collection with self-provided
+random vectors (no OpenAI calls), so 100k objects load in well under a minute:
+
+    python src/bench_delete_source.py --objects 100000 --sources 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from weaviate.classes.config import Configure
+
+import weaviate_utils
+
+
+BENCH_COLLECTION = "bench_delete_source"
+
+
+def _legacy_delete_source(collection, source: str) -> int:
+    to_delete: list[str] = []
+    offset = 0
+    batch = 200
+    while True:
+        try:
+            response = collection.query.fetch_objects(
+                limit=batch,
+                offset=offset,
+                return_properties=[weaviate_utils.DOC_SOURCE_FIELD],
+            )
+        except Exception as exc:
+            # offset + limit beyond QUERY_MAXIMUM_RESULTS is rejected; the old path silently missed these.
+            print(f"legacy scan stopped at offset {offset}: {exc}")
+            break
+        objects = response.objects or []
+        if not objects:
+            break
+        for obj in objects:
+            value = (obj.properties or {}).get(weaviate_utils.DOC_SOURCE_FIELD) or ""
+            if weaviate_utils.source_base_of(value) == source:
+                to_delete.append(str(obj.uuid))
+        offset += batch
+    deleted = 0
+    for doc_id in to_delete:
+        if collection.data.delete_by_id(doc_id):
+            deleted += 1
+    return deleted
+
+
+def _populate(client, objects: int, sources: int, dims: int) -> None:
+    if client.collections.exists(BENCH_COLLECTION):
+        client.collections.delete(BENCH_COLLECTION)
+    weaviate_utils.invalidate_collection_cache(BENCH_COLLECTION)
+    client.collections.create(
+        name=BENCH_COLLECTION,
+        properties=weaviate_utils._collection_properties(),
+        vector_config=Configure.Vectors.self_provided(),
+    )
+    collection = client.collections.use(BENCH_COLLECTION)
+    rng = random.Random(7)
+    with collection.batch.fixed_size(batch_size=500, concurrent_requests=4) as batch:
+        for index in range(objects):
+            source = f"/bench/doc_{index % sources:05d}.pdf#page={index // sources + 1}"
+            batch.add_object(
+                properties={
+                    weaviate_utils.DOC_TITLE_FIELD: f"chunk {index}",
+                    weaviate_utils.DOC_CONTENT_FIELD: f"synthetic chunk {index}",
+                    weaviate_utils.DOC_SOURCE_FIELD: source,
+                    weaviate_utils.DOC_SOURCE_BASE_FIELD: weaviate_utils.source_base_of(source),
+                },
+                vector=[rng.random() for _ in range(dims)],
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--objects", type=int, default=100_000)
+    parser.add_argument("--sources", type=int, default=500)
+    parser.add_argument("--dims", type=int, default=8)
+    parser.add_argument("--keep", action="store_true", help="keep the bench collection afterwards")
+    args = parser.parse_args()
+
+    with weaviate_utils.pooled_client() as client:
+        started = time.perf_counter()
+        _populate(client, args.objects, args.sources, args.dims)
+        print(f"loaded {args.objects} objects in {time.perf_counter() - started:.1f} s")
+        collection = client.collections.use(BENCH_COLLECTION)
+
+        started = time.perf_counter()
+        legacy = _legacy_delete_source(collection, "/bench/doc_00001.pdf")
+        legacy_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    filtered = weaviate_utils.delete_source("/bench/doc_00002.pdf", collection_name=BENCH_COLLECTION)
+    filtered_s = time.perf_counter() - started
+
+    print(f"scan + delete_by_id: deleted={legacy:<5} {legacy_s * 1000:9.1f} ms")
+    print(f"filtered delete_many: deleted={filtered:<5} {filtered_s * 1000:9.1f} ms")
+    if not args.keep:
+        weaviate_utils.delete_collection(BENCH_COLLECTION)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Ranking quality and cost of cross-collection fusion.
+
+Offline: the seed PDFs are chunked like ingestion and split into two local
+indexes, a simulated user collection (``--user-pdfs``, default ``fpbt``) and
+the seed collection (the rest). Every labelled query in
+data/VSCHT/relevance.jsonl is searched in both with the configured
+``WEAVIATE_SEARCH_MODE``; the per-collection hit lists are then merged with
+each fusion method. A hit is relevant when its source PDF is listed for the
+query. Reports MRR, hit@1 and nDCG@k per method, plus merge latency next to
+the old sort-by-raw-score merge. The "weighted" rows apply ``--user-weight``
+and ``--seed-weight`` to show what a boost for the user collection does.
+
+    EMBEDDER=fake python src/bench_fusion.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import time
+from pathlib import Path
+
+import embeddings
+import fusion
+import local_index
+import pdf_ingest
+import weaviate_utils
+
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data" / "VSCHT"
+USER_COLLECTION = "user_bench"
+
+
+def load_judgements(path: Path) -> list[dict]:
+    with path.open("r", encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def _build(pdf_paths: list[Path], embedder) -> local_index.LocalIndex:
+    items = []
+    for pdf_path in pdf_paths:
+        chunks = pdf_ingest.chunk_pdf(pdf_path)
+        items.extend({**chunk, "id": f"{pdf_path.stem}:{i}"} for i, chunk in enumerate(chunks))
+    vectors = embedder.embed([f"{item['title']}\n{item['content']}" for item in items])
+    return local_index.build_index(items, embedder.model, vectors)
+
+
+def _search(index: local_index.LocalIndex, mode: str, query: str, vector, limit: int) -> list[dict]:
+    if mode == "keyword":
+        return index.search_keyword(query, limit)
+    if mode == "semantic":
+        return index.search_semantic(vector, limit)
+    return index.search_hybrid(query, vector, limit, weaviate_utils.WEAVIATE_HYBRID_ALPHA)
+
+
+def _sort_merge(hits_by_collection: dict[str, list[dict]], limit: int) -> list[dict]:
+    # The merge search_across_collections used before fusion: one global sort on raw scores.
+    results = [hit for hits in hits_by_collection.values() for hit in hits]
+    results.sort(key=fusion.raw_score, reverse=True)
+    return results[:limit]
+
+
+def _stem(hit: dict) -> str:
+    return Path(str(hit.get("source", "")).split("#", 1)[0]).stem
+
+
+def _metrics(ranked: list[dict], relevant: set[str], available: int, k: int) -> tuple[float, float, float]:
+    gains = [1.0 if _stem(hit) in relevant else 0.0 for hit in ranked[:k]]
+    reciprocal = next((1.0 / rank for rank, gain in enumerate(gains, start=1) if gain), 0.0)
+    dcg = sum(gain / math.log2(rank + 1) for rank, gain in enumerate(gains, start=1))
+    ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(k, available) + 1))
+    return reciprocal, gains[0] if gains else 0.0, dcg / ideal if ideal else 0.0
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))] if ordered else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--user-pdfs", default="fpbt", help="comma-separated PDF stems for the user collection")
+    parser.add_argument("--judgements", type=Path, default=DATA_DIR / "relevance.jsonl")
+    parser.add_argument("--repeat", type=int, default=200, help="merge repetitions for timing")
+    parser.add_argument("--user-weight", type=float, default=1.05, help="user collection weight for the weighted rows")
+    parser.add_argument("--seed-weight", type=float, default=1.0, help="seed collection weight for the weighted rows")
+    args = parser.parse_args()
+
+    user_stems = {stem.strip() for stem in args.user_pdfs.split(",") if stem.strip()}
+    pdfs = sorted((DATA_DIR / "pdfs").glob("*.pdf"))
+    embedder = embeddings.get_embedder()
+    seed = weaviate_utils.seed_collection_name()
+    indexes = {
+        USER_COLLECTION: _build([path for path in pdfs if path.stem in user_stems], embedder),
+        seed: _build([path for path in pdfs if path.stem not in user_stems], embedder),
+    }
+    chunks_per_stem: dict[str, int] = {}
+    for index in indexes.values():
+        for doc in index.docs:
+            chunks_per_stem[_stem(doc)] = chunks_per_stem.get(_stem(doc), 0) + 1
+
+    mode = weaviate_utils._normalize_search_mode(weaviate_utils.WEAVIATE_SEARCH_MODE)
+    judgements = load_judgements(args.judgements)
+    weighted = {name: args.seed_weight if name == seed else args.user_weight for name in indexes}
+    print(
+        f"{len(judgements)} queries, mode={mode}, model={embedder.model}, "
+        f"chunks: " + ", ".join(f"{name}={len(index.docs)}" for name, index in indexes.items())
+    )
+    searches = []
+    for judgement in judgements:
+        vector = embedder.embed_one(judgement["query"]) if mode != "keyword" else None
+        hits = {name: _search(index, mode, judgement["query"], vector, args.limit) for name, index in indexes.items()}
+        relevant = set(judgement["relevant"])
+        searches.append((hits, relevant, sum(chunks_per_stem.get(stem, 0) for stem in relevant)))
+
+    variants = [
+        ("sort-raw (before)", lambda hits: _sort_merge(hits, args.limit)),
+        ("raw", lambda hits: fusion.fuse(hits, args.limit, method="raw")),
+        ("minmax", lambda hits: fusion.fuse(hits, args.limit, method="minmax")),
+        ("rrf", lambda hits: fusion.fuse(hits, args.limit, method="rrf")),
+        ("raw weighted", lambda hits: fusion.fuse(hits, args.limit, method="raw", weights=weighted)),
+        ("minmax weighted", lambda hits: fusion.fuse(hits, args.limit, method="minmax", weights=weighted)),
+        ("rrf weighted", lambda hits: fusion.fuse(hits, args.limit, method="rrf", weights=weighted)),
+    ]
+    print("weights: " + ", ".join(f"{name}={weight:g}" for name, weight in weighted.items()))
+    for label, merge in variants:
+        scores, timings = [], []
+        for hits, relevant, available in searches:
+            scores.append(_metrics(merge({name: [dict(hit) for hit in hits[name]] for name in hits}), relevant, available, args.limit))
+            copies = [{name: [dict(hit) for hit in hits[name]] for name in hits} for _ in range(args.repeat)]
+            started = time.perf_counter()
+            for copy in copies:
+                merge(copy)
+            timings.append((time.perf_counter() - started) / args.repeat * 1e6)
+        mrr, hit1, ndcg = (sum(column) / len(column) for column in zip(*scores))
+        print(
+            f"{label:<18} MRR={mrr:.3f}  hit@1={hit1:.3f}  nDCG@{args.limit}={ndcg:.3f}  "
+            f"merge p50={_percentile(timings, 0.5):6.1f} us  p95={_percentile(timings, 0.95):6.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
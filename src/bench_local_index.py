@@ -0,0 +1,119 @@
+"""Recall and latency of the local index against Weaviate.
+
+Queries are built from the section headings of data/VSCHT/*.md. Against a
+running Weaviate (default) the seed collection is mirrored if needed, then
+every query runs in keyword, semantic and hybrid mode on both backends with
+the same query vector; recall@k is the share of Weaviate's top-k ids that
+the local index also returns. ``--offline`` builds an index straight from
+the seed PDFs (use ``EMBEDDER=fake`` for no network at all) and reports
+local latency only.
+
+    python src/bench_local_index.py --refresh
+    EMBEDDER=fake python src/bench_local_index.py --offline
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import local_index
+import weaviate_utils
+
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data" / "VSCHT"
+MODES = ("keyword", "semantic", "hybrid")
+
+
+def heading_queries(data_dir: Path = DATA_DIR) -> list[str]:
+    queries = []
+    for md_path in sorted(data_dir.glob("*.md")):
+        faculty = md_path.stem.upper()
+        for line in md_path.read_text(encoding="utf-8").splitlines():
+            if line.startswith("## ") and "Metadata" not in line:
+                queries.append(f"{line[3:].strip()} {faculty}")
+    return queries
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))] if ordered else 0.0
+
+
+def _local(index: local_index.LocalIndex, mode: str, query: str, vector, limit: int) -> list[dict]:
+    if mode == "keyword":
+        return index.search_keyword(query, limit)
+    if mode == "semantic":
+        return index.search_semantic(vector, limit)
+    return index.search_hybrid(query, vector, limit, weaviate_utils.WEAVIATE_HYBRID_ALPHA)
+
+
+def _remote(collection: str, mode: str, query: str, vector, limit: int) -> list[dict]:
+    if mode == "keyword":
+        return weaviate_utils.search_keyword(query, limit=limit, collection_name=collection)
+    if mode == "semantic":
+        return weaviate_utils.search_semantic(query, limit=limit, collection_name=collection, vector=vector)
+    return weaviate_utils.search_hybrid(query, limit=limit, collection_name=collection, vector=vector)
+
+
+def _timed(func, *args) -> tuple[list[dict], float]:
+    started = time.perf_counter()
+    results = func(*args)
+    return results, (time.perf_counter() - started) * 1000
+
+
+def _report(label: str, latencies: list[float], recalls: list[float] | None = None) -> None:
+    line = f"{label:<22} p50={_percentile(latencies, 0.5):7.2f} ms  p95={_percentile(latencies, 0.95):7.2f} ms"
+    if recalls is not None:
+        line += f"  recall@k={sum(recalls) / len(recalls) if recalls else 0.0:.3f}"
+    print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--offline", action="store_true", help="build from PDFs, skip Weaviate")
+    parser.add_argument("--refresh", action="store_true", help="re-mirror the seed collection first")
+    args = parser.parse_args()
+
+    collection = weaviate_utils.seed_collection_name()
+    queries = heading_queries()
+    if args.offline:
+        with tempfile.TemporaryDirectory() as tmp:
+            local_index.LOCAL_INDEX_DIR = Path(tmp)
+            started = time.perf_counter()
+            count = local_index.build_from_pdfs(DATA_DIR / "pdfs", collection)
+            print(f"built {count} chunks in {time.perf_counter() - started:.2f} s")
+            index = local_index.get_index(collection)
+            vectors = [index.query_vector(query) for query in queries]
+            for mode in MODES:
+                latencies = [
+                    _timed(_local, index, mode, query, vector, args.limit)[1]
+                    for query, vector in zip(queries, vectors)
+                ]
+                _report(f"local {mode}", latencies)
+        return
+
+    if args.refresh or not local_index.has_index(collection):
+        print(f"mirrored {local_index.mirror_collection(collection)} chunks")
+    index = local_index.get_index(collection)
+    vectors = [index.query_vector(query) for query in queries]
+    print(f"{len(queries)} queries, {len(index.docs)} chunks, model={index.model}")
+    for mode in MODES:
+        local_ms, remote_ms, recalls = [], [], []
+        for query, vector in zip(queries, vectors):
+            local_hits, elapsed = _timed(_local, index, mode, query, vector, args.limit)
+            local_ms.append(elapsed)
+            remote_hits, elapsed = _timed(_remote, collection, mode, query, vector, args.limit)
+            remote_ms.append(elapsed)
+            expected = {hit["id"] for hit in remote_hits}
+            if expected:
+                recalls.append(len(expected & {hit["id"] for hit in local_hits}) / len(expected))
+        _report(f"weaviate {mode}", remote_ms)
+        _report(f"local {mode}", local_ms, recalls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Pages/second of PDF extraction + chunking for different worker counts.
+
+Runs over data/VSCHT/pdfs and a synthetic PDF generated on the fly:
+
+    python src/bench_pdf_extract.py --pages 600 --workers 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pymupdf
+
+import pdf_ingest
+
+
+DEFAULT_PDFS_DIR = Path(__file__).resolve().parent.parent / "data" / "VSCHT" / "pdfs"
+
+_PARAGRAPH = (
+    "Studijní oddělení děkanátu poskytuje informace o přijímacím řízení, "
+    "rozvrhu, zápisu předmětů a úředních hodinách. "
+)
+
+
+def make_synthetic_pdf(path: Path, pages: int) -> None:
+    with pymupdf.open() as doc:
+        for page_number in range(pages):
+            page = doc.new_page()
+            text = f"Kapitola {page_number + 1}\n\n" + _PARAGRAPH * 40
+            page.insert_textbox(page.rect + (50, 50, -50, -50), text, fontsize=9)
+        doc.save(path)
+
+
+def _run(pdf_path: Path, workers: int) -> tuple[int, int, float]:
+    started = time.perf_counter()
+    if workers > 1:
+        pages = 0
+        chunks = 0
+        for _, page_chunks in pdf_ingest.iter_chunks_parallel(pdf_path, workers):
+            pages += 1
+            chunks += len(page_chunks)
+    else:
+        extracted = pdf_ingest.extract_pages_text(pdf_path)
+        pages = len(extracted)
+        chunks = len(pdf_ingest.build_chunks(pdf_path, extracted, pdf_ingest._make_splitter()))
+    return pages, chunks, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=600, help="pages in the synthetic PDF")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        synthetic = Path(tmp) / "synthetic.pdf"
+        make_synthetic_pdf(synthetic, args.pages)
+        pdf_paths = sorted(DEFAULT_PDFS_DIR.glob("*.pdf")) + [synthetic]
+        for pdf_path in pdf_paths:
+            for workers in args.workers:
+                pages, chunks, seconds = _run(pdf_path, workers)
+                print(
+                    f"{pdf_path.name:<16} workers={workers:<2} pages={pages:<5} chunks={chunks:<5} "
+                    f"{seconds:7.2f} s  {pages / seconds if seconds else 0.0:8.1f} pages/s"
+                )
+
+
+if __name__ == "__main__":
+    main()
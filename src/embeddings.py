@@ -0,0 +1,176 @@
+"""Client-side embedders with a persistent SQLite cache.
+
+Used when ``WEAVIATE_VECTORIZER=client``: vectors are computed here and sent
+to Weaviate explicitly instead of letting ``text2vec-openai`` embed every
+insert and query. Cache keys are ``(model, sha256(text))`` so switching models
+never returns stale vectors.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
+from typing import Iterable, Protocol
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+EMBEDDER = os.getenv("EMBEDDER", "openai")  # openai | fake
+EMBEDDING_MODEL = os.getenv(
+    "EMBEDDING_MODEL",
+    os.getenv("WEAVIATE_OPENAI_MODEL", "text-embedding-3-large"),
+)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_CACHE_PATH = Path(
+    os.getenv("EMBEDDING_CACHE_PATH", str(BASE_DIR / "local" / "embedding_cache.sqlite3"))
+)
+FAKE_EMBEDDING_DIMS = int(os.getenv("FAKE_EMBEDDING_DIMS", "256"))
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class Embedder(Protocol):
+    model: str
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        ...
+
+
+class OpenAIEmbedder:
+    def __init__(self, model: str = EMBEDDING_MODEL) -> None:
+        from openai import OpenAI
+
+        self.model = model
+        self._client = OpenAI()
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        response = self._client.embeddings.create(model=self.model, input=texts)
+        return [list(item.embedding) for item in sorted(response.data, key=lambda item: item.index)]
+
+
+class FakeEmbedder:
+    """Deterministic, offline hashed bag-of-words vectors for development."""
+
+    def __init__(self, dims: int = FAKE_EMBEDDING_DIMS) -> None:
+        self.dims = dims
+        self.model = f"fake-{dims}"
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        vectors = []
+        for text in texts:
+            vector = [0.0] * self.dims
+            for token in _TOKEN_RE.findall(text.casefold()):
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dims
+                vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+            norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+            vectors.append([value / norm for value in vector])
+        return vectors
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, path: Path = EMBEDDING_CACHE_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.commit()
+
+    def get_many(self, model: str, hashes: Iterable[str]) -> dict[str, list[float]]:
+        hashes = list(dict.fromkeys(hashes))
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start : start + 500]
+                placeholders = ",".join("?" for _ in chunk)
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *chunk],
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model: str, entries: dict[str, list[float]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                [(model, key, array("f", vector).tobytes()) for key, vector in entries.items()],
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbedder:
+    def __init__(
+        self,
+        embedder: Embedder,
+        cache: EmbeddingCache | None,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+    ) -> None:
+        self.embedder = embedder
+        self.model = embedder.model
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.stats = {"hits": 0, "misses": 0}
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        keys = [text_hash(text) for text in texts]
+        known = self.cache.get_many(self.model, keys) if self.cache else {}
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in known:
+                missing.setdefault(key, text)
+        self.stats["hits"] += sum(1 for key in keys if key in known)
+        self.stats["misses"] += len(missing)
+        pending = list(missing.items())
+        for start in range(0, len(pending), self.batch_size):
+            group = pending[start : start + self.batch_size]
+            vectors = self.embedder.embed([text for _, text in group])
+            computed = {key: vector for (key, _), vector in zip(group, vectors)}
+            if self.cache:
+                self.cache.put_many(self.model, computed)
+            known.update(computed)
+        return [known[key] for key in keys]
+
+    def embed_one(self, text: str) -> list[float]:
+        return self.embed([text])[0]
+
+
+_embedder: CachedEmbedder | None = None
+_embedder_lock = threading.Lock()
+
+
+def make_embedder(name: str = EMBEDDER) -> Embedder:
+    if name.strip().lower() == "fake":
+        return FakeEmbedder()
+    return OpenAIEmbedder()
+
+
+def get_embedder() -> CachedEmbedder:
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                _embedder = CachedEmbedder(make_embedder(), EmbeddingCache())
+    return _embedder
@@ -0,0 +1,114 @@
+"""Merge per-collection hit lists into one ranking.
+
+Raw scores are not comparable across collections: hybrid scores are
+normalised within each collection's own result set (so every collection's
+best hit scores about 1.0), and semantic hits only carry a distance. Fusion
+therefore works on each list separately before merging:
+
+- ``minmax`` (default): min-max normalise each list's scores to [0, 1], then weight
+- ``raw``: raw score or ``1 / (1 + distance)``, times the weight; this is the
+  old global sort by score
+- ``rrf``: reciprocal rank fusion, ``weight / (k + rank)``; scale-free
+
+``minmax`` is the default because it puts every collection on the same scale
+while keeping the score gaps within a list, which ``rrf`` throws away. On the
+offline labelled queries in ``src/bench_fusion.py`` (fake embedder, hybrid,
+seed PDFs split into a user and a seed collection) ``raw`` still ranks best:
+MRR 0.767 against 0.692 for ``minmax`` and 0.688 for ``rrf``. Re-run the bench
+with real embeddings before switching the default.
+
+Weights default to ``SEARCH_WEIGHT_USER`` for per-user collections and
+``SEARCH_WEIGHT_SEED`` for the seed collection, both 1.0. Under ``rrf`` a
+weight is a strong lever: with k=60, a user weight of 1.2 ranks the user's
+top 13 hits above the seed's best and 1.05 its top 4; 1.01 only breaks
+ties between equal ranks. Use ``raw`` or ``minmax`` for proportional boosts.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Iterable
+
+import numpy as np
+
+
+SEARCH_FUSION = os.getenv("SEARCH_FUSION", "minmax").strip().lower()  # minmax | raw | rrf
+SEARCH_RRF_K = int(os.getenv("SEARCH_RRF_K", "60"))
+SEARCH_WEIGHT_USER = float(os.getenv("SEARCH_WEIGHT_USER", "1.0"))
+SEARCH_WEIGHT_SEED = float(os.getenv("SEARCH_WEIGHT_SEED", "1.0"))
+FUSION_METHODS = ("minmax", "raw", "rrf")
+
+
+def normalize_method(method: str | None) -> str:
+    value = (method or SEARCH_FUSION).strip().lower()
+    return value if value in FUSION_METHODS else FUSION_METHODS[0]
+
+
+def raw_score(hit: dict) -> float:
+    score = hit.get("score")
+    if isinstance(score, (int, float)):
+        return float(score)
+    distance = hit.get("distance")
+    if isinstance(distance, (int, float)):
+        return 1.0 / (1.0 + float(distance))
+    return 0.0
+
+
+def default_weights(collection_names: Iterable[str], seed_collection: str) -> dict[str, float]:
+    return {
+        name: SEARCH_WEIGHT_SEED if name == seed_collection else SEARCH_WEIGHT_USER
+        for name in collection_names
+    }
+
+
+def _list_scores(hits: list[dict], method: str, rrf_k: int) -> np.ndarray:
+    if method == "rrf":
+        return 1.0 / (rrf_k + np.arange(1, len(hits) + 1, dtype=np.float64))
+    scores = np.fromiter((raw_score(hit) for hit in hits), dtype=np.float64, count=len(hits))
+    if method == "minmax" and len(scores):
+        low, high = scores.min(), scores.max()
+        # A single hit (or a tie) carries no spread; treat it as a full-strength match.
+        scores = (scores - low) / (high - low) if high > low else np.ones_like(scores)
+    return scores
+
+
+def fuse(
+    hits_by_collection: dict[str, list[dict]],
+    limit: int,
+    method: str | None = None,
+    weights: dict[str, float] | None = None,
+    rrf_k: int = SEARCH_RRF_K,
+) -> list[dict]:
+    """Rank hits from several collections together; adds ``fused_score`` to each hit.
+
+    Each input list must already be ordered best-first, as Weaviate returns
+    it. Hits with the same id keep their best fused score.
+    """
+    method = normalize_method(method)
+    weights = weights or {}
+    hits: list[dict] = []
+    parts: list[np.ndarray] = []
+    for name, collection_hits in hits_by_collection.items():
+        if not collection_hits:
+            continue
+        for hit in collection_hits:
+            hit.setdefault("collection", name)
+        hits.extend(collection_hits)
+        parts.append(_list_scores(collection_hits, method, rrf_k) * weights.get(name, 1.0))
+    if not hits:
+        return []
+    scores = np.concatenate(parts)
+    order = np.argsort(-scores, kind="stable")
+    fused: list[dict] = []
+    seen: set[str] = set()
+    for position in order:
+        hit = hits[position]
+        key = hit.get("id") or f"{hit['collection']}:{position}"
+        if key in seen:
+            continue
+        seen.add(key)
+        hit["fused_score"] = round(float(scores[position]), 6)
+        fused.append(hit)
+        if len(fused) >= limit:
+            break
+    return fused
@@ -0,0 +1,159 @@
+"""Background ingestion jobs with a bounded queue and a fixed worker pool.
+
+Jobs are plain dicts so the API can return them as JSON. Each job goes
+queued -> running -> (retrying ->) done | failed. The handler receives the job
+and a ``progress(**fields)`` callback that merges fields into
+``job["progress"]``; progress starts empty on every attempt.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from typing import Callable
+
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "32"))
+INGEST_MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", "3"))
+INGEST_RETRY_DELAY_S = float(os.getenv("INGEST_RETRY_DELAY_S", "2.0"))
+INGEST_JOB_HISTORY = int(os.getenv("INGEST_JOB_HISTORY", "500"))
+
+
+class QueueFullError(RuntimeError):
+    pass
+
+
+class IngestJobQueue:
+    def __init__(
+        self,
+        handler: Callable[[dict, Callable[..., None]], dict],
+        workers: int = INGEST_WORKERS,
+        max_pending: int = INGEST_QUEUE_SIZE,
+        max_attempts: int = INGEST_MAX_ATTEMPTS,
+        retry_delay_s: float = INGEST_RETRY_DELAY_S,
+        history: int = INGEST_JOB_HISTORY,
+    ) -> None:
+        self._handler = handler
+        self._workers = max(1, workers)
+        self._max_attempts = max(1, max_attempts)
+        self._retry_delay_s = retry_delay_s
+        self._history = history
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_pending))
+        self._jobs: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self._workers):
+                thread = threading.Thread(
+                    target=self._run,
+                    name=f"ingest-worker-{index}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, params: dict) -> dict:
+        self.start()
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": "queued",
+            "params": dict(params),
+            "attempts": 0,
+            "progress": {},
+            "result": None,
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        with self._lock:
+            self._jobs[job["id"]] = job
+            self._prune()
+        try:
+            self._queue.put_nowait(job["id"])
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job["id"], None)
+            raise QueueFullError("Ingest queue is full")
+        return self.get(job["id"])
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job)
+            snapshot["progress"] = dict(job["progress"])
+            return snapshot
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def active(self) -> int:
+        """Jobs that are queued, running or waiting to retry."""
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job["status"] not in {"done", "failed"})
+
+    def _prune(self) -> None:
+        finished = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job["status"] in {"done", "failed"}
+        ]
+        excess = len(self._jobs) - self._history
+        for job_id in finished[: max(0, excess)]:
+            self._jobs.pop(job_id, None)
+
+    def _update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    def _run(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._process(job_id)
+            finally:
+                self._queue.task_done()
+
+    def _process(self, job_id: str) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return
+
+        def progress(**fields) -> None:
+            with self._lock:
+                job["progress"].update(fields)
+
+        while True:
+            with self._lock:
+                job["attempts"] += 1
+                job["status"] = "running"
+                # A retry starts over, so counts from the failed attempt would be stale.
+                job["progress"] = {}
+                job["started_at"] = job["started_at"] or time.time()
+            try:
+                result = self._handler(job, progress)
+            except Exception as exc:
+                traceback.print_exc()
+                if job["attempts"] < self._max_attempts:
+                    self._update(job_id, status="retrying", error=repr(exc))
+                    time.sleep(self._retry_delay_s * job["attempts"])
+                    continue
+                self._update(job_id, status="failed", error=repr(exc), finished_at=time.time())
+                return
+            self._update(job_id, status="done", result=result, error=None, finished_at=time.time())
+            return
@@ -0,0 +1,317 @@
+"""In-process vector + BM25 index used when Weaviate is unavailable.
+
+An index is a directory under ``LOCAL_INDEX_DIR/<collection>`` holding:
+
+- ``vectors.npy``: float32 matrix, L2-normalised rows, memory-mapped on load
+- ``docs.jsonl``: one object per row (id, title, content, source, created_at)
+- ``meta.json``: embedding model, dimensions, row count, build time
+
+The BM25 inverted index is rebuilt from ``docs.jsonl`` on load; for the seed
+collection that takes milliseconds. Results use the same dict shape as
+``weaviate_utils._format_results`` plus ``"backend": "local"``.
+
+Build one by mirroring Weaviate (keeps the exact stored vectors) or straight
+from PDFs with the configured embedder (no Weaviate needed; with
+``EMBEDDER=fake`` fully offline):
+
+    python src/local_index.py mirror
+    python src/local_index.py build-pdfs data/VSCHT/pdfs
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import re
+import shutil
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+import embeddings
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+LOCAL_INDEX_DIR = Path(os.getenv("LOCAL_INDEX_DIR", str(BASE_DIR / "local" / "local_index")))
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_DOC_FIELDS = ("id", "title", "content", "source", "created_at")
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall((text or "").casefold())
+
+
+def index_path(collection_name: str) -> Path:
+    safe = "".join(ch if ch.isalnum() or ch in {"-", "_"} else "_" for ch in collection_name)
+    return LOCAL_INDEX_DIR / safe
+
+
+def _min_max(scores: np.ndarray) -> np.ndarray:
+    if scores.size == 0:
+        return scores
+    low, high = float(scores.min()), float(scores.max())
+    if high - low <= 1e-12:
+        return np.zeros_like(scores)
+    return (scores - low) / (high - low)
+
+
+def _top_k(scores: np.ndarray, limit: int) -> np.ndarray:
+    limit = min(limit, scores.shape[0])
+    if limit <= 0:
+        return np.empty(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, limit - 1)[:limit]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class LocalIndex:
+    def __init__(self, docs: list[dict], vectors: np.ndarray, model: str) -> None:
+        self.docs = docs
+        self.vectors = vectors
+        self.model = model
+        self._build_bm25()
+
+    def _build_bm25(self) -> None:
+        postings: dict[str, tuple[list[int], list[int]]] = {}
+        lengths = np.zeros(len(self.docs), dtype=np.float32)
+        for row, doc in enumerate(self.docs):
+            tokens = tokenize(f"{doc.get('title', '')} {doc.get('content', '')}")
+            lengths[row] = len(tokens)
+            for token, count in Counter(tokens).items():
+                rows, counts = postings.setdefault(token, ([], []))
+                rows.append(row)
+                counts.append(count)
+        self._postings = {
+            token: (np.asarray(rows, dtype=np.int64), np.asarray(counts, dtype=np.float32))
+            for token, (rows, counts) in postings.items()
+        }
+        self._length_norm = (
+            1 - BM25_B + BM25_B * lengths / float(lengths.mean())
+            if len(self.docs)
+            else lengths
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "LocalIndex":
+        meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        with (path / "docs.jsonl").open("r", encoding="utf-8") as handle:
+            docs = [json.loads(line) for line in handle if line.strip()]
+        vectors = np.load(path / "vectors.npy", mmap_mode="r")
+        return cls(docs, vectors, meta.get("model", ""))
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_name(path.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        np.save(tmp / "vectors.npy", np.ascontiguousarray(self.vectors, dtype=np.float32))
+        with (tmp / "docs.jsonl").open("w", encoding="utf-8") as handle:
+            for doc in self.docs:
+                handle.write(json.dumps(doc, ensure_ascii=False) + "\n")
+        meta = {
+            "model": self.model,
+            "dims": int(self.vectors.shape[1]) if self.vectors.ndim == 2 else 0,
+            "count": len(self.docs),
+            "built_at": time.time(),
+        }
+        (tmp / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        old = path.with_name(path.name + ".old")
+        shutil.rmtree(old, ignore_errors=True)
+        if path.exists():
+            path.replace(old)
+        tmp.replace(path)
+        shutil.rmtree(old, ignore_errors=True)
+
+    def bm25_scores(self, query: str) -> np.ndarray:
+        scores = np.zeros(len(self.docs), dtype=np.float32)
+        total = len(self.docs)
+        for token in set(tokenize(query)):
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            rows, counts = posting
+            idf = math.log(1 + (total - len(rows) + 0.5) / (len(rows) + 0.5))
+            scores[rows] += idf * counts * (BM25_K1 + 1) / (counts + BM25_K1 * self._length_norm[rows])
+        return scores
+
+    def vector_scores(self, vector: list[float] | np.ndarray) -> np.ndarray | None:
+        query = np.asarray(vector, dtype=np.float32)
+        if self.vectors.ndim != 2 or query.shape[0] != self.vectors.shape[1]:
+            return None
+        norm = float(np.linalg.norm(query))
+        if norm == 0:
+            return None
+        return np.asarray(self.vectors @ (query / norm))
+
+    def _results(self, rows: np.ndarray, scores: np.ndarray, kind: str) -> list[dict]:
+        results = []
+        for row in rows:
+            doc = self.docs[int(row)]
+            value = float(scores[row])
+            results.append(
+                {
+                    **{field: doc.get(field, "") for field in _DOC_FIELDS},
+                    "distance": 1.0 - value if kind == "distance" else None,
+                    "score": value if kind == "score" else None,
+                    "backend": "local",
+                }
+            )
+        return results
+
+    def search_keyword(self, query: str, limit: int = 10) -> list[dict]:
+        scores = self.bm25_scores(query)
+        rows = [row for row in _top_k(scores, limit) if scores[row] > 0]
+        return self._results(np.asarray(rows, dtype=np.int64), scores, "score")
+
+    def search_semantic(self, vector: list[float] | None, limit: int = 5) -> list[dict]:
+        scores = self.vector_scores(vector) if vector is not None else None
+        if scores is None:
+            return []
+        return self._results(_top_k(scores, limit), scores, "distance")
+
+    def search_hybrid(
+        self,
+        query: str,
+        vector: list[float] | None,
+        limit: int = 10,
+        alpha: float = 0.7,
+    ) -> list[dict]:
+        """Relative-score fusion, as Weaviate's default hybrid ranking does."""
+        keyword = _min_max(self.bm25_scores(query))
+        semantic = self.vector_scores(vector) if vector is not None else None
+        if semantic is None:
+            fused = keyword
+        else:
+            fused = alpha * _min_max(semantic) + (1 - alpha) * keyword
+        return self._results(_top_k(fused, limit), fused, "score")
+
+    def query_vector(self, query: str) -> list[float] | None:
+        """Embed ``query`` with this index's model, or ``None`` if it is not the configured one."""
+        embedder = embeddings.get_embedder()
+        if embedder.model != self.model:
+            return None
+        return embedder.embed_one(query)
+
+
+_loaded: dict[str, tuple[float, LocalIndex]] = {}
+_loaded_lock = threading.Lock()
+
+
+def get_index(collection_name: str) -> LocalIndex | None:
+    """Load (and cache until its files change) the index for ``collection_name``."""
+    path = index_path(collection_name)
+    try:
+        stamp = (path / "meta.json").stat().st_mtime
+    except OSError:
+        return None
+    with _loaded_lock:
+        cached = _loaded.get(collection_name)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        index = LocalIndex.load(path)
+        _loaded[collection_name] = (stamp, index)
+        return index
+
+
+def has_index(collection_name: str) -> bool:
+    return (index_path(collection_name) / "meta.json").exists()
+
+
+def build_index(items: Iterable[dict], model: str, vectors: Iterable[list[float]]) -> LocalIndex:
+    docs = [{field: item.get(field, "") for field in _DOC_FIELDS} for item in items]
+    matrix = np.asarray(list(vectors), dtype=np.float32)
+    if matrix.size:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1.0, norms)
+    else:
+        matrix = matrix.reshape(0, 0)
+    return LocalIndex(docs, matrix, model)
+
+
+def mirror_collection(collection_name: str) -> int:
+    """Copy a Weaviate collection (properties and stored vectors) to disk."""
+    import weaviate_utils
+
+    items, vectors = [], []
+    with weaviate_utils.pooled_client() as client:
+        collection = weaviate_utils._open_collection(client, collection_name)
+        for obj in collection.iterator(include_vector=True):
+            vector = obj.vector
+            if isinstance(vector, dict):
+                vector = vector.get("default") or next(iter(vector.values()), None)
+            if not vector:
+                continue
+            props = obj.properties or {}
+            created_at = props.get(weaviate_utils.DOC_CREATED_AT_FIELD, "")
+            items.append(
+                {
+                    "id": str(obj.uuid),
+                    "title": props.get(weaviate_utils.DOC_TITLE_FIELD, ""),
+                    "content": props.get(weaviate_utils.DOC_CONTENT_FIELD, ""),
+                    "source": props.get(weaviate_utils.DOC_SOURCE_FIELD, ""),
+                    "created_at": created_at.isoformat() if hasattr(created_at, "isoformat") else created_at,
+                }
+            )
+            vectors.append(vector)
+    if weaviate_utils.uses_client_vectors():
+        model = embeddings.get_embedder().model
+    else:
+        # text2vec-openai model; EMBEDDING_MODEL defaults to the same name for queries.
+        model = weaviate_utils.WEAVIATE_OPENAI_MODEL
+    build_index(items, model, vectors).save(index_path(collection_name))
+    return len(items)
+
+
+def build_from_pdfs(pdf_dir: Path, collection_name: str) -> int:
+    """Chunk PDFs exactly like ingestion and embed them locally."""
+    import pdf_ingest
+    import weaviate_utils
+
+    items = []
+    for pdf_path in sorted(pdf_dir.glob("*.pdf")):
+        for chunk in pdf_ingest.chunk_pdf(pdf_path):
+            properties = weaviate_utils._document_properties(chunk)
+            items.append(
+                {
+                    **chunk,
+                    "id": weaviate_utils.chunk_uuid(
+                        collection_name, chunk["source"], properties[weaviate_utils.DOC_CHUNK_HASH_FIELD]
+                    ),
+                    "created_at": properties.get(weaviate_utils.DOC_CREATED_AT_FIELD, ""),
+                }
+            )
+    embedder = embeddings.get_embedder()
+    vectors = embedder.embed([f"{item['title']}\n{item['content']}" for item in items])
+    build_index(items, embedder.model, vectors).save(index_path(collection_name))
+    return len(items)
+
+
+def main() -> None:
+    import weaviate_utils
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["mirror", "build-pdfs"])
+    parser.add_argument("pdf_dir", nargs="?", type=Path, default=BASE_DIR / "data" / "VSCHT" / "pdfs")
+    parser.add_argument("--collection", default=weaviate_utils.seed_collection_name())
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == "mirror":
+        count = mirror_collection(args.collection)
+    else:
+        count = build_from_pdfs(args.pdf_dir, args.collection)
+    print(
+        f"Wrote {count} chunks for {args.collection} to {index_path(args.collection)} "
+        f"in {time.perf_counter() - started:.2f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
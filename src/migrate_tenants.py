@@ -0,0 +1,69 @@
+"""Copy per-user ``user_*`` collections into tenants of the shared collection.
+
+Objects keep their UUIDs and stored vectors, so nothing is re-embedded. Run
+with ``--delete`` to drop each source collection once it copied cleanly, then
+set ``WEAVIATE_STORAGE_LAYOUT=tenant`` for the agent and API.
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from weaviate.classes.tenants import Tenant
+
+import weaviate_utils
+
+
+def migrate_collection(client, name: str, tenant_name: str, batch_size: int) -> tuple[int, int]:
+    target_name = weaviate_utils.tenant_collection_name()
+    weaviate_utils._verify_collection(client, target_name, multi_tenant=True)
+    target = client.collections.use(target_name)
+    if not target.tenants.exists(tenant_name):
+        target.tenants.create([Tenant(name=tenant_name)])
+    tenant = target.with_tenant(tenant_name)
+    source = client.collections.use(name)
+    copied = 0
+    with tenant.batch.fixed_size(batch_size=batch_size) as batch:
+        for obj in source.iterator(include_vector=True):
+            batch.add_object(properties=obj.properties, uuid=obj.uuid, vector=obj.vector)
+            copied += 1
+    failed = len(tenant.batch.failed_objects)
+    for error in tenant.batch.failed_objects[:5]:
+        print(f"  failed: {error.message}")
+    return copied, failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--delete", action="store_true", help="drop source collections after a clean copy")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    target_name = weaviate_utils.tenant_collection_name()
+    names = [
+        name
+        for name in weaviate_utils.list_collections()
+        if name.lower().startswith(weaviate_utils.USER_COLLECTION_PREFIX) and name != target_name
+    ]
+    if not names:
+        print("No per-user collections found.")
+        return
+    with weaviate_utils.pooled_client() as client:
+        for name in names:
+            # Weaviate capitalises collection names; tenants keep the lowercase user key.
+            tenant_name = name[0].lower() + name[1:]
+            if args.dry_run:
+                count = client.collections.use(name).aggregate.over_all(total_count=True).total_count
+                print(f"{name} -> {target_name}/{tenant_name} ({count} objects)")
+                continue
+            copied, failed = migrate_collection(client, name, tenant_name, args.batch_size)
+            print(f"{name} -> {target_name}/{tenant_name}: copied={copied} failed={failed}")
+            if failed == 0 and args.delete:
+                client.collections.delete(name)
+                print(f"  deleted {name}")
+            weaviate_utils.invalidate_collection_cache(tenant_name)
+
+
+if __name__ == "__main__":
+    main()
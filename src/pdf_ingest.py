@@ -1,16 +1,36 @@
 from __future__ import annotations
 
+import multiprocessing
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Iterable, Iterator
 
 import pymupdf
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+import structured_chunker
 import weaviate_utils
 
 
 CHUNK_SIZE = 3600
 CHUNK_OVERLAP = 600
+# "structured": section-aware chunks (structured_chunker.py); "page": split each page on its own.
+PDF_CHUNKER = os.getenv("PDF_CHUNKER", "structured").strip().lower()
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "1"))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+# Chunks buffered between extraction and the Weaviate batch writer.
+PDF_PIPELINE_BUFFER = int(os.getenv("PDF_PIPELINE_BUFFER", "256"))
+
+
+def _make_splitter() -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+    )
 
 
 def _normalize_text(text: str) -> str:
@@ -29,23 +49,34 @@ def _normalize_text(text: str) -> str:
     return "\n".join(cleaned).strip()
 
 
-def extract_pages_text(pdf_path: Path) -> list[tuple[int, str]]:
-    pages: list[tuple[int, str]] = []
+def iter_pages_text(
+    pdf_path: Path,
+    progress: Callable[..., None] | None = None,
+) -> Iterator[tuple[int, str]]:
     with pymupdf.open(pdf_path) as doc:
+        if progress:
+            progress(pages_total=doc.page_count, pages_done=0)
         for page_index, page in enumerate(doc, start=1):
             text = page.get_text("text", sort=True)
             text = _normalize_text(text)
             if text:
-                pages.append((page_index, text))
-    return pages
+                yield page_index, text
+            if progress:
+                progress(pages_done=page_index)
 
 
-def build_chunks(
+def extract_pages_text(
+    pdf_path: Path,
+    progress: Callable[..., None] | None = None,
+) -> list[tuple[int, str]]:
+    return list(iter_pages_text(pdf_path, progress=progress))
+
+
+def iter_chunks(
     pdf_path: Path,
     pages: Iterable[tuple[int, str]],
     splitter: RecursiveCharacterTextSplitter,
-) -> list[dict]:
-    items: list[dict] = []
+) -> Iterator[dict]:
     for page_index, text in pages:
         if not text:
             continue
@@ -55,28 +86,193 @@ def build_chunks(
             if not chunk:
                 continue
             content = f"# {pdf_path.stem}\n\n{chunk}".strip()
-            items.append(
-                {
-                    "title": f"{pdf_path.stem} p{page_index} c{chunk_index}",
-                    "content": content,
-                    "source": f"{pdf_path}#page={page_index}",
-                }
-            )
-    return items
-
-
-def ingest_pdf_file(pdf_path: Path, collection_name: str) -> dict:
-    pages = extract_pages_text(pdf_path)
-    if not pages:
-        return {"chunks": 0, "pages": 0, "source_base": str(pdf_path)}
-
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=CHUNK_SIZE,
-        chunk_overlap=CHUNK_OVERLAP,
-    )
-    items = build_chunks(pdf_path, pages, splitter)
-    if not items:
-        return {"chunks": 0, "pages": len(pages), "source_base": str(pdf_path)}
+            yield {
+                "title": f"{pdf_path.stem} p{page_index} c{chunk_index}",
+                "content": content,
+                "source": f"{pdf_path}#page={page_index}",
+            }
+
+
+def build_chunks(
+    pdf_path: Path,
+    pages: Iterable[tuple[int, str]],
+    splitter: RecursiveCharacterTextSplitter,
+) -> list[dict]:
+    return list(iter_chunks(pdf_path, pages, splitter))
+
+
+def _chunk_page_range(pdf_path: str, start: int, stop: int) -> list[tuple[int, list[dict]]]:
+    # Runs in a worker process: opens its own document handle and splitter.
+    path = Path(pdf_path)
+    splitter = _make_splitter()
+    pages: list[tuple[int, list[dict]]] = []
+    with pymupdf.open(path) as doc:
+        for page_number in range(start, stop):
+            text = _normalize_text(doc.load_page(page_number).get_text("text", sort=True))
+            if text:
+                page_index = page_number + 1
+                pages.append((page_index, build_chunks(path, [(page_index, text)], splitter)))
+    return pages
 
-    uploaded = weaviate_utils.upload_texts(items, collection_name=collection_name)
-    return {"chunks": uploaded, "pages": len(pages), "source_base": str(pdf_path)}
+
+def iter_chunks_parallel(
+    pdf_path: Path,
+    workers: int,
+    pages_per_task: int = PDF_PAGES_PER_TASK,
+    progress: Callable[..., None] | None = None,
+) -> Iterator[tuple[int, list[dict]]]:
+    """Extract and split page ranges in a process pool.
+
+    Yields ``(page_index, chunks)`` for every non-empty page, in page order.
+    At most ``2 * workers`` ranges are in flight, so memory stays bounded when
+    the consumer is slower than extraction.
+    """
+    with pymupdf.open(pdf_path) as doc:
+        page_count = doc.page_count
+    if progress:
+        progress(pages_total=page_count, pages_done=0)
+    step = max(1, pages_per_task)
+    if workers <= 1 or page_count <= step:
+        # Not worth the process start-up cost for short documents.
+        yield from _chunk_page_range(str(pdf_path), 0, page_count)
+        if progress:
+            progress(pages_done=page_count)
+        return
+    window = 2 * workers
+    pending: deque = deque()
+    # Spawn, not fork: the API process holds gRPC channels and worker threads.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        for start in range(0, page_count, step):
+            stop = min(start + step, page_count)
+            pending.append((stop, pool.submit(_chunk_page_range, str(pdf_path), start, stop)))
+            if len(pending) < window:
+                continue
+            done_stop, future = pending.popleft()
+            yield from future.result()
+            if progress:
+                progress(pages_done=done_stop)
+        while pending:
+            done_stop, future = pending.popleft()
+            yield from future.result()
+            if progress:
+                progress(pages_done=done_stop)
+
+
+def iter_page_chunks(
+    pdf_path: Path,
+    workers: int = 1,
+    progress: Callable[..., None] | None = None,
+    chunker: str | None = None,
+) -> Iterator[tuple[int, list[dict]]]:
+    if (chunker or PDF_CHUNKER) == "structured":
+        # Sections run across pages, so this walks the document in order; workers do not apply.
+        yield from structured_chunker.iter_structured_chunks(pdf_path, progress=progress)
+        return
+    if workers > 1:
+        yield from iter_chunks_parallel(pdf_path, workers, progress=progress)
+        return
+    splitter = _make_splitter()
+    for page_index, text in iter_pages_text(pdf_path, progress=progress):
+        yield page_index, build_chunks(pdf_path, [(page_index, text)], splitter)
+
+
+def chunk_pdf(pdf_path: Path, chunker: str | None = None) -> list[dict]:
+    """All chunks of ``pdf_path`` exactly as ingestion would produce them."""
+    return [chunk for _, chunks in iter_page_chunks(pdf_path, chunker=chunker) for chunk in chunks]
+
+
+_END = object()
+
+
+def _prefetch(items: Iterable, maxsize: int) -> Iterator:
+    """Run ``items`` in a producer thread behind a bounded queue.
+
+    Extraction overlaps with the consumer (the batch writer) while the queue
+    size caps how far it can run ahead. Producer errors re-raise here.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+
+    def put(value) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_END)
+        except BaseException as exc:
+            put(exc)
+        finally:
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=produce, name="pdf-ingest-producer", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def ingest_pdf_file(
+    pdf_path: Path,
+    collection_name: str,
+    progress: Callable[..., None] | None = None,
+    workers: int | None = None,
+) -> dict:
+    """Stream pages -> chunks -> Weaviate batches without holding the document.
+
+    Batches are flushed as they fill, so early pages are searchable while
+    later ones are still being extracted.
+    """
+    workers = PDF_WORKERS if workers is None else workers
+    counts = {"pages": 0, "chunks": 0}
+
+    def chunks() -> Iterator[dict]:
+        for _, page_chunks in iter_page_chunks(pdf_path, workers=workers, progress=progress):
+            counts["pages"] += 1
+            for chunk in page_chunks:
+                counts["chunks"] += 1
+                yield chunk
+            if progress:
+                progress(chunks_done=counts["chunks"])
+
+    report = weaviate_utils.ingest_texts(
+        _prefetch(chunks(), PDF_PIPELINE_BUFFER),
+        collection_name=collection_name,
+    )
+    if not counts["chunks"]:
+        return {
+            "chunks": 0,
+            "deleted": report["deleted"],
+            "pages": counts["pages"],
+            "source_base": str(pdf_path),
+        }
+    return {
+        "chunks": report["inserted"],
+        "skipped": report["skipped"],
+        "updated": report["updated"],
+        "deleted": report["deleted"],
+        "failed": report["failed"],
+        "errors": report["errors"],
+        "objects_per_s": report["objects_per_s"],
+        "pages": counts["pages"],
+        "source_base": str(pdf_path),
+    }
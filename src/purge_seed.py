@@ -3,11 +3,9 @@ import weaviate_utils
 
 def main() -> None:
     seed_collection = weaviate_utils.seed_collection_name()
-    with weaviate_utils.connect_client() as client:
-        if not client.collections.exists(seed_collection):
-            print(f"Seed collection not found: {seed_collection}")
-            return
-        client.collections.delete(seed_collection)
+    if not weaviate_utils.delete_collection(seed_collection):
+        print(f"Seed collection not found: {seed_collection}")
+        return
     print(f"Deleted seed collection: {seed_collection}")
 
 
@@ -0,0 +1,174 @@
+"""Rerank stage between search and the realtime model.
+
+With ``RERANK_ENABLED`` the agent over-fetches ``limit * RERANK_OVERFETCH``
+candidates, reorders them with a scorer and keeps the best ``limit``;
+``snippets`` then cuts those down to the response's character budget.
+
+Scorers (``RERANK_SCORER``):
+
+- ``lexical``: BM25 over the candidate set with prefix-stemmed terms; no
+  dependencies, well under a millisecond
+- ``cross-encoder``: a ``sentence_transformers.CrossEncoder``
+  (``RERANK_MODEL``) on CPU; optional, falls back to ``lexical`` if the
+  package or model is unavailable
+
+Scoring runs in a worker thread under ``RERANK_TIMEOUT_S``; when it does not
+finish in time the original search order is kept.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from typing import Protocol
+
+
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "1").strip().lower() not in {"0", "false", "no"}
+RERANK_SCORER = os.getenv("RERANK_SCORER", "lexical")  # lexical | cross-encoder
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1")
+RERANK_OVERFETCH = int(os.getenv("RERANK_OVERFETCH", "3"))
+RERANK_MAX_CANDIDATES = int(os.getenv("RERANK_MAX_CANDIDATES", "20"))
+RERANK_TIMEOUT_S = float(os.getenv("RERANK_TIMEOUT_S", "0.15"))
+# Prefix length used as a stemmer; Czech inflects mostly at the word end.
+RERANK_STEM_CHARS = 5
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def terms(text: str) -> list[str]:
+    words = _WORD_RE.findall(unicodedata.normalize("NFKC", text or "").casefold())
+    return [word[:RERANK_STEM_CHARS] for word in words if len(word) > 1]
+
+
+def candidate_count(limit: int) -> int:
+    """How many hits to fetch so the reranker has something to choose from."""
+    if not RERANK_ENABLED:
+        return limit
+    return max(limit, min(limit * RERANK_OVERFETCH, RERANK_MAX_CANDIDATES))
+
+
+def _passage_text(hit: dict) -> str:
+    return f"{hit.get('title', '')}\n{hit.get('content', '')}"
+
+
+class Scorer(Protocol):
+    name: str
+
+    def score(self, query: str, texts: list[str]) -> list[float]:
+        ...
+
+
+class LexicalScorer:
+    """BM25 with the candidates as the corpus; rare query terms weigh most."""
+
+    name = "lexical"
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+
+    def score(self, query: str, texts: list[str]) -> list[float]:
+        query_terms = set(terms(query))
+        docs = [Counter(terms(text)) for text in texts]
+        if not query_terms or not docs:
+            return [0.0] * len(texts)
+        lengths = [sum(doc.values()) for doc in docs]
+        average = sum(lengths) / len(lengths) or 1.0
+        scores = []
+        for doc, length in zip(docs, lengths):
+            total = 0.0
+            for term in query_terms:
+                count = doc.get(term, 0)
+                if not count:
+                    continue
+                frequency = sum(1 for other in docs if term in other)
+                idf = math.log(1 + (len(docs) - frequency + 0.5) / (frequency + 0.5))
+                total += idf * count * (self.k1 + 1) / (count + self.k1 * (1 - self.b + self.b * length / average))
+            scores.append(total)
+        return scores
+
+
+class CrossEncoderScorer:
+    name = "cross-encoder"
+
+    def __init__(self, model: str = RERANK_MODEL) -> None:
+        from sentence_transformers import CrossEncoder
+
+        self.model = model
+        self._encoder = CrossEncoder(model, device="cpu")
+
+    def score(self, query: str, texts: list[str]) -> list[float]:
+        return [float(value) for value in self._encoder.predict([(query, text) for text in texts])]
+
+
+def make_scorer(name: str = RERANK_SCORER) -> Scorer:
+    if name.strip().lower() in {"cross-encoder", "cross_encoder", "crossencoder"}:
+        try:
+            return CrossEncoderScorer()
+        except Exception as exc:
+            print(f"[rerank] cross-encoder unavailable ({exc!r}); using lexical scorer")
+    return LexicalScorer()
+
+
+_scorer: Scorer | None = None
+_scorer_lock = threading.Lock()
+
+
+def get_scorer() -> Scorer:
+    """Shared scorer; load it in prewarm so a model download never hits a turn."""
+    global _scorer
+    if _scorer is None:
+        with _scorer_lock:
+            if _scorer is None:
+                _scorer = make_scorer()
+    return _scorer
+
+
+def rerank(query: str, hits: list[dict], limit: int, scorer: Scorer | None = None) -> list[dict]:
+    """Best ``limit`` hits by scorer; ties keep search order. Adds ``rerank_score``."""
+    scorer = scorer or get_scorer()
+    scores = scorer.score(query, [_passage_text(hit) for hit in hits])
+    order = sorted(range(len(hits)), key=lambda position: (-scores[position], position))
+    ranked = []
+    for position in order[:limit]:
+        hit = dict(hits[position])
+        hit["rerank_score"] = round(scores[position], 4)
+        ranked.append(hit)
+    return ranked
+
+
+async def rerank_hits(
+    query: str,
+    hits: list[dict],
+    limit: int,
+    timeout_s: float = RERANK_TIMEOUT_S,
+) -> tuple[list[dict], dict]:
+    """Rerank within ``timeout_s``, else keep the search order.
+
+    Returns ``(hits, info)`` with ``info = {"reranked", "scorer", "ms",
+    "candidates"}``.
+    """
+    started = time.perf_counter()
+    scorer = get_scorer()
+    info = {
+        "reranked": False,
+        "scorer": scorer.name,
+        "candidates": len(hits),
+    }
+    ranked = hits[:limit]
+    if len(hits) > 1:
+        try:
+            ranked = await asyncio.wait_for(asyncio.to_thread(rerank, query, hits, limit, scorer), timeout_s)
+            info["reranked"] = True
+        except asyncio.TimeoutError:
+            print(f"[rerank] {scorer.name} exceeded {timeout_s * 1000:.0f} ms; keeping search order")
+        except Exception as exc:
+            print(f"[rerank] {scorer.name} failed: {exc!r}; keeping search order")
+    info["ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return ranked, info
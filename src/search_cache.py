@@ -0,0 +1,225 @@
+"""LRU/TTL cache for ``search_across_collections`` results.
+
+Keys are the normalised query text plus collection set, search mode and
+limit. When query vectors are available, a miss can still be served by a
+cached query whose embedding is within ``near_threshold`` cosine similarity;
+vectors are stored unit-normalised so that check is one matrix product over
+the candidate entries.
+
+The API (which ingests) and the agent (which searches) are separate
+processes, so invalidation goes through a per-collection marker file under
+``local/``: every write bumps the marker's mtime and entries recorded against
+an older generation are dropped on lookup.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "1").strip().lower() not in {"0", "false", "no"}
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "256"))
+SEARCH_CACHE_TTL_S = float(os.getenv("SEARCH_CACHE_TTL_S", "600"))
+# Cosine similarity for near-duplicate hits; 0 disables them.
+SEARCH_CACHE_NEAR_THRESHOLD = float(os.getenv("SEARCH_CACHE_NEAR_THRESHOLD", "0.97"))
+SEARCH_CACHE_MARKER_DIR = Path(
+    os.getenv("SEARCH_CACHE_MARKER_DIR", str(BASE_DIR / "local" / "search_cache"))
+)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize_query(query: str) -> str:
+    text = unicodedata.normalize("NFKC", query or "").casefold()
+    return " ".join(_WORD_RE.findall(text))
+
+
+def _unit(vector: list[float] | None) -> np.ndarray | None:
+    if vector is None:
+        return None
+    array = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    return array / norm if norm else None
+
+
+def _marker_path(collection_name: str) -> Path:
+    safe = "".join(ch if ch.isalnum() or ch in {"-", "_"} else "_" for ch in collection_name)
+    return SEARCH_CACHE_MARKER_DIR / f"{safe}.gen"
+
+
+def collection_generation(collection_name: str) -> int:
+    try:
+        return _marker_path(collection_name).stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def bump_generation(collection_name: str) -> None:
+    path = _marker_path(collection_name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    # Two bumps within the filesystem's mtime granularity must still differ.
+    now = time.time_ns()
+    if path.stat().st_mtime_ns < now:
+        os.utime(path, ns=(now, now))
+
+
+class SearchCache:
+    def __init__(
+        self,
+        max_entries: int = SEARCH_CACHE_SIZE,
+        ttl_s: float = SEARCH_CACHE_TTL_S,
+        near_threshold: float = SEARCH_CACHE_NEAR_THRESHOLD,
+    ) -> None:
+        self._max_entries = max(1, max_entries)
+        self._ttl_s = ttl_s
+        self._near_threshold = near_threshold
+        self._entries: OrderedDict[tuple, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "near_hits": 0, "misses": 0, "invalidations": 0, "latency_saved_s": 0.0}
+
+    @staticmethod
+    def make_key(query: str, collections: Iterable[str], mode: str, limit: int) -> tuple:
+        return (normalize_query(query), tuple(sorted(set(collections))), mode, int(limit))
+
+    def _is_fresh(self, entry: dict, now: float, generations: dict[str, int]) -> bool:
+        if now - entry["stored_at"] > self._ttl_s:
+            return False
+        return all(
+            generations.get(name, 0) == generation
+            for name, generation in entry["generations"].items()
+        )
+
+    def _serve(self, key: tuple, entry: dict, stat: str) -> list[dict]:
+        self._entries.move_to_end(key)
+        self._stats[stat] += 1
+        self._stats["latency_saved_s"] += entry["latency_s"]
+        return [dict(hit) for hit in entry["results"]]
+
+    def get(
+        self,
+        query: str,
+        collections: Iterable[str],
+        mode: str,
+        limit: int,
+        vector: list[float] | None = None,
+        generations: dict[str, int] | None = None,
+    ) -> list[dict] | None:
+        """Cached results for an equal or near-duplicate query, else None.
+
+        ``generations`` is the current marker state of ``collections``; pass it
+        when the caller already has it, otherwise every marker is read once here.
+        """
+        key = self.make_key(query, collections, mode, limit)
+        if generations is None:
+            generations = {name: collection_generation(name) for name in key[1]}
+        unit = _unit(vector) if self._near_threshold > 0 else None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._is_fresh(entry, now, generations):
+                    return self._serve(key, entry, "hits")
+                del self._entries[key]
+            if unit is not None:
+                candidates = []
+                for other_key, other in list(self._entries.items()):
+                    if other_key[1:] != key[1:] or other["vector"] is None:
+                        continue
+                    if not self._is_fresh(other, now, generations):
+                        del self._entries[other_key]
+                        continue
+                    if other["vector"].shape == unit.shape:
+                        candidates.append(other_key)
+                if candidates:
+                    matrix = np.stack([self._entries[other_key]["vector"] for other_key in candidates])
+                    scores = matrix @ unit
+                    best = int(np.argmax(scores))
+                    if scores[best] >= self._near_threshold:
+                        best_key = candidates[best]
+                        return self._serve(best_key, self._entries[best_key], "near_hits")
+            self._stats["misses"] += 1
+            return None
+
+    def put(
+        self,
+        query: str,
+        collections: Iterable[str],
+        mode: str,
+        limit: int,
+        results: list[dict],
+        latency_s: float,
+        vector: list[float] | None = None,
+        generations: dict[str, int] | None = None,
+    ) -> None:
+        collections = list(collections)
+        key = self.make_key(query, collections, mode, limit)
+        if generations is None:
+            generations = {name: collection_generation(name) for name in collections}
+        with self._lock:
+            self._entries[key] = {
+                "results": [dict(hit) for hit in results],
+                "latency_s": latency_s,
+                "vector": _unit(vector),
+                "generations": generations,
+                "stored_at": time.monotonic(),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, collection_name: str | None = None) -> None:
+        with self._lock:
+            if collection_name is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if collection_name in key[1]]:
+                    del self._entries[key]
+            self._stats["invalidations"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["near_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["near_hits"]) / lookups if lookups else 0.0
+        stats["latency_saved_s"] = round(stats["latency_saved_s"], 3)
+        return stats
+
+
+_cache: SearchCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache | None:
+    global _cache
+    if not SEARCH_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SearchCache()
+    return _cache
+
+
+def invalidate(collection_name: str | None = None) -> None:
+    """Drop cached results for ``collection_name`` here and in other processes."""
+    if collection_name is not None:
+        bump_generation(collection_name)
+    if _cache is not None:
+        _cache.invalidate(collection_name)
+
+
+def cache_stats() -> dict:
+    cache = get_search_cache()
+    return cache.stats() if cache is not None else {}
@@ -1,5 +1,6 @@
 from pathlib import Path
 
+import local_index
 import pdf_ingest
 import weaviate_utils
 
@@ -18,7 +19,14 @@ def main() -> None:
     for pdf_path in pdf_paths:
         result = pdf_ingest.ingest_pdf_file(pdf_path, collection_name=SEED_COLLECTION)
         total_chunks += int(result.get("chunks", 0))
+        print(
+            f"{pdf_path.name}: {result.get('chunks', 0)} inserted, "
+            f"{result.get('skipped', 0)} unchanged, {result.get('deleted', 0)} deleted, "
+            f"{result.get('failed', 0)} failed, {result.get('objects_per_s', 0.0)} objects/s"
+        )
     print(f"Seeded {len(pdf_paths)} PDFs into {SEED_COLLECTION} ({total_chunks} chunks).")
+    mirrored = local_index.mirror_collection(SEED_COLLECTION)
+    print(f"Mirrored {mirrored} chunks to {local_index.index_path(SEED_COLLECTION)} for offline fallback.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,143 @@
+"""Query-focused snippets so a tool response stays within a character budget.
+
+Every hit's ``content`` is split into units: lines, further split into
+sentences. A unit scores the IDF-weighted sum of the query terms it
+contains, with IDF computed over all units in the response, so a faculty
+name that appears everywhere counts less than "hodiny". The best units are
+taken with up to ``SNIPPET_FOLLOW_UNITS`` following units, because answers
+often sit under a matching heading ("Úřední hodiny" followed by one line per
+day). Adjacent picks are merged and kept in document order; gaps are marked
+with "…".
+
+The budget ``SNIPPET_MAX_CHARS`` covers the whole response. Hits are
+processed in rank order, each may use an equal share of what is left, and
+unused budget rolls over to the next hit.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+from collections import Counter
+
+from rerank import terms
+
+
+SNIPPET_ENABLED = os.getenv("SNIPPET_ENABLED", "1").strip().lower() not in {"0", "false", "no"}
+SNIPPET_MAX_CHARS = int(os.getenv("SNIPPET_MAX_CHARS", "2000"))
+SNIPPET_FOLLOW_UNITS = int(os.getenv("SNIPPET_FOLLOW_UNITS", "5"))
+# A hit gets at least this much, or is dropped once the budget cannot cover it.
+SNIPPET_MIN_CHARS = 160
+GAP = "…"
+
+# Split after a full word only, so dates like "05. 01. 2026" stay whole.
+_SENTENCE_RE = re.compile(r"(?<=[a-záčďéěíňóřšťúůýž]{3}[.!?])\s+(?=[A-ZÁČĎÉĚÍŇÓŘŠŤÚŮÝŽ])")
+# Academic titles and the like end in a period but do not end a sentence.
+_ABBREVIATIONS = {"doc.", "prof.", "ing.", "mgr.", "tel.", "apod.", "atd.", "resp.", "např.", "tzv."}
+
+
+def split_units(text: str) -> list[str]:
+    units = []
+    for line in (text or "").splitlines():
+        line = " ".join(line.split())
+        if not line:
+            continue
+        parts: list[str] = []
+        for part in _SENTENCE_RE.split(line):
+            if parts and parts[-1].rsplit(" ", 1)[-1].casefold() in _ABBREVIATIONS:
+                parts[-1] = f"{parts[-1]} {part}"
+            else:
+                parts.append(part)
+        units.extend(parts)
+    return units
+
+
+def _unit_scores(query_terms: set[str], units: list[str], idf: dict[str, float]) -> list[float]:
+    return [sum(idf.get(term, 0.0) for term in query_terms & set(terms(unit))) for unit in units]
+
+
+def extract(query: str, text: str, max_chars: int, idf: dict[str, float] | None = None) -> str:
+    """The highest-scoring units of ``text`` (plus what follows them) within ``max_chars``."""
+    units = split_units(text)
+    if not units or max_chars <= 0:
+        return ""
+    query_terms = set(terms(query))
+    if idf is None:
+        idf = _idf([units], query_terms)
+    scores = _unit_scores(query_terms, units, idf)
+    ranked = sorted((i for i, score in enumerate(scores) if score > 0), key=lambda i: (-scores[i], i))
+    # Without any match fall back to the lead, which names the document.
+    ranked = ranked or [0]
+
+    picked: list[int] = []
+    used = 0
+    for anchor in ranked:
+        for position in range(anchor, min(len(units), anchor + 1 + SNIPPET_FOLLOW_UNITS)):
+            if position in picked:
+                continue
+            cost = len(units[position]) + 1
+            if used + cost > max_chars:
+                break
+            picked.append(position)
+            used += cost
+    if not picked:
+        return units[ranked[0]][: max(0, max_chars - len(GAP))] + GAP
+    snippet = _render(units, picked)
+    # Gap markers are not budgeted above; drop the last picks until they fit.
+    while len(snippet) > max_chars and len(picked) > 1:
+        picked.pop()
+        snippet = _render(units, picked)
+    return snippet[:max_chars]
+
+
+def _render(units: list[str], picked: list[int]) -> str:
+    parts: list[str] = [GAP] if min(picked) > 0 else []
+    previous = -1
+    for position in sorted(picked):
+        if previous >= 0 and position != previous + 1:
+            parts.append(GAP)
+        parts.append(units[position])
+        previous = position
+    if previous < len(units) - 1:
+        parts.append(GAP)
+    return "\n".join(parts)
+
+
+def _idf(unit_lists: list[list[str]], query_terms: set[str]) -> dict[str, float]:
+    counts: Counter[str] = Counter()
+    total = 0
+    for units in unit_lists:
+        for unit in units:
+            counts.update(query_terms & set(terms(unit)))
+            total += 1
+    return {term: math.log(1 + (total - count + 0.5) / (count + 0.5)) for term, count in counts.items()}
+
+
+def select_snippets(query: str, hits: list[dict], max_chars: int = SNIPPET_MAX_CHARS) -> tuple[list[dict], dict]:
+    """Replace each hit's ``content`` with a snippet; all snippets fit ``max_chars``.
+
+    Returns ``(hits, info)`` with ``info = {"chars_in", "chars_out",
+    "dropped"}``; hits that no longer fit are dropped from the end.
+    """
+    query_terms = set(terms(query))
+    idf = _idf([split_units(str(hit.get("content") or "")) for hit in hits], query_terms)
+    selected: list[dict] = []
+    remaining = max_chars
+    for position, hit in enumerate(hits):
+        share = remaining // (len(hits) - position)
+        if share < SNIPPET_MIN_CHARS:
+            share = remaining
+        if remaining < SNIPPET_MIN_CHARS and selected:
+            break
+        snippet = extract(query, str(hit.get("content") or ""), share, idf)
+        if not snippet:
+            continue
+        selected.append({**hit, "content": snippet})
+        remaining -= len(snippet)
+    info = {
+        "chars_in": sum(len(str(hit.get("content") or "")) for hit in hits),
+        "chars_out": sum(len(hit["content"]) for hit in selected),
+        "dropped": len(hits) - len(selected),
+    }
+    return selected, info
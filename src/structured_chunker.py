@@ -0,0 +1,328 @@
+"""Section-aware PDF chunking from PyMuPDF layout.
+
+The page splitter in ``pdf_ingest`` cuts every page on its own, so a chunk
+never spans pages, a heading can end up in a different chunk than its
+section, and the 600-character overlap is embedded twice. This chunker
+instead walks the document's text lines in order and builds sections:
+
+- Headings are recognised from, in order of preference, the PDF outline
+  (``doc.get_toc()``), the source Markdown next to the PDF (``<stem>.md`` in
+  the PDF's directory or its parent, as in data/VSCHT) and font size
+  relative to the body text. Consecutive heading lines of the same size
+  (a title wrapped over several lines) form one heading.
+- Each chunk starts with its heading breadcrumb ("Děkanát – FPBT › Kontakty
+  › Tajemnice"), so a section read on its own still says what it is about.
+- Sections continue across page breaks; ``source`` points at the first page.
+- Small sibling sections are packed together up to ``STRUCT_CHUNK_MAX_CHARS``.
+  Sections longer than that are split on line boundaries, each piece
+  repeating the breadcrumb instead of overlapping the previous piece; a
+  single line longer than that is wrapped at a sentence or word boundary.
+- Titles are the section name plus the piece's index within its section
+  ("fpbt: Tajemnice (2)"), never page numbers or a document-wide counter,
+  so the chunk id (a hash of title and content) survives edits elsewhere in
+  the PDF.
+
+``StructuredChunker.feed`` takes one page at a time and returns the chunks
+that page completed, so ingestion still streams. A section that outgrows
+``STRUCT_CHUNK_MAX_CHARS`` can no longer be packed, so its full pieces are
+emitted while it is still open; a document without headings is therefore
+not held in memory until its last page.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Iterator
+
+import pymupdf
+
+
+STRUCT_CHUNK_MAX_CHARS = int(os.getenv("STRUCT_CHUNK_MAX_CHARS", "2400"))
+STRUCT_CHUNK_MIN_CHARS = int(os.getenv("STRUCT_CHUNK_MIN_CHARS", "600"))
+# Font size ratio over the body text above which a line counts as a heading.
+HEADING_SIZE_RATIO = 1.12
+# Pages sampled to find the body font size.
+BODY_SAMPLE_PAGES = 20
+BREADCRUMB_SEPARATOR = " › "
+
+_BULLET_ONLY_RE = re.compile(r"^[\s•·▪◦●○■□\-–—*]+$")
+_MD_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_SENTENCE_END_RE = re.compile(r"[.!?…:;](?=\s)")
+
+
+def _heading_key(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return " ".join(re.sub(r"[*_`]", "", text).split())
+
+
+def markdown_headings(md_path: Path) -> dict[str, int]:
+    """``{normalised heading text: level}`` from a Markdown file."""
+    headings: dict[str, int] = {}
+    for line in md_path.read_text(encoding="utf-8").splitlines():
+        match = _MD_HEADING_RE.match(line)
+        if match:
+            headings.setdefault(_heading_key(match.group(2)), len(match.group(1)))
+    return headings
+
+
+def find_markdown(pdf_path: Path) -> Path | None:
+    for candidate in (pdf_path.with_suffix(".md"), pdf_path.parent.parent / f"{pdf_path.stem}.md"):
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def page_lines(page: "pymupdf.Page") -> list[tuple[str, float]]:
+    """``(text, font size)`` for every text line in content order, bullets dropped."""
+    lines = []
+    for block in page.get_text("dict")["blocks"]:
+        if block.get("type") != 0:
+            continue
+        for line in block["lines"]:
+            spans = [span for span in line["spans"] if span["text"].strip()]
+            text = " ".join("".join(span["text"] for span in line["spans"]).split())
+            if not spans or not text or _BULLET_ONLY_RE.match(text):
+                continue
+            lines.append((text, round(max(span["size"] for span in spans), 1)))
+    return lines
+
+
+def body_font_size(doc: "pymupdf.Document", sample_pages: int = BODY_SAMPLE_PAGES) -> float:
+    sizes: Counter[float] = Counter()
+    for page_number in range(min(sample_pages, doc.page_count)):
+        for text, size in page_lines(doc.load_page(page_number)):
+            sizes[size] += len(text)
+    return sizes.most_common(1)[0][0] if sizes else 0.0
+
+
+class _Section:
+    def __init__(self, path: list[str], page: int) -> None:
+        self.path = path
+        self.page = page
+        self.lines: list[str] = []
+        # Pieces already emitted while the section was still open.
+        self.emitted = 0
+
+    def size(self) -> int:
+        return sum(len(line) + 1 for line in self.lines)
+
+
+class StructuredChunker:
+    def __init__(
+        self,
+        pdf_path: Path,
+        body_size: float,
+        known_headings: dict[str, int] | None = None,
+        max_chars: int = STRUCT_CHUNK_MAX_CHARS,
+        min_chars: int = STRUCT_CHUNK_MIN_CHARS,
+    ) -> None:
+        self.pdf_path = pdf_path
+        self.body_size = body_size
+        self.known_headings = known_headings or {}
+        self.max_chars = max_chars
+        self.min_chars = min_chars
+        self._levels_by_size: dict[float, int] = {}
+        self._stack: list[tuple[int, str]] = []
+        self._section: _Section | None = None
+        self._pending: list[_Section] = []
+        self._heading_lines: list[str] = []
+        self._heading_size = 0.0
+        self._heading_page = 0
+
+    # Headings -------------------------------------------------------------
+
+    def _is_heading_size(self, size: float) -> bool:
+        return bool(self.body_size) and size >= self.body_size * HEADING_SIZE_RATIO
+
+    def _size_level(self, size: float) -> int:
+        if size not in self._levels_by_size:
+            # Bigger fonts are higher levels; sizes seen later slot in by rank.
+            sizes = sorted({*self._levels_by_size, size}, reverse=True)
+            self._levels_by_size = {value: rank + 1 for rank, value in enumerate(sizes)}
+        return self._levels_by_size[size]
+
+    def _flush_heading(self) -> list[dict]:
+        if not self._heading_lines:
+            return []
+        text = " ".join(self._heading_lines)
+        level = self.known_headings.get(_heading_key(text)) or self._size_level(self._heading_size)
+        self._heading_lines = []
+        return self._open_section(text, level, self._heading_page)
+
+    def _open_section(self, heading: str, level: int, page: int) -> list[dict]:
+        chunks = self._close_section()
+        while self._stack and self._stack[-1][0] >= level:
+            self._stack.pop()
+        self._stack.append((level, heading))
+        self._section = _Section([title for _, title in self._stack], page)
+        return chunks
+
+    # Sections -> chunks ---------------------------------------------------
+
+    def _close_section(self) -> list[dict]:
+        section, self._section = self._section, None
+        if section is None or not section.lines:
+            # A heading directly followed by a subheading only adds to the breadcrumb.
+            return []
+        if section.emitted:
+            # Streamed sections are never packed; the piece numbering continues.
+            return self._split(section.path, section.lines, section.page, start=section.emitted + 1)
+        chunks: list[dict] = []
+        if self._pending and not self._can_pack(section):
+            chunks.extend(self._emit_pending())
+        self._pending.append(section)
+        if sum(pending.size() for pending in self._pending) >= self.min_chars:
+            chunks.extend(self._emit_pending())
+        return chunks
+
+    def _can_pack(self, section: _Section) -> bool:
+        total = sum(pending.size() for pending in self._pending) + section.size()
+        first = self._pending[0].path
+        # Only siblings of the first pending section, or its direct subsections.
+        return total <= self.max_chars and section.path[:-1] in (first[:-1], first)
+
+    def _emit_pending(self) -> list[dict]:
+        sections, self._pending = self._pending, []
+        if not sections:
+            return []
+        if len(sections) == 1:
+            section = sections[0]
+            return self._split(section.path, section.lines, section.page)
+        parent = _common_prefix([section.path for section in sections])
+        lines: list[str] = []
+        for section in sections:
+            subheading = BREADCRUMB_SEPARATOR.join(section.path[len(parent):])
+            if subheading:
+                lines.append(subheading)
+            lines.extend(section.lines)
+        return self._split(parent, lines, sections[0].page)
+
+    def _pieces(self, header: str, lines: list[str]) -> list[list[str]]:
+        budget = max(200, self.max_chars - len(header))
+        pieces: list[list[str]] = [[]]
+        used = 0
+        for line in (part for line in lines for part in _wrap(line, budget)):
+            if used + len(line) + 1 > budget and pieces[-1]:
+                pieces.append([])
+                used = 0
+            pieces[-1].append(line)
+            used += len(line) + 1
+        return [piece for piece in pieces if piece]
+
+    def _split(self, path: list[str], lines: list[str], page: int, start: int = 1) -> list[dict]:
+        header = BREADCRUMB_SEPARATOR.join(path)
+        pieces = self._pieces(header, lines)
+        return [self._chunk(path, header, piece, index, page) for index, piece in enumerate(pieces, start=start)]
+
+    def _stream_section(self) -> list[dict]:
+        """Emit the pieces of the open section that no later line can change."""
+        section = self._section
+        header = BREADCRUMB_SEPARATOR.join(section.path)
+        pieces = self._pieces(header, section.lines)
+        if len(pieces) < 2:
+            return []
+        # Pending siblings would have been emitted before this section anyway.
+        chunks = self._emit_pending()
+        for piece in pieces[:-1]:
+            section.emitted += 1
+            chunks.append(self._chunk(section.path, header, piece, section.emitted, section.page))
+        section.lines = pieces[-1]
+        return chunks
+
+    def _chunk(self, path: list[str], header: str, lines: list[str], index: int, page: int) -> dict:
+        stem = self.pdf_path.stem
+        leaf = path[-1] if path else ""
+        title = f"{stem}: {leaf}" if leaf else stem
+        body = "\n".join(lines)
+        return {
+            "title": title if index == 1 else f"{title} ({index})",
+            "content": f"# {stem}\n\n{header}\n\n{body}".strip() if header else f"# {stem}\n\n{body}",
+            "source": f"{self.pdf_path}#page={page}",
+        }
+
+    # Input ----------------------------------------------------------------
+
+    def feed(self, page_index: int, lines: list[tuple[str, float]]) -> list[dict]:
+        """Add one page's lines; returns the chunks it completed."""
+        chunks: list[dict] = []
+        for text, size in lines:
+            known = self.known_headings.get(_heading_key(text))
+            if known is not None or self._is_heading_size(size):
+                if self._heading_lines and (known is not None or size != self._heading_size):
+                    chunks.extend(self._flush_heading())
+                if known is not None:
+                    chunks.extend(self._open_section(text, known, page_index))
+                    continue
+                if not self._heading_lines:
+                    self._heading_size, self._heading_page = size, page_index
+                self._heading_lines.append(text)
+                continue
+            chunks.extend(self._flush_heading())
+            if self._section is None:
+                self._section = _Section([title for _, title in self._stack], page_index)
+            self._section.lines.append(text)
+            if self._section.size() > self.max_chars:
+                chunks.extend(self._stream_section())
+        return chunks
+
+    def finish(self) -> list[dict]:
+        chunks = self._flush_heading()
+        chunks.extend(self._close_section())
+        chunks.extend(self._emit_pending())
+        return chunks
+
+
+def _wrap(line: str, budget: int) -> list[str]:
+    """``line`` in pieces of at most ``budget`` chars, cut after a sentence or at a space."""
+    pieces = []
+    while len(line) > budget:
+        window = line[: budget + 1]
+        ends = [match.end() for match in _SENTENCE_END_RE.finditer(window)]
+        # A sentence end in the second half of the window; otherwise the last space.
+        cut = ends[-1] if ends and ends[-1] > budget // 2 else window.rfind(" ")
+        if cut <= 0:
+            cut = budget
+        pieces.append(line[:cut].rstrip())
+        line = line[cut:].lstrip()
+    if line:
+        pieces.append(line)
+    return pieces
+
+
+def _common_prefix(paths: list[list[str]]) -> list[str]:
+    if not paths:
+        return []
+    prefix = paths[0]
+    for path in paths[1:]:
+        size = 0
+        while size < min(len(prefix), len(path)) and prefix[size] == path[size]:
+            size += 1
+        prefix = prefix[:size]
+    return prefix
+
+
+def iter_structured_chunks(pdf_path: Path, progress=None) -> Iterator[tuple[int, list[dict]]]:
+    """Yield ``(page_index, chunks completed on that page)`` for every page.
+
+    The last page also carries whatever was still open at the end.
+    """
+    with pymupdf.open(pdf_path) as doc:
+        if progress:
+            progress(pages_total=doc.page_count, pages_done=0)
+        known = {_heading_key(title): level for level, title, _ in doc.get_toc()}
+        md_path = find_markdown(pdf_path)
+        if md_path is not None:
+            for heading, level in markdown_headings(md_path).items():
+                known.setdefault(heading, level)
+        chunker = StructuredChunker(pdf_path, body_font_size(doc), known)
+        for page_index, page in enumerate(doc, start=1):
+            chunks = chunker.feed(page_index, page_lines(page))
+            if page_index == doc.page_count:
+                chunks.extend(chunker.finish())
+            yield page_index, chunks
+            if progress:
+                progress(pages_done=page_index)
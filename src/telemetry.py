@@ -0,0 +1,269 @@
+"""Minimal OpenTelemetry-style spans with a local exporter.
+
+Spans are plain dicts (``trace_id``, ``span_id``, ``parent_id``, ``name``,
+``start``, ``end``, ``duration_ms``, ``attributes``, ``status``) written as
+JSON lines to ``TELEMETRY_PATH`` (``TELEMETRY_EXPORTER=file``), printed
+(``stdout``) or dropped (``none``). Exporting happens on a daemon thread so
+recording a span never blocks the caller on I/O. The file is rotated once it
+would exceed ``TELEMETRY_MAX_BYTES``, keeping ``TELEMETRY_BACKUPS`` older
+files as ``spans.jsonl.1`` (newest) to ``spans.jsonl.N``. Every process
+appends to the same file, so the size check, rotation and append run under
+an exclusive ``flock`` on ``spans.jsonl.lock`` (POSIX only; elsewhere the
+lock is skipped).
+
+The current span is tracked in a ``contextvars`` variable, so nested
+``span()`` blocks and asyncio tasks created inside them are parented
+automatically. Listeners registered with ``add_listener`` see every span,
+which is how the API turns them into Prometheus metrics. Summarise a file
+with ``python src/telemetry_report.py``.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextvars
+import functools
+import json
+import os
+import queue
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+TELEMETRY_EXPORTER = os.getenv("TELEMETRY_EXPORTER", "file").strip().lower()  # file | stdout | none
+TELEMETRY_PATH = Path(os.getenv("TELEMETRY_PATH", str(BASE_DIR / "local" / "telemetry" / "spans.jsonl")))
+TELEMETRY_MAX_BYTES = int(os.getenv("TELEMETRY_MAX_BYTES", str(20 * 1024 * 1024)))  # 0 disables rotation
+TELEMETRY_BACKUPS = int(os.getenv("TELEMETRY_BACKUPS", "3"))
+
+_current: contextvars.ContextVar[tuple[str, str] | None] = contextvars.ContextVar(
+    "telemetry_current_span", default=None
+)
+
+
+def new_id(nbytes: int = 8) -> str:
+    return secrets.token_hex(nbytes)
+
+
+def backup_path(path: Path, index: int) -> Path:
+    return path.with_name(f"{path.name}.{index}")
+
+
+def rotated_paths(path: Path) -> list[Path]:
+    """Existing span files for ``path``, oldest first, ending with ``path`` itself."""
+    backups = []
+    index = 1
+    while backup_path(path, index).exists():
+        backups.append(backup_path(path, index))
+        index += 1
+    return [*reversed(backups), *([path] if path.exists() else [])]
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """Exclusive lock shared by every process writing ``path``."""
+    if fcntl is None:
+        yield
+        return
+    with path.with_name(f"{path.name}.lock").open("a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class _Exporter:
+    def __init__(
+        self,
+        kind: str,
+        path: Path,
+        max_bytes: int = TELEMETRY_MAX_BYTES,
+        backups: int = TELEMETRY_BACKUPS,
+    ) -> None:
+        self._kind = kind
+        self._path = path
+        self._max_bytes = max_bytes
+        self._backups = max(0, backups)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def export(self, span: dict) -> None:
+        if self._kind == "none":
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="telemetry-exporter", daemon=True)
+                    self._thread.start()
+        self._queue.put(span)
+
+    def flush(self, timeout_s: float = 2.0) -> None:
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout_s)
+
+    def _write(self, lines: list[str]) -> None:
+        if self._kind == "stdout":
+            sys.stdout.write("".join(f"[span] {line}" for line in lines))
+            return
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with _file_lock(self._path):
+            if self._max_bytes > 0:
+                incoming = sum(len(line.encode("utf-8")) for line in lines)
+                try:
+                    size = self._path.stat().st_size
+                except FileNotFoundError:
+                    size = 0
+                if size and size + incoming > self._max_bytes:
+                    self._rotate()
+            with self._path.open("a", encoding="utf-8") as handle:
+                handle.writelines(lines)
+
+    def _rotate(self) -> None:
+        if not self._backups:
+            self._path.unlink(missing_ok=True)
+            return
+        backup_path(self._path, self._backups).unlink(missing_ok=True)
+        for index in range(self._backups - 1, 0, -1):
+            older = backup_path(self._path, index)
+            try:
+                older.replace(backup_path(self._path, index + 1))
+            except FileNotFoundError:
+                pass
+        try:
+            self._path.replace(backup_path(self._path, 1))
+        except FileNotFoundError:
+            # Another writer rotated it already (only possible without flock).
+            pass
+
+    def _run(self) -> None:
+        while True:
+            items = [self._queue.get()]
+            # Drain whatever else is queued so bursts cost one write.
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = [json.dumps(item, ensure_ascii=False) + "\n" for item in items if isinstance(item, dict)]
+            try:
+                if lines:
+                    self._write(lines)
+            except OSError as exc:
+                print(f"[telemetry] export failed: {exc!r}")
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+
+_exporter = _Exporter(TELEMETRY_EXPORTER, TELEMETRY_PATH)
+atexit.register(_exporter.flush)
+_listeners: list[Callable[[dict], None]] = []
+
+
+def add_listener(listener: Callable[[dict], None]) -> None:
+    """Call ``listener(span)`` for every finished span (e.g. to feed metrics)."""
+    _listeners.append(listener)
+
+
+def flush(timeout_s: float = 2.0) -> None:
+    _exporter.flush(timeout_s)
+
+
+def record_span(
+    name: str,
+    start: float,
+    end: float,
+    trace_id: str | None = None,
+    parent_id: str | None = None,
+    span_id: str | None = None,
+    status: str = "ok",
+    **attributes,
+) -> dict:
+    """Export a span from wall-clock ``start``/``end`` timestamps (seconds)."""
+    if trace_id is None:
+        current = _current.get()
+        trace_id, parent_id = current if current else (new_id(16), parent_id)
+    span = {
+        "trace_id": trace_id,
+        "span_id": span_id or new_id(),
+        "parent_id": parent_id,
+        "name": name,
+        "start": start,
+        "end": end,
+        "duration_ms": round((end - start) * 1000, 3),
+        "attributes": attributes,
+        "status": status,
+    }
+    _exporter.export(span)
+    for listener in _listeners:
+        try:
+            listener(span)
+        except Exception as exc:
+            print(f"[telemetry] listener failed: {exc!r}")
+    return span
+
+
+@contextmanager
+def span(
+    name: str,
+    trace_id: str | None = None,
+    parent_id: str | None = None,
+    **attributes,
+) -> Iterator[dict]:
+    """Time a block as a span; yields the attribute dict so callers can add to it."""
+    current = _current.get()
+    if trace_id is None:
+        trace_id, parent_id = current if current else (new_id(16), None)
+    span_id = new_id()
+    token = _current.set((trace_id, span_id))
+    start = time.time()
+    status = "ok"
+    try:
+        yield attributes
+    except BaseException as exc:
+        status = f"error: {type(exc).__name__}"
+        raise
+    finally:
+        _current.reset(token)
+        record_span(
+            name,
+            start,
+            time.time(),
+            trace_id=trace_id,
+            parent_id=parent_id,
+            span_id=span_id,
+            status=status,
+            **attributes,
+        )
+
+
+def traced(name: str, result_attributes: Callable[[object], dict] | None = None):
+    """Decorator form of ``span``; ``result_attributes(result)`` adds attributes."""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name) as attributes:
+                result = func(*args, **kwargs)
+                if result_attributes is not None:
+                    attributes.update(result_attributes(result))
+                return result
+
+        return wrapper
+
+    return decorate
@@ -0,0 +1,71 @@
+"""Latency percentiles per span name from the telemetry JSONL file.
+
+Rotated backups next to the file (``spans.jsonl.1`` ...) are read too.
+
+    python src/telemetry_report.py                      # local/telemetry/spans.jsonl
+    python src/telemetry_report.py --by collection      # split by an attribute
+    python src/telemetry_report.py --since-minutes 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import telemetry
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def load_spans(path: Path, since: float | None = None) -> list[dict]:
+    spans = []
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                span = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if since is None or span.get("start", 0) >= since:
+                spans.append(span)
+    return spans
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", nargs="?", type=Path, default=telemetry.TELEMETRY_PATH)
+    parser.add_argument("--by", help="attribute to group by, e.g. collection")
+    parser.add_argument("--since-minutes", type=float)
+    args = parser.parse_args()
+
+    since = time.time() - args.since_minutes * 60 if args.since_minutes else None
+    groups: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    spans = [span for path in telemetry.rotated_paths(args.path) for span in load_spans(path, since)]
+    for span in spans:
+        name = span["name"]
+        if args.by:
+            name = f"{name}[{span.get('attributes', {}).get(args.by, '-')}]"
+        groups[name].append(span["duration_ms"])
+        if span.get("status", "ok") != "ok":
+            errors[name] += 1
+
+    print(f"{'span':<44} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>6}")
+    for name in sorted(groups):
+        values = groups[name]
+        print(
+            f"{name:<44} {len(values):>6} {percentile(values, 0.5):>9.1f} {percentile(values, 0.95):>9.1f} "
+            f"{percentile(values, 0.99):>9.1f} {max(values):>9.1f} {errors[name]:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
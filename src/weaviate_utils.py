@@ -1,15 +1,30 @@
 from __future__ import annotations
 
+import asyncio
+import atexit
+import hashlib
 import os
+import queue
+import threading
 import time
+from contextlib import asynccontextmanager, contextmanager
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Iterable
 
 import weaviate
 from datetime import datetime, timezone
-from weaviate.classes.config import Configure, DataType, Property
-from weaviate.classes.query import MetadataQuery
+from weaviate.classes.config import Configure, DataType, Property, Tokenization
+from weaviate.classes.aggregate import GroupByAggregate
+from weaviate.classes.query import Filter, MetadataQuery, Metrics, Sort
+from weaviate.classes.tenants import Tenant
 from weaviate.collections.classes import grpc
+from weaviate.util import generate_uuid5
+
+import embeddings
+import fusion
+import local_index
+import search_cache
+import telemetry
 
 
 WEAVIATE_HOST = os.getenv("WEAVIATE_HOST", "localhost")
@@ -20,11 +35,37 @@ WEAVIATE_SEED_COLLECTION = os.getenv("WEAVIATE_SEED_COLLECTION", "seed_vscht")
 WEAVIATE_OPENAI_MODEL = os.getenv("WEAVIATE_OPENAI_MODEL", "text-embedding-3-large")
 WEAVIATE_SEARCH_MODE = os.getenv("WEAVIATE_SEARCH_MODE", "hybrid") #semantic
 WEAVIATE_HYBRID_ALPHA = float(os.getenv("WEAVIATE_HYBRID_ALPHA", "0.7"))
+# "local" serves searches from src/local_index.py only (development without Weaviate).
+WEAVIATE_BACKEND = os.getenv("WEAVIATE_BACKEND", "weaviate").strip().lower()
+# Serve a search from the on-disk mirror when Weaviate fails and a mirror exists.
+WEAVIATE_LOCAL_FALLBACK = os.getenv("WEAVIATE_LOCAL_FALLBACK", "1").strip().lower() not in {"0", "false", "no"}
+WEAVIATE_POOL_SIZE = int(os.getenv("WEAVIATE_POOL_SIZE", "4"))
+WEAVIATE_POOL_HEALTH_INTERVAL_S = float(os.getenv("WEAVIATE_POOL_HEALTH_INTERVAL_S", "30"))
+WEAVIATE_POOL_ACQUIRE_TIMEOUT_S = float(os.getenv("WEAVIATE_POOL_ACQUIRE_TIMEOUT_S", "10"))
+WEAVIATE_SCHEMA_CACHE_TTL_S = float(os.getenv("WEAVIATE_SCHEMA_CACHE_TTL_S", "300"))
+WEAVIATE_SEARCH_DEADLINE_S = float(os.getenv("WEAVIATE_SEARCH_DEADLINE_S", "1.0"))
+# "collection": one collection per user; "tenant": one multi-tenant collection, one tenant per user.
+WEAVIATE_STORAGE_LAYOUT = os.getenv("WEAVIATE_STORAGE_LAYOUT", "collection")
+WEAVIATE_TENANT_COLLECTION = os.getenv("WEAVIATE_TENANT_COLLECTION", "tenant_documents")
+WEAVIATE_INGEST_MODE = os.getenv("WEAVIATE_INGEST_MODE", "fixed")  # fixed | dynamic | single
+WEAVIATE_BATCH_SIZE = int(os.getenv("WEAVIATE_BATCH_SIZE", "100"))
+WEAVIATE_BATCH_CONCURRENCY = int(os.getenv("WEAVIATE_BATCH_CONCURRENCY", "2"))
+# "openai": Weaviate's text2vec-openai embeds server-side; "client": vectors come from embeddings.py.
+WEAVIATE_VECTORIZER = os.getenv("WEAVIATE_VECTORIZER", "openai")
+WEAVIATE_INGEST_INCREMENTAL = os.getenv("WEAVIATE_INGEST_INCREMENTAL", "1").strip().lower() not in {"0", "false", "no"}
+WEAVIATE_INVENTORY_MAX_SOURCES = int(os.getenv("WEAVIATE_INVENTORY_MAX_SOURCES", "10000"))
+WEAVIATE_SEED_INVENTORY_TTL_S = float(os.getenv("WEAVIATE_SEED_INVENTORY_TTL_S", "600"))
+
+USER_COLLECTION_PREFIX = "user_"
 
 DOC_TITLE_FIELD = "title"
 DOC_CONTENT_FIELD = "content"
 DOC_SOURCE_FIELD = "source"
 DOC_CREATED_AT_FIELD = "created_at"
+# Source path without the "#page=N" suffix; exact-match filterable for deletes.
+DOC_SOURCE_BASE_FIELD = "source_base"
+# sha256 of title + content; part of the deterministic object UUID.
+DOC_CHUNK_HASH_FIELD = "chunk_hash"
 
 def normalize_collection_name(user_name: str) -> str:
     base = (user_name or "").strip().lower()
@@ -32,7 +73,7 @@ def normalize_collection_name(user_name: str) -> str:
     safe = "_".join(part for part in safe.split("_") if part)
     if not safe:
         safe = "guest"
-    return f"user_{safe}"
+    return f"{USER_COLLECTION_PREFIX}{safe}"
 
 
 def seed_collection_name() -> str:
@@ -40,6 +81,34 @@ def seed_collection_name() -> str:
     return value or "seed_vscht"
 
 
+def source_base_of(source: str) -> str:
+    return source.split("#", 1)[0] if source else ""
+
+
+def tenant_collection_name() -> str:
+    value = (WEAVIATE_TENANT_COLLECTION or "").strip()
+    return value or "tenant_documents"
+
+
+def uses_tenants() -> bool:
+    return WEAVIATE_STORAGE_LAYOUT.strip().lower() == "tenant"
+
+
+def uses_client_vectors() -> bool:
+    return WEAVIATE_VECTORIZER.strip().lower() == "client"
+
+
+def resolve_collection(collection_name: str) -> tuple[str, str | None]:
+    """Map a logical collection name to ``(physical collection, tenant)``.
+
+    With the tenant layout every ``user_*`` name lives as a tenant of the
+    shared multi-tenant collection; other names (seed, defaults) are unchanged.
+    """
+    if uses_tenants() and collection_name.startswith(USER_COLLECTION_PREFIX):
+        return tenant_collection_name(), collection_name
+    return collection_name, None
+
+
 def connect_client():
     return weaviate.connect_to_local(
         host=WEAVIATE_HOST,
@@ -48,21 +117,245 @@ def connect_client():
     )
 
 
+async def connect_async_client():
+    client = weaviate.use_async_with_local(
+        host=WEAVIATE_HOST,
+        port=WEAVIATE_HTTP_PORT,
+        grpc_port=WEAVIATE_GRPC_PORT,
+    )
+    await client.connect()
+    return client
+
+
+class ClientPool:
+    """Bounded pool of long-lived sync clients shared by the whole process.
+
+    Idle clients are health-checked with ``is_ready`` once they have been idle
+    longer than ``health_interval_s``. A client that raised while checked out
+    is re-checked before its next use and replaced if the check fails.
+    """
+
+    def __init__(
+        self,
+        factory: Callable = connect_client,
+        max_size: int = WEAVIATE_POOL_SIZE,
+        health_interval_s: float = WEAVIATE_POOL_HEALTH_INTERVAL_S,
+        acquire_timeout_s: float = WEAVIATE_POOL_ACQUIRE_TIMEOUT_S,
+    ) -> None:
+        self._factory = factory
+        self._max_size = max(1, max_size)
+        self._health_interval_s = health_interval_s
+        self._acquire_timeout_s = acquire_timeout_s
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self._max_size)
+        self._lock = threading.Lock()
+        self._all: set = set()
+        self.stats = {"created": 0, "reused": 0, "discarded": 0}
+
+    def _is_healthy(self, client, idle_since: float) -> bool:
+        if time.monotonic() - idle_since < self._health_interval_s:
+            return True
+        try:
+            return bool(client.is_ready())
+        except Exception:
+            return False
+
+    def _discard(self, client) -> None:
+        with self._lock:
+            self._all.discard(client)
+            self.stats["discarded"] += 1
+        try:
+            client.close()
+        except Exception:
+            pass
+
+    def _checkout(self):
+        while True:
+            try:
+                client, idle_since = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if self._is_healthy(client, idle_since):
+                with self._lock:
+                    self.stats["reused"] += 1
+                return client
+            self._discard(client)
+        client = self._factory()
+        with self._lock:
+            self._all.add(client)
+            self.stats["created"] += 1
+        return client
+
+    @contextmanager
+    def client(self):
+        if not self._slots.acquire(timeout=self._acquire_timeout_s):
+            raise TimeoutError("Timed out waiting for a pooled Weaviate client")
+        try:
+            client = self._checkout()
+        except BaseException:
+            self._slots.release()
+            raise
+        failed = False
+        try:
+            yield client
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._idle.put((client, float("-inf") if failed else time.monotonic()))
+            self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        with self._lock:
+            clients = list(self._all)
+            self._all.clear()
+        for client in clients:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+
+class AsyncClientPool:
+    """Async counterpart of ``ClientPool``; bound to the loop that first uses it."""
+
+    def __init__(
+        self,
+        factory: Callable = connect_async_client,
+        max_size: int = WEAVIATE_POOL_SIZE,
+        health_interval_s: float = WEAVIATE_POOL_HEALTH_INTERVAL_S,
+        acquire_timeout_s: float = WEAVIATE_POOL_ACQUIRE_TIMEOUT_S,
+    ) -> None:
+        self._factory = factory
+        self._max_size = max(1, max_size)
+        self._health_interval_s = health_interval_s
+        self._acquire_timeout_s = acquire_timeout_s
+        self._idle: list = []
+        self._slots: asyncio.Semaphore | None = None
+        self._all: set = set()
+        self.stats = {"created": 0, "reused": 0, "discarded": 0}
+
+    async def _is_healthy(self, client, idle_since: float) -> bool:
+        if time.monotonic() - idle_since < self._health_interval_s:
+            return True
+        try:
+            return bool(await client.is_ready())
+        except Exception:
+            return False
+
+    async def _discard(self, client) -> None:
+        self._all.discard(client)
+        self.stats["discarded"] += 1
+        try:
+            await client.close()
+        except Exception:
+            pass
+
+    async def _checkout(self):
+        while self._idle:
+            client, idle_since = self._idle.pop()
+            if await self._is_healthy(client, idle_since):
+                self.stats["reused"] += 1
+                return client
+            await self._discard(client)
+        client = await self._factory()
+        self._all.add(client)
+        self.stats["created"] += 1
+        return client
+
+    @asynccontextmanager
+    async def client(self):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._max_size)
+        await asyncio.wait_for(self._slots.acquire(), timeout=self._acquire_timeout_s)
+        try:
+            client = await self._checkout()
+        except BaseException:
+            self._slots.release()
+            raise
+        failed = False
+        try:
+            yield client
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._idle.append((client, float("-inf") if failed else time.monotonic()))
+            self._slots.release()
+
+    async def close(self) -> None:
+        self._idle.clear()
+        clients = list(self._all)
+        self._all.clear()
+        for client in clients:
+            try:
+                await client.close()
+            except Exception:
+                pass
+
+
+_client_pool: ClientPool | None = None
+_async_client_pool: AsyncClientPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_client_pool() -> ClientPool:
+    global _client_pool
+    if _client_pool is None:
+        with _pool_lock:
+            if _client_pool is None:
+                _client_pool = ClientPool()
+    return _client_pool
+
+
+def get_async_client_pool() -> AsyncClientPool:
+    global _async_client_pool
+    if _async_client_pool is None:
+        _async_client_pool = AsyncClientPool()
+    return _async_client_pool
+
+
+def pooled_client():
+    return get_client_pool().client()
+
+
+def pooled_async_client():
+    return get_async_client_pool().client()
+
+
+def close_client_pools() -> None:
+    global _client_pool, _async_client_pool
+    with _pool_lock:
+        pool, _client_pool = _client_pool, None
+    if pool is not None:
+        pool.close()
+    # Async clients cannot be awaited from atexit; they are dropped with the loop.
+    _async_client_pool = None
+
+
+atexit.register(close_client_pools)
+
+
 def list_collections() -> list[str]:
-    with connect_client() as client:
+    with pooled_client() as client:
         configs = client.collections.list_all(simple=True)
     return sorted(configs.keys())
 
 
 def wait_for_weaviate(
-    max_wait_s: int = 20,
+    max_wait_s: float = 20,
     interval_s: float = 1.5,
     debug: bool = False,
 ) -> bool:
     deadline = time.monotonic() + max_wait_s
-    while time.monotonic() < deadline:
+    while True:
         try:
-            with connect_client() as client:
+            with pooled_client() as client:
                 if client.is_ready():
                     if debug:
                         print("Weaviate ready.")
@@ -70,41 +363,176 @@ def wait_for_weaviate(
         except Exception:
             if debug:
                 print("Weaviate check failed; retrying...")
-        time.sleep(interval_s)
-    return False
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(interval_s, remaining))
+
+
+_verified_collections: dict[str, float] = {}
+_schema_cache_lock = threading.Lock()
+_schema_cache_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def _schema_verified(name: str) -> bool:
+    with _schema_cache_lock:
+        verified_at = _verified_collections.get(name)
+        if verified_at is not None and time.monotonic() - verified_at < WEAVIATE_SCHEMA_CACHE_TTL_S:
+            _schema_cache_stats["hits"] += 1
+            return True
+        _verified_collections.pop(name, None)
+        _schema_cache_stats["misses"] += 1
+        return False
+
+
+def _mark_schema_verified(name: str) -> None:
+    with _schema_cache_lock:
+        _verified_collections[name] = time.monotonic()
+
+
+def invalidate_collection_cache(name: str | None = None) -> None:
+    with _schema_cache_lock:
+        if name is None:
+            _verified_collections.clear()
+        else:
+            _verified_collections.pop(name, None)
+        _schema_cache_stats["invalidations"] += 1
+
+
+def collection_cache_stats() -> dict:
+    with _schema_cache_lock:
+        stats = dict(_schema_cache_stats)
+        stats["cached"] = len(_verified_collections)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
+
+
+@telemetry.traced("weaviate.delete_collection")
+def delete_collection(name: str) -> bool:
+    _collection_changed(name)
+    physical, tenant = resolve_collection(name)
+    with pooled_client() as client:
+        if not client.collections.exists(physical):
+            invalidate_collection_cache(name)
+            return False
+        if tenant is None:
+            client.collections.delete(physical)
+        else:
+            tenants = client.collections.use(physical).tenants
+            if not tenants.exists(tenant):
+                invalidate_collection_cache(name)
+                return False
+            tenants.remove([tenant])
+    invalidate_collection_cache(name)
+    return True
 
 
 def ensure_collection(client, name: str = WEAVIATE_COLLECTION) -> None:
+    if _schema_verified(name):
+        return
+    physical, tenant = resolve_collection(name)
+    _verify_collection(client, physical, multi_tenant=tenant is not None)
+    if tenant is not None:
+        tenants = client.collections.use(physical).tenants
+        if not tenants.exists(tenant):
+            tenants.create([Tenant(name=tenant)])
+    _mark_schema_verified(name)
+
+
+def _use_collection(client, name: str):
+    physical, tenant = resolve_collection(name)
+    collection = client.collections.use(physical)
+    return collection.with_tenant(tenant) if tenant is not None else collection
+
+
+def _open_collection(client, name: str):
+    ensure_collection(client, name)
+    return _use_collection(client, name)
+
+
+def _collection_properties() -> list:
+    return [
+        Property(name=DOC_TITLE_FIELD, data_type=DataType.TEXT),
+        Property(name=DOC_CONTENT_FIELD, data_type=DataType.TEXT),
+        Property(name=DOC_SOURCE_FIELD, data_type=DataType.TEXT),
+        Property(name=DOC_CREATED_AT_FIELD, data_type=DataType.DATE),
+        Property(
+            name=DOC_SOURCE_BASE_FIELD,
+            data_type=DataType.TEXT,
+            tokenization=Tokenization.FIELD,
+            index_searchable=False,
+        ),
+        Property(
+            name=DOC_CHUNK_HASH_FIELD,
+            data_type=DataType.TEXT,
+            tokenization=Tokenization.FIELD,
+            index_searchable=False,
+        ),
+    ]
+
+
+def _vector_config():
+    if uses_client_vectors():
+        return Configure.Vectors.self_provided()
+    return Configure.Vectors.text2vec_openai(
+        model=WEAVIATE_OPENAI_MODEL,
+        source_properties=[DOC_TITLE_FIELD, DOC_CONTENT_FIELD],
+        vectorize_collection_name=False,
+    )
+
+
+def _collection_create_kwargs(name: str, multi_tenant: bool = False) -> dict:
+    kwargs = {
+        "name": name,
+        "properties": _collection_properties(),
+        "vector_config": _vector_config(),
+    }
+    if multi_tenant:
+        kwargs["multi_tenancy_config"] = Configure.multi_tenancy(
+            enabled=True,
+            auto_tenant_creation=True,
+            auto_tenant_activation=True,
+        )
+    return kwargs
+
+
+def _missing_properties(config) -> list:
+    existing = {prop.name for prop in config.properties}
+    return [prop for prop in _collection_properties() if prop.name not in existing]
+
+
+def _verify_collection(client, name: str, multi_tenant: bool = False) -> None:
     if client.collections.exists(name):
         collection = client.collections.use(name)
-        config = collection.config.get(simple=True)
-        existing = {prop.name for prop in config.properties}
-        missing = []
-        if DOC_TITLE_FIELD not in existing:
-            missing.append(Property(name=DOC_TITLE_FIELD, data_type=DataType.TEXT))
-        if DOC_CONTENT_FIELD not in existing:
-            missing.append(Property(name=DOC_CONTENT_FIELD, data_type=DataType.TEXT))
-        if DOC_SOURCE_FIELD not in existing:
-            missing.append(Property(name=DOC_SOURCE_FIELD, data_type=DataType.TEXT))
-        if DOC_CREATED_AT_FIELD not in existing:
-            missing.append(Property(name=DOC_CREATED_AT_FIELD, data_type=DataType.DATE))
-        for prop in missing:
+        for prop in _missing_properties(collection.config.get(simple=True)):
             collection.config.add_property(prop)
         return
-    client.collections.create(
-        name=name,
-        properties=[
-            Property(name=DOC_TITLE_FIELD, data_type=DataType.TEXT),
-            Property(name=DOC_CONTENT_FIELD, data_type=DataType.TEXT),
-            Property(name=DOC_SOURCE_FIELD, data_type=DataType.TEXT),
-            Property(name=DOC_CREATED_AT_FIELD, data_type=DataType.DATE),
-        ],
-        vector_config=Configure.Vectors.text2vec_openai(
-            model=WEAVIATE_OPENAI_MODEL,
-            source_properties=[DOC_TITLE_FIELD, DOC_CONTENT_FIELD],
-            vectorize_collection_name=False,
-        ),
-    )
+    client.collections.create(**_collection_create_kwargs(name, multi_tenant=multi_tenant))
+
+
+async def ensure_collection_async(client, name: str = WEAVIATE_COLLECTION) -> None:
+    if _schema_verified(name):
+        return
+    physical, tenant = resolve_collection(name)
+    if await client.collections.exists(physical):
+        collection = client.collections.use(physical)
+        for prop in _missing_properties(await collection.config.get(simple=True)):
+            await collection.config.add_property(prop)
+    else:
+        await client.collections.create(
+            **_collection_create_kwargs(physical, multi_tenant=tenant is not None)
+        )
+    if tenant is not None:
+        tenants = client.collections.use(physical).tenants
+        if not await tenants.exists(tenant):
+            await tenants.create([Tenant(name=tenant)])
+    _mark_schema_verified(name)
+
+
+async def _open_collection_async(client, name: str):
+    await ensure_collection_async(client, name)
+    return _use_collection(client, name)
 
 
 def _iter_txt_files(paths: Iterable[str | Path]) -> Iterable[Path]:
@@ -117,77 +545,321 @@ def _iter_txt_files(paths: Iterable[str | Path]) -> Iterable[Path]:
             yield path
 
 
-def _insert_documents(client, items: Iterable[dict], collection_name: str) -> int:
-    ensure_collection(client, collection_name)
-    collection = client.collections.use(collection_name)
-    count = 0
-    for item in items:
-        title = item.get("title", "Untitled")
-        content = item.get("content", "")
-        source = item.get("source", "")
-        if not content:
-            continue
-        created_at = item.get("created_at") or datetime.now(timezone.utc).isoformat()
-        collection.data.insert(
-            {
-                DOC_TITLE_FIELD: title,
-                DOC_CONTENT_FIELD: content,
-                DOC_SOURCE_FIELD: source,
-                DOC_CREATED_AT_FIELD: created_at,
-            }
+def _chunk_hash(title: str, content: str) -> str:
+    return hashlib.sha256(f"{title}\n{content}".encode("utf-8")).hexdigest()
+
+
+def chunk_uuid(collection_name: str, source: str, chunk_hash: str) -> str:
+    # Keyed on the document, not the "#page=N" suffix: a section that moves to
+    # another page keeps its id. Chunkers put whatever else tells chunks apart
+    # (page and chunk index, or section and piece index) in the hashed title.
+    return generate_uuid5(f"{source_base_of(source)}|{chunk_hash}", collection_name)
+
+
+def _document_properties(item: dict) -> dict | None:
+    content = item.get("content", "")
+    if not content:
+        return None
+    title = item.get("title", "Untitled")
+    source = item.get("source", "")
+    return {
+        DOC_TITLE_FIELD: title,
+        DOC_CONTENT_FIELD: content,
+        DOC_SOURCE_FIELD: source,
+        DOC_SOURCE_BASE_FIELD: source_base_of(source),
+        DOC_CHUNK_HASH_FIELD: _chunk_hash(title, content),
+        DOC_CREATED_AT_FIELD: item.get("created_at") or datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _normalize_ingest_mode(mode: str | None) -> str:
+    value = (mode or WEAVIATE_INGEST_MODE or "").strip().lower()
+    if value in {"fixed", "dynamic", "single"}:
+        return value
+    return "fixed"
+
+
+def _embedding_text(properties: dict) -> str:
+    # Same fields, same order as the text2vec-openai source_properties.
+    return f"{properties[DOC_TITLE_FIELD]}\n{properties[DOC_CONTENT_FIELD]}"
+
+
+def _attach_vectors(
+    prepared: Iterable[tuple[str, dict]],
+    group_size: int,
+) -> Iterable[tuple[str, dict, list[float] | None]]:
+    if not uses_client_vectors():
+        for doc_id, properties in prepared:
+            yield doc_id, properties, None
+        return
+    embedder = embeddings.get_embedder()
+    group: list[tuple[str, dict]] = []
+
+    def flush():
+        vectors = embedder.embed([_embedding_text(properties) for _, properties in group])
+        for (doc_id, properties), vector in zip(group, vectors):
+            yield doc_id, properties, vector
+        group.clear()
+
+    for entry in prepared:
+        group.append(entry)
+        if len(group) >= group_size:
+            yield from flush()
+    if group:
+        yield from flush()
+
+
+def query_vector(query: str) -> list[float] | None:
+    if not uses_client_vectors():
+        return None
+    with telemetry.span("embeddings.query"):
+        return embeddings.get_embedder().embed_one(query)
+
+
+_MANIFEST_PAGE_SIZE = 1000
+_DELETE_IDS_PER_CALL = 500
+
+
+def _source_manifest(collection, source_base: str) -> dict[str, tuple[str, str]]:
+    # Keyset pages ordered by chunk hash: offset + limit beyond the server's
+    # QUERY_MAXIMUM_RESULTS (10k by default) is rejected, and the cursor API
+    # cannot be combined with a filter.
+    manifest: dict[str, tuple[str, str]] = {}
+    where = Filter.by_property(DOC_SOURCE_BASE_FIELD).equal(source_base)
+    last_hash: str | None = None
+    while True:
+        filters = where
+        if last_hash is not None:
+            # >= rather than >: chunks sharing a hash must not fall between pages.
+            filters = where & Filter.by_property(DOC_CHUNK_HASH_FIELD).greater_or_equal(last_hash)
+        response = collection.query.fetch_objects(
+            filters=filters,
+            limit=_MANIFEST_PAGE_SIZE,
+            sort=Sort.by_property(DOC_CHUNK_HASH_FIELD, ascending=True),
+            return_properties=[DOC_CHUNK_HASH_FIELD, DOC_SOURCE_FIELD],
         )
-        count += 1
-    return count
+        objects = response.objects or []
+        added = 0
+        for obj in objects:
+            doc_id = str(obj.uuid)
+            if doc_id not in manifest:
+                properties = obj.properties or {}
+                manifest[doc_id] = (
+                    properties.get(DOC_CHUNK_HASH_FIELD) or "",
+                    properties.get(DOC_SOURCE_FIELD) or "",
+                )
+                added += 1
+        if len(objects) < _MANIFEST_PAGE_SIZE or not added:
+            return manifest
+        last_hash = manifest[str(objects[-1].uuid)][0]
+
+
+def source_manifest(source_base: str, collection_name: str = WEAVIATE_COLLECTION) -> dict[str, tuple[str, str]]:
+    """Object id -> ``(chunk hash, source)`` for every stored chunk of ``source_base``."""
+    with pooled_client() as client:
+        return _source_manifest(_open_collection(client, collection_name), source_base)
 
 
+def _delete_ids(collection, ids: list[str]) -> int:
+    deleted = 0
+    for start in range(0, len(ids), _DELETE_IDS_PER_CALL):
+        chunk = ids[start : start + _DELETE_IDS_PER_CALL]
+        deleted += collection.data.delete_many(where=Filter.by_id().contains_any(chunk)).successful
+    return deleted
+
+
+def _insert_documents(
+    client,
+    items: Iterable[dict],
+    collection_name: str,
+    mode: str | None = None,
+    batch_size: int | None = None,
+    concurrency: int | None = None,
+    incremental: bool = False,
+) -> dict:
+    """Insert ``items`` and return an ingest report.
+
+    ``mode`` is ``fixed`` (fixed-size batches sent ``concurrency`` at a time),
+    ``dynamic`` (Weaviate sizes batches from server load) or ``single`` (one
+    insert request per object). Objects rejected by Weaviate are listed in
+    ``errors`` with their position in ``items`` and their source.
+
+    Object ids are derived from the chunk, so re-ingesting is idempotent. With
+    ``incremental`` the stored manifest of every source seen in ``items`` is
+    loaded first: unchanged chunks are skipped (no re-embedding) and chunks no
+    longer produced for that source are deleted. ``items`` must therefore
+    contain each source in full. An unchanged chunk whose ``source`` moved
+    (e.g. to another ``#page=N``) only has that property updated; those are
+    counted in ``updated`` as well as ``skipped``.
+    """
+    collection = _open_collection(client, collection_name)
+    mode = _normalize_ingest_mode(mode)
+    started = time.perf_counter()
+    manifests: dict[str, dict[str, tuple[str, str]]] = {}
+    seen: set[str] = set()
+    relocated: dict[str, str] = {}
+    counts = {"submitted": 0, "skipped": 0}
+    errors: list[dict] = []
+
+    def prepared() -> Iterable[tuple[str, dict]]:
+        for item in items:
+            properties = _document_properties(item)
+            if properties is None:
+                continue
+            doc_id = chunk_uuid(
+                collection_name,
+                properties[DOC_SOURCE_FIELD],
+                properties[DOC_CHUNK_HASH_FIELD],
+            )
+            if incremental:
+                base = properties[DOC_SOURCE_BASE_FIELD]
+                if base not in manifests:
+                    manifests[base] = _source_manifest(collection, base)
+                seen.add(doc_id)
+                if doc_id in manifests[base]:
+                    counts["skipped"] += 1
+                    if manifests[base][doc_id][1] != properties[DOC_SOURCE_FIELD]:
+                        relocated[doc_id] = properties[DOC_SOURCE_FIELD]
+                    continue
+            yield doc_id, properties
+
+    vectorized = _attach_vectors(prepared(), batch_size or WEAVIATE_BATCH_SIZE)
+    if mode == "single":
+        for doc_id, properties, vector in vectorized:
+            try:
+                if collection.data.exists(doc_id):
+                    collection.data.replace(uuid=doc_id, properties=properties, vector=vector)
+                else:
+                    collection.data.insert(properties, uuid=doc_id, vector=vector)
+            except Exception as exc:
+                errors.append(
+                    {"index": counts["submitted"], "source": properties[DOC_SOURCE_FIELD], "error": str(exc)}
+                )
+            counts["submitted"] += 1
+    else:
+        if mode == "dynamic":
+            batch_context = collection.batch.dynamic()
+        else:
+            batch_context = collection.batch.fixed_size(
+                batch_size=batch_size or WEAVIATE_BATCH_SIZE,
+                concurrent_requests=concurrency or WEAVIATE_BATCH_CONCURRENCY,
+            )
+        with batch_context as batch:
+            for doc_id, properties, vector in vectorized:
+                batch.add_object(properties=properties, uuid=doc_id, vector=vector)
+                counts["submitted"] += 1
+        for failed in collection.batch.failed_objects:
+            obj = getattr(failed, "object_", None)
+            properties = getattr(obj, "properties", None) or {}
+            errors.append(
+                {
+                    "index": getattr(obj, "index", None),
+                    "source": properties.get(DOC_SOURCE_FIELD, ""),
+                    "error": failed.message,
+                }
+            )
+    vanished = [
+        doc_id
+        for manifest in manifests.values()
+        for doc_id in manifest
+        if doc_id not in seen
+    ]
+    deleted = _delete_ids(collection, vanished) if vanished else 0
+    inserted = counts["submitted"] - len(errors)
+    updated = 0
+    for doc_id, source in relocated.items():
+        # The hashed title and content are unchanged, so the vector is too.
+        try:
+            collection.data.update(uuid=doc_id, properties={DOC_SOURCE_FIELD: source})
+            updated += 1
+        except Exception as exc:
+            errors.append({"index": None, "source": source, "error": str(exc)})
+    seconds = time.perf_counter() - started
+    return {
+        "mode": mode,
+        "inserted": inserted,
+        "skipped": counts["skipped"],
+        "updated": updated,
+        "deleted": deleted,
+        "failed": len(errors),
+        "errors": errors,
+        "seconds": round(seconds, 3),
+        "objects_per_s": round(inserted / seconds, 1) if seconds > 0 else 0.0,
+    }
+
+
+@telemetry.traced("weaviate.insert")
 def insert_document(
     title: str,
     content: str,
     source: str,
     collection_name: str = WEAVIATE_COLLECTION,
 ) -> str:
-    with connect_client() as client:
-        created_at = datetime.now(timezone.utc).isoformat()
-        ensure_collection(client, collection_name)
-        collection = client.collections.use(collection_name)
-        return str(
-            collection.data.insert(
-                {
-                    DOC_TITLE_FIELD: title,
-                    DOC_CONTENT_FIELD: content,
-                    DOC_SOURCE_FIELD: source,
-                    DOC_CREATED_AT_FIELD: created_at,
-                }
-            )
-        )
+    with pooled_client() as client:
+        collection = _open_collection(client, collection_name)
+        properties = _document_properties({"title": title, "content": content, "source": source})
+        vector = query_vector(_embedding_text(properties))
+        doc_id = collection.data.insert(properties, vector=vector)
+    _collection_changed(collection_name)
+    return str(doc_id)
 
 
-def upload_txt_files(paths: Iterable[str | Path], collection_name: str = WEAVIATE_COLLECTION) -> int:
-    file_paths = list(_iter_txt_files(paths))
-    if not file_paths:
-        return 0
-    items = []
+def _iter_txt_items(file_paths: Iterable[Path]) -> Iterable[dict]:
     for file_path in file_paths:
         text = file_path.read_text(encoding="utf-8", errors="ignore").strip()
         if not text:
             continue
-        items.append(
-            {
-                "title": file_path.stem,
-                "content": text,
-                "source": str(file_path),
-            }
+        yield {
+            "title": file_path.stem,
+            "content": text,
+            "source": str(file_path),
+        }
+
+
+def upload_txt_files(paths: Iterable[str | Path], collection_name: str = WEAVIATE_COLLECTION) -> int:
+    file_paths = list(_iter_txt_files(paths))
+    if not file_paths:
+        return 0
+    return ingest_texts(_iter_txt_items(file_paths), collection_name=collection_name)["inserted"]
+
+
+@telemetry.traced(
+    "weaviate.ingest",
+    lambda report: {key: report[key] for key in ("inserted", "skipped", "updated", "deleted", "failed")},
+)
+def ingest_texts(
+    items: Iterable[dict],
+    collection_name: str = WEAVIATE_COLLECTION,
+    mode: str | None = None,
+    batch_size: int | None = None,
+    concurrency: int | None = None,
+    incremental: bool | None = None,
+) -> dict:
+    if incremental is None:
+        incremental = WEAVIATE_INGEST_INCREMENTAL
+    with pooled_client() as client:
+        report = _insert_documents(
+            client,
+            items,
+            collection_name,
+            mode=mode,
+            batch_size=batch_size,
+            concurrency=concurrency,
+            incremental=incremental,
         )
-    with connect_client() as client:
-        return _insert_documents(client, items, collection_name)
+    invalidate_inventory_cache(collection_name)
+    if report["inserted"] or report["updated"] or report["deleted"]:
+        search_cache.invalidate(collection_name)
+    for error in report["errors"][:5]:
+        print(f"[weaviate] insert failed in {collection_name}: {error}")
+    return report
 
 
 def upload_texts(
     items: Iterable[dict],
     collection_name: str = WEAVIATE_COLLECTION,
 ) -> int:
-    with connect_client() as client:
-        return _insert_documents(client, items, collection_name)
+    return ingest_texts(items, collection_name=collection_name)["inserted"]
 
 
 def _format_results(response) -> list[dict]:
@@ -211,22 +883,118 @@ def _format_results(response) -> list[dict]:
     return results
 
 
-def search_semantic(query: str, limit: int = 5, collection_name: str = WEAVIATE_COLLECTION) -> list[dict]:
-    with connect_client() as client:
-        ensure_collection(client, collection_name)
-        collection = client.collections.use(collection_name)
-        response = collection.query.near_text(
-            query=query,
-            limit=limit,
-            return_metadata=MetadataQuery(distance=True),
-            return_properties=[
-                DOC_TITLE_FIELD,
-                DOC_CONTENT_FIELD,
-                DOC_SOURCE_FIELD,
-                DOC_CREATED_AT_FIELD,
-            ],
-        )
-        return _format_results(response)
+_RETURN_PROPERTIES = [
+    DOC_TITLE_FIELD,
+    DOC_CONTENT_FIELD,
+    DOC_SOURCE_FIELD,
+    DOC_CREATED_AT_FIELD,
+]
+
+
+def _search_request(
+    mode: str,
+    query: str,
+    limit: int,
+    fields: Iterable[str] | None = None,
+    alpha: float = WEAVIATE_HYBRID_ALPHA,
+    vector: list[float] | None = None,
+) -> tuple[str, dict]:
+    query_fields = list(fields or [DOC_TITLE_FIELD, DOC_CONTENT_FIELD])
+    if mode == "keyword":
+        return "bm25", {
+            "query": query,
+            "query_properties": query_fields,
+            "limit": limit,
+            "return_metadata": MetadataQuery(score=True),
+            "return_properties": _RETURN_PROPERTIES,
+        }
+    if mode == "hybrid":
+        return "hybrid", {
+            "query": query,
+            "query_properties": query_fields,
+            "alpha": alpha,
+            "vector": vector,
+            "limit": limit,
+            "return_metadata": MetadataQuery(score=True),
+            "return_properties": _RETURN_PROPERTIES,
+        }
+    if vector is not None:
+        return "near_vector", {
+            "near_vector": vector,
+            "limit": limit,
+            "return_metadata": MetadataQuery(distance=True),
+            "return_properties": _RETURN_PROPERTIES,
+        }
+    return "near_text", {
+        "query": query,
+        "limit": limit,
+        "return_metadata": MetadataQuery(distance=True),
+        "return_properties": _RETURN_PROPERTIES,
+    }
+
+
+def uses_local_backend() -> bool:
+    return WEAVIATE_BACKEND == "local"
+
+
+def has_local_fallback(collection_name: str) -> bool:
+    """Whether searches on ``collection_name`` can be served while Weaviate is down."""
+    return WEAVIATE_LOCAL_FALLBACK and local_index.has_index(collection_name)
+
+
+def _local_search(collection_name: str, method: str, kwargs: dict) -> list[dict] | None:
+    """Run a ``_search_request`` against the local mirror; ``None`` if there is none."""
+    index = local_index.get_index(collection_name)
+    if index is None:
+        return None
+    limit = kwargs["limit"]
+    if method == "bm25":
+        return index.search_keyword(kwargs["query"], limit)
+    vector = kwargs.get("vector") or kwargs.get("near_vector")
+    if vector is None and "query" in kwargs:
+        try:
+            vector = index.query_vector(kwargs["query"])
+        except Exception as exc:
+            # The embedding API may be down too; hybrid degrades to keyword-only.
+            print(f"[local_index] query embedding failed: {exc!r}")
+    if method == "hybrid":
+        return index.search_hybrid(kwargs["query"], vector, limit, kwargs.get("alpha", WEAVIATE_HYBRID_ALPHA))
+    return index.search_semantic(vector, limit)
+
+
+def _search_with_fallback(collection_name: str, method: str, kwargs: dict, error: Exception) -> list[dict]:
+    results = _local_search(collection_name, method, kwargs) if WEAVIATE_LOCAL_FALLBACK else None
+    if results is None:
+        raise error
+    print(f"[weaviate] {method} on {collection_name} failed ({error!r}); served from local index")
+    return results
+
+
+def _run_search(collection_name: str, method: str, kwargs: dict) -> list[dict]:
+    if uses_local_backend():
+        results = _local_search(collection_name, method, kwargs)
+        if results is None:
+            raise RuntimeError(f"No local index for {collection_name}; run src/local_index.py")
+        return results
+    try:
+        with pooled_client() as client:
+            collection = _open_collection(client, collection_name)
+            response = getattr(collection.query, method)(**kwargs)
+            return _format_results(response)
+    except Exception as exc:
+        return _search_with_fallback(collection_name, method, kwargs, exc)
+
+
+def search_semantic(
+    query: str,
+    limit: int = 5,
+    collection_name: str = WEAVIATE_COLLECTION,
+    vector: list[float] | None = None,
+) -> list[dict]:
+    if vector is None:
+        vector = query_vector(query)
+    method, kwargs = _search_request("semantic", query, limit, vector=vector)
+    return _run_search(collection_name, method, kwargs)
 
 
 def search_keyword(
@@ -235,23 +1003,8 @@ def search_keyword(
     limit: int = 10,
     collection_name: str = WEAVIATE_COLLECTION,
 ) -> list[dict]:
-    query_fields = list(fields or [DOC_TITLE_FIELD, DOC_CONTENT_FIELD])
-    with connect_client() as client:
-        ensure_collection(client, collection_name)
-        collection = client.collections.use(collection_name)
-        response = collection.query.bm25(
-            query=query,
-            query_properties=query_fields,
-            limit=limit,
-            return_metadata=MetadataQuery(score=True),
-            return_properties=[
-                DOC_TITLE_FIELD,
-                DOC_CONTENT_FIELD,
-                DOC_SOURCE_FIELD,
-                DOC_CREATED_AT_FIELD,
-            ],
-        )
-        return _format_results(response)
+    method, kwargs = _search_request("keyword", query, limit, fields=fields)
+    return _run_search(collection_name, method, kwargs)
 
 
 def search_hybrid(
@@ -260,25 +1013,12 @@ def search_hybrid(
     limit: int = 10,
     alpha: float = WEAVIATE_HYBRID_ALPHA,
     collection_name: str = WEAVIATE_COLLECTION,
+    vector: list[float] | None = None,
 ) -> list[dict]:
-    query_fields = list(fields or [DOC_TITLE_FIELD, DOC_CONTENT_FIELD])
-    with connect_client() as client:
-        ensure_collection(client, collection_name)
-        collection = client.collections.use(collection_name)
-        response = collection.query.hybrid(
-            query=query,
-            query_properties=query_fields,
-            alpha=alpha,
-            limit=limit,
-            return_metadata=MetadataQuery(score=True),
-            return_properties=[
-                DOC_TITLE_FIELD,
-                DOC_CONTENT_FIELD,
-                DOC_SOURCE_FIELD,
-                DOC_CREATED_AT_FIELD,
-            ],
-        )
-        return _format_results(response)
+    if vector is None:
+        vector = query_vector(query)
+    method, kwargs = _search_request("hybrid", query, limit, fields=fields, alpha=alpha, vector=vector)
+    return _run_search(collection_name, method, kwargs)
 
 
 def _normalize_search_mode(mode: str | None) -> str:
@@ -290,15 +1030,15 @@ def _normalize_search_mode(mode: str | None) -> str:
     return "semantic"
 
 
+@telemetry.traced("weaviate.list_documents")
 def list_documents(
     limit: int = 20,
     offset: int = 0,
     sort_desc: bool = True,
     collection_name: str = WEAVIATE_COLLECTION,
 ) -> list[dict]:
-    with connect_client() as client:
-        ensure_collection(client, collection_name)
-        collection = client.collections.use(collection_name)
+    with pooled_client() as client:
+        collection = _open_collection(client, collection_name)
         response = collection.query.fetch_objects(
             limit=limit,
             offset=offset,
@@ -313,117 +1053,343 @@ def list_documents(
         return _format_results(response)
 
 
-def list_sources(collection_name: str = WEAVIATE_COLLECTION, limit: int = 2000) -> list[dict]:
-    sources: dict[str, dict] = {}
-    with connect_client() as client:
-        ensure_collection(client, collection_name)
-        collection = client.collections.use(collection_name)
-        offset = 0
-        batch = 200
-        while offset < limit:
-            response = collection.query.fetch_objects(
-                limit=batch,
-                offset=offset,
-                return_properties=[DOC_SOURCE_FIELD, DOC_CREATED_AT_FIELD],
-            )
-            objects = response.objects or []
-            if not objects:
-                break
-            for obj in objects:
-                props = obj.properties or {}
-                source = props.get(DOC_SOURCE_FIELD) or ""
-                base = source.split("#", 1)[0] if source else ""
-                if not base:
-                    continue
-                created_at = props.get(DOC_CREATED_AT_FIELD) or ""
-                entry = sources.setdefault(
-                    base,
-                    {
-                        "source": base,
-                        "count": 0,
-                        "first_created_at": created_at,
-                        "last_created_at": created_at,
-                    },
-                )
-                entry["count"] += 1
-                if created_at:
-                    if not entry.get("first_created_at") or created_at < entry["first_created_at"]:
-                        entry["first_created_at"] = created_at
-                    if not entry.get("last_created_at") or created_at > entry["last_created_at"]:
-                        entry["last_created_at"] = created_at
-            offset += batch
-    return sorted(sources.values(), key=lambda item: item["source"])
+def _iso(value) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value or ""
+
+
+def _aggregate_sources(collection, max_sources: int) -> list[dict]:
+    response = collection.aggregate.over_all(
+        group_by=GroupByAggregate(prop=DOC_SOURCE_BASE_FIELD, limit=max_sources),
+        total_count=True,
+        return_metrics=Metrics(DOC_CREATED_AT_FIELD).date_(minimum=True, maximum=True),
+    )
+    sources = []
+    for group in response.groups:
+        base = group.grouped_by.value
+        if not base:
+            continue
+        created = group.properties.get(DOC_CREATED_AT_FIELD)
+        sources.append(
+            {
+                "source": base,
+                "count": group.total_count or 0,
+                "first_created_at": _iso(getattr(created, "minimum", None)),
+                "last_created_at": _iso(getattr(created, "maximum", None)),
+            }
+        )
+    return sorted(sources, key=lambda item: item["source"])
+
+
+_inventory_cache: dict[str, tuple[float, list[dict]]] = {}
+_inventory_lock = threading.Lock()
+
+
+def invalidate_inventory_cache(collection_name: str | None = None) -> None:
+    with _inventory_lock:
+        if collection_name is None:
+            _inventory_cache.clear()
+        else:
+            _inventory_cache.pop(collection_name, None)
+
+
+def _collection_changed(collection_name: str) -> None:
+    invalidate_inventory_cache(collection_name)
+    search_cache.invalidate(collection_name)
+
+
+def list_sources(
+    collection_name: str = WEAVIATE_COLLECTION,
+    limit: int = WEAVIATE_INVENTORY_MAX_SOURCES,
+    use_cache: bool | None = None,
+) -> list[dict]:
+    """Per-source chunk counts and date range from one grouped aggregate.
+
+    The seed collection only changes through this module (or a re-seed), so
+    its inventory is cached in-process; pass ``use_cache`` to override.
+    """
+    if use_cache is None:
+        use_cache = collection_name == seed_collection_name()
+    if use_cache:
+        with _inventory_lock:
+            cached = _inventory_cache.get(collection_name)
+        if cached and time.monotonic() - cached[0] < WEAVIATE_SEED_INVENTORY_TTL_S:
+            return [dict(entry) for entry in cached[1]]
+    with telemetry.span("weaviate.list_sources", collection=collection_name), pooled_client() as client:
+        collection = _open_collection(client, collection_name)
+        sources = _aggregate_sources(collection, limit)
+    if use_cache:
+        with _inventory_lock:
+            _inventory_cache[collection_name] = (time.monotonic(), sources)
+        return [dict(entry) for entry in sources]
+    return sources
+
 
+def is_seed_source(source: str) -> bool:
+    base = source_base_of(source)
+    return any(entry["source"] == base for entry in list_sources(collection_name=seed_collection_name()))
 
+
+@telemetry.traced("weaviate.delete_source", lambda deleted: {"deleted": deleted})
 def delete_source(source: str, collection_name: str = WEAVIATE_COLLECTION) -> int:
+    """Delete every chunk of ``source`` with server-side ``delete_many`` calls.
+
+    Matches on ``source_base``; objects ingested before that property existed
+    need ``src/backfill_source_base.py`` run once.
+    """
     if not source:
         return 0
-    to_delete: list[str] = []
-    with connect_client() as client:
-        ensure_collection(client, collection_name)
-        collection = client.collections.use(collection_name)
-        offset = 0
-        batch = 200
+    where = Filter.by_property(DOC_SOURCE_BASE_FIELD).equal(source)
+    deleted = 0
+    with pooled_client() as client:
+        collection = _open_collection(client, collection_name)
+        # Each call is capped by the server's QUERY_MAXIMUM_RESULTS, so repeat until clean.
         while True:
-            response = collection.query.fetch_objects(
-                limit=batch,
-                offset=offset,
-                return_properties=[DOC_SOURCE_FIELD],
-            )
-            objects = response.objects or []
-            if not objects:
+            result = collection.data.delete_many(where=where)
+            deleted += result.successful
+            if not result.matches or not result.successful:
                 break
-            for obj in objects:
-                props = obj.properties or {}
-                value = props.get(DOC_SOURCE_FIELD) or ""
-                if value.split("#", 1)[0] == source:
-                    to_delete.append(str(obj.uuid))
-            offset += batch
-        deleted = 0
-        for doc_id in to_delete:
-            if collection.data.delete_by_id(doc_id):
-                deleted += 1
-        return deleted
+    _collection_changed(collection_name)
+    return deleted
 
 
+@telemetry.traced("weaviate.delete_document")
 def delete_document(doc_id: str, collection_name: str = WEAVIATE_COLLECTION) -> bool:
-    with connect_client() as client:
-        ensure_collection(client, collection_name)
-        collection = client.collections.use(collection_name)
-        return bool(collection.data.delete_by_id(doc_id))
+    with pooled_client() as client:
+        collection = _open_collection(client, collection_name)
+        deleted = bool(collection.data.delete_by_id(doc_id))
+    _collection_changed(collection_name)
+    return deleted
 
 
-def search_txt(query: str, limit: int = 5, collection_name: str = WEAVIATE_COLLECTION) -> list[dict]:
+def search_txt(
+    query: str,
+    limit: int = 5,
+    collection_name: str = WEAVIATE_COLLECTION,
+    vector: list[float] | None = None,
+) -> list[dict]:
     mode = _normalize_search_mode(WEAVIATE_SEARCH_MODE)
-    if mode == "keyword":
-        return search_keyword(query=query, limit=limit, collection_name=collection_name)
-    if mode == "hybrid":
-        return search_hybrid(query=query, limit=limit, collection_name=collection_name)
-    return search_semantic(query=query, limit=limit, collection_name=collection_name)
+    try:
+        with telemetry.span("weaviate.search", collection=collection_name, mode=mode):
+            if mode == "keyword":
+                return search_keyword(query=query, limit=limit, collection_name=collection_name)
+            if mode == "hybrid":
+                return search_hybrid(query=query, limit=limit, collection_name=collection_name, vector=vector)
+            return search_semantic(query=query, limit=limit, collection_name=collection_name, vector=vector)
+    except Exception:
+        # The collection may have been dropped by another process; re-verify next time.
+        invalidate_collection_cache(collection_name)
+        raise
+
+
+def _fusion_weights(names: list[str], weights: dict[str, float] | None) -> dict[str, float]:
+    resolved = fusion.default_weights(names, seed_collection_name())
+    resolved.update(weights or {})
+    return resolved
 
 
-def _rank_result(item: dict) -> float:
-    score = item.get("score")
-    if isinstance(score, (int, float)):
-        return float(score)
-    distance = item.get("distance")
-    if isinstance(distance, (int, float)):
-        return 1.0 / (1.0 + float(distance))
-    return 0.0
+def _fusion_mode(mode: str, weights: dict[str, float]) -> str:
+    # Part of the search-cache key: another method or weighting is another ranking.
+    weighting = ",".join(f"{name}={weight:g}" for name, weight in sorted(weights.items()))
+    return f"{mode}|{fusion.normalize_method(None)}|{weighting}"
+
+
+def _search_cache_lookup(
+    query: str,
+    limit: int,
+    names: list[str],
+    mode: str,
+    vector: list[float] | None,
+) -> tuple[list[dict] | None, dict[str, int] | None]:
+    cache = search_cache.get_search_cache()
+    if cache is None or not names:
+        return None, None
+    # Snapshot generations before searching so a concurrent write wins.
+    generations = {name: search_cache.collection_generation(name) for name in names}
+    cached = cache.get(query, names, mode, limit, vector=vector, generations=generations)
+    if cached is not None:
+        return cached, None
+    return None, generations
+
+
+def _search_cache_store(
+    query: str,
+    limit: int,
+    names: list[str],
+    mode: str,
+    vector: list[float] | None,
+    results: list[dict],
+    latency_s: float,
+    generations: dict[str, int] | None,
+) -> None:
+    cache = search_cache.get_search_cache()
+    if cache is None or generations is None:
+        return
+    cache.put(query, names, mode, limit, results, latency_s, vector=vector, generations=generations)
 
 
 def search_across_collections(
     query: str,
     limit: int,
     collection_names: Iterable[str],
+    weights: dict[str, float] | None = None,
+) -> list[dict]:
+    """Search every collection and merge the hits with ``fusion.fuse``.
+
+    ``weights`` overrides the per-collection fusion weights (by default the
+    user's own collections get ``SEARCH_WEIGHT_USER``, the seed collection
+    ``SEARCH_WEIGHT_SEED``).
+    """
+    names = [name for name in dict.fromkeys(collection_names) if name]
+    with telemetry.span("search.across_collections", collections=len(names), limit=limit) as attributes:
+        results = _search_across_collections(query, limit, names, _fusion_weights(names, weights))
+        attributes["results"] = len(results)
+        return results
+
+
+def _search_across_collections(
+    query: str,
+    limit: int,
+    names: list[str],
+    weights: dict[str, float],
 ) -> list[dict]:
-    results: list[dict] = []
-    for name in collection_names:
-        if not name:
+    mode = _normalize_search_mode(WEAVIATE_SEARCH_MODE)
+    cache_mode = _fusion_mode(mode, weights)
+    vector = None
+    if names and mode != "keyword":
+        vector = query_vector(query)
+    cached, generations = _search_cache_lookup(query, limit, names, cache_mode, vector)
+    if cached is not None:
+        return cached
+    started = time.perf_counter()
+    hits_by_collection = {
+        name: search_txt(query=query, limit=limit, collection_name=name, vector=vector) for name in names
+    }
+    results = fusion.fuse(hits_by_collection, limit, weights=weights)
+    _search_cache_store(
+        query, limit, names, cache_mode, vector, results, time.perf_counter() - started, generations
+    )
+    return results
+
+
+async def search_txt_async(
+    query: str,
+    limit: int = 5,
+    collection_name: str = WEAVIATE_COLLECTION,
+    vector: list[float] | None = None,
+) -> list[dict]:
+    mode = _normalize_search_mode(WEAVIATE_SEARCH_MODE)
+    if vector is None and mode != "keyword":
+        vector = await asyncio.to_thread(query_vector, query)
+    method, kwargs = _search_request(mode, query, limit, vector=vector)
+    if uses_local_backend():
+        return await asyncio.to_thread(_run_search, collection_name, method, kwargs)
+    try:
+        with telemetry.span("weaviate.search", collection=collection_name, mode=mode):
+            async with pooled_async_client() as client:
+                collection = await _open_collection_async(client, collection_name)
+                response = await getattr(collection.query, method)(**kwargs)
+    except Exception as exc:
+        invalidate_collection_cache(collection_name)
+        return await asyncio.to_thread(_search_with_fallback, collection_name, method, kwargs, exc)
+    return _format_results(response)
+
+
+async def search_across_collections_async(
+    query: str,
+    limit: int,
+    collection_names: Iterable[str],
+    deadline_s: float = WEAVIATE_SEARCH_DEADLINE_S,
+    weights: dict[str, float] | None = None,
+) -> dict:
+    """Query all collections concurrently and keep whatever answers by the deadline.
+
+    ``deadline_s`` covers the whole call, including the client-side query
+    embedding and the cache lookup. Returns ``{"results", "missing",
+    "partial", "cached"}`` where ``missing`` lists the collections that timed
+    out or failed. Partial results are never cached.
+    """
+    names = [name for name in dict.fromkeys(collection_names) if name]
+    with telemetry.span("search.across_collections", collections=len(names), limit=limit) as attributes:
+        search = await _search_across_collections_async(
+            query, limit, names, deadline_s, _fusion_weights(names, weights)
+        )
+        attributes.update(
+            results=len(search["results"]),
+            partial=search["partial"],
+            cached=search["cached"],
+        )
+        return search
+
+
+def _prepare_search(
+    query: str,
+    limit: int,
+    names: list[str],
+    mode: str,
+    cache_mode: str,
+) -> tuple[list[float] | None, list[dict] | None, dict[str, int] | None]:
+    # Embed once for every collection (cached on disk in client mode).
+    vector = query_vector(query) if mode != "keyword" else None
+    cached, generations = _search_cache_lookup(query, limit, names, cache_mode, vector)
+    return vector, cached, generations
+
+
+async def _search_across_collections_async(
+    query: str,
+    limit: int,
+    names: list[str],
+    deadline_s: float,
+    weights: dict[str, float],
+) -> dict:
+    if not names:
+        return {"results": [], "missing": [], "partial": False, "cached": False}
+    mode = _normalize_search_mode(WEAVIATE_SEARCH_MODE)
+    cache_mode = _fusion_mode(mode, weights)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + deadline_s
+    try:
+        # Embedding, marker stats and the near-duplicate scan stay off the event loop
+        # and count against the deadline like the searches themselves.
+        vector, cached, generations = await asyncio.wait_for(
+            asyncio.to_thread(_prepare_search, query, limit, names, mode, cache_mode), deadline_s
+        )
+    except asyncio.TimeoutError:
+        print(f"[weaviate] query embedding exceeded the {deadline_s:.2f} s search deadline")
+        return {"results": [], "missing": sorted(names), "partial": True, "cached": False}
+    if cached is not None:
+        return {"results": cached, "missing": [], "partial": False, "cached": True}
+    started = time.perf_counter()
+    tasks = {
+        asyncio.ensure_future(
+            search_txt_async(query=query, limit=limit, collection_name=name, vector=vector)
+        ): name
+        for name in names
+    }
+    done, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline - loop.time()))
+    for task in pending:
+        task.cancel()
+    missing = [tasks[task] for task in pending]
+    hits_by_collection: dict[str, list[dict]] = {}
+    for task in done:
+        name = tasks[task]
+        error = task.exception()
+        if error is not None:
+            print(f"[weaviate] search failed for {name}: {error!r}")
+            missing.append(name)
             continue
-        hits = search_txt(query=query, limit=limit, collection_name=name)
-        for hit in hits:
-            hit.setdefault("collection", name)
-            results.append(hit)
-    results.sort(key=_rank_result, reverse=True)
-    return results[:limit]
+        hits_by_collection[name] = task.result()
+    # Fuse in request order, not completion order, so ties break the same way every time.
+    ordered = {name: hits_by_collection[name] for name in names if name in hits_by_collection}
+    results = fusion.fuse(ordered, limit, weights=weights)
+    if not missing:
+        _search_cache_store(
+            query, limit, names, cache_mode, vector, results, time.perf_counter() - started, generations
+        )
+    return {
+        "results": results,
+        "missing": sorted(missing),
+        "partial": bool(missing),
+        "cached": False,
+    }
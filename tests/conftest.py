@@ -0,0 +1,27 @@
+"""Shared test setup: offline defaults and the src/, agent/ and api_server/ import paths.
+
+Everything here runs without Weaviate, OpenAI or LiveKit: embeddings come
+from ``embeddings.FakeEmbedder`` and searches from ``local_index``.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+_SCRATCH = Path(tempfile.mkdtemp(prefix="voice-agent-tests-"))
+
+# Module-level settings are read at import time, so set them before any import.
+os.environ.setdefault("EMBEDDER", "fake")
+os.environ.setdefault("TELEMETRY_EXPORTER", "none")
+os.environ.setdefault("EMBEDDING_CACHE_PATH", str(_SCRATCH / "embedding_cache.sqlite3"))
+os.environ.setdefault("LOCAL_INDEX_DIR", str(_SCRATCH / "local_index"))
+os.environ.setdefault("SEARCH_CACHE_MARKER_DIR", str(_SCRATCH / "search_cache"))
+os.environ.setdefault("TRANSCRIPT_DB_PATH", str(_SCRATCH / "transcripts.sqlite3"))
+
+for path in (BASE_DIR / "src", BASE_DIR / "agent", BASE_DIR / "api_server"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
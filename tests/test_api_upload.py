@@ -0,0 +1,55 @@
+import asyncio
+import io
+
+import httpx
+import pytest
+
+import api
+
+
+class Chunks(io.RawIOBase):
+    """A large upload produced on the fly, so the test never holds it in memory."""
+
+    def __init__(self, size: int) -> None:
+        self.remaining = size
+
+    def read(self, size: int = -1) -> bytes:
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        self.remaining -= size
+        return b"x" * size
+
+
+def test_save_upload_is_unlimited_by_default(tmp_path):
+    destination = tmp_path / "big.pdf"
+    size = 5 * api.UPLOAD_COPY_CHUNK_BYTES + 7
+    assert api.UPLOAD_MAX_BYTES == 0
+    assert api._save_upload(Chunks(size), destination) == size
+    assert destination.stat().st_size == size
+    assert not (tmp_path / "big.pdf.part").exists()
+
+
+def test_save_upload_limit_keeps_the_previous_file(tmp_path):
+    destination = tmp_path / "doc.pdf"
+    destination.write_bytes(b"old")
+    with pytest.raises(api.UploadTooLargeError):
+        api._save_upload(Chunks(3 * api.UPLOAD_COPY_CHUNK_BYTES), destination, max_bytes=api.UPLOAD_COPY_CHUNK_BYTES)
+    assert destination.read_bytes() == b"old"
+    assert not (tmp_path / "doc.pdf.part").exists()
+
+
+def test_upload_over_the_limit_is_413(monkeypatch, tmp_path):
+    monkeypatch.setattr(api, "UPLOADS_DIR", tmp_path)
+    monkeypatch.setattr(api, "UPLOAD_MAX_BYTES", 10)
+    monkeypatch.setattr(api.ingest_queue, "submit", lambda params: pytest.fail("must not be queued"))
+
+    async def upload():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(
+                "/documents/upload",
+                data={"name": "Alice"},
+                files={"file": ("guide.pdf", b"%PDF-1.4 " + b"x" * 100, "application/pdf")},
+            )
+
+    assert asyncio.run(upload()).status_code == 413
+    assert not list(tmp_path.rglob("guide.pdf*"))
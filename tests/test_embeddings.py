@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import pytest
+
+import embeddings
+
+
+class CountingEmbedder(embeddings.FakeEmbedder):
+    def __init__(self) -> None:
+        super().__init__(dims=32)
+        self.calls: list[list[str]] = []
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(list(texts))
+        return super().embed(texts)
+
+
+def test_fake_embedder_is_deterministic_and_normalised():
+    first, second = embeddings.FakeEmbedder(dims=32).embed(["úřední hodiny", "úřední hodiny"])
+    assert first == second
+    assert abs(sum(value * value for value in first) - 1.0) < 1e-9
+
+
+def test_cached_embedder_counts_hits_and_misses(tmp_path):
+    inner = CountingEmbedder()
+    embedder = embeddings.CachedEmbedder(inner, embeddings.EmbeddingCache(tmp_path / "cache.sqlite3"))
+
+    vectors = embedder.embed(["a b", "c d", "a b"])
+    assert embedder.stats == {"hits": 0, "misses": 2}
+    assert inner.calls == [["a b", "c d"]]
+    assert vectors[0] == vectors[2]
+
+    again = embedder.embed(["c d", "e f"])
+    assert embedder.stats == {"hits": 1, "misses": 3}
+    assert inner.calls[-1] == ["e f"]
+    # Served from the cache, which stores float32.
+    assert again[0] == pytest.approx(vectors[1], abs=1e-6)
+
+
+def test_cached_embedder_batches_misses(tmp_path):
+    inner = CountingEmbedder()
+    embedder = embeddings.CachedEmbedder(inner, embeddings.EmbeddingCache(tmp_path / "cache.sqlite3"), batch_size=2)
+    embedder.embed([f"text {i}" for i in range(5)])
+    assert [len(call) for call in inner.calls] == [2, 2, 1]
+
+
+def test_embedding_cache_persists_across_instances(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    first = embeddings.CachedEmbedder(CountingEmbedder(), embeddings.EmbeddingCache(path))
+    vector = first.embed_one("Zikova 4")
+    first.cache.close()
+
+    inner = CountingEmbedder()
+    second = embeddings.CachedEmbedder(inner, embeddings.EmbeddingCache(path))
+    restored = second.embed_one("Zikova 4")
+    assert inner.calls == []
+    assert second.stats["hits"] == 1
+    assert restored == pytest.approx(vector, abs=1e-6)
+
+
+def test_cache_keys_include_the_model(tmp_path):
+    cache = embeddings.EmbeddingCache(tmp_path / "cache.sqlite3")
+    key = embeddings.text_hash("text")
+    cache.put_many("model-a", {key: [1.0, 0.0]})
+    assert cache.get_many("model-a", [key]) == {key: [1.0, 0.0]}
+    assert cache.get_many("model-b", [key]) == {}
@@ -0,0 +1,59 @@
+import pytest
+
+import fusion
+
+
+def hits(prefix, scores):
+    return [{"id": f"{prefix}{i}", "score": score} for i, score in enumerate(scores)]
+
+
+def test_default_method_is_minmax_and_unknown_falls_back():
+    assert fusion.FUSION_METHODS[0] == "minmax"
+    assert fusion.normalize_method("RRF") == "rrf"
+    assert fusion.normalize_method("bogus") == "minmax"
+
+
+def test_raw_scores_and_distances():
+    assert fusion.raw_score({"score": 0.4}) == 0.4
+    assert fusion.raw_score({"distance": 1.0}) == 0.5
+    assert fusion.raw_score({}) == 0.0
+
+
+def test_raw_keeps_score_gaps_across_collections():
+    fused = fusion.fuse({"user": hits("u", [0.9, 0.2]), "seed": hits("s", [1.0, 0.8])}, 4, method="raw")
+    assert [hit["id"] for hit in fused] == ["s0", "u0", "s1", "u1"]
+    assert fused[0]["collection"] == "seed"
+
+
+def test_rrf_interleaves_by_rank_and_ties_keep_input_order():
+    fused = fusion.fuse({"user": hits("u", [0.9, 0.2]), "seed": hits("s", [1.0, 0.8])}, 4, method="rrf")
+    assert [hit["id"] for hit in fused] == ["u0", "s0", "u1", "s1"]
+    assert fused[0]["fused_score"] == pytest.approx(1 / 61, abs=1e-6)
+
+
+def test_rrf_weight_promotes_exactly_the_top_four():
+    user, seed = hits("u", [1.0] * 6), hits("s", [1.0] * 6)
+    fused = fusion.fuse({"seed": seed, "user": user}, 12, method="rrf", weights={"user": 1.05})
+    # 1.05 / (60 + r) > 1 / 61 holds for r < 4.05.
+    assert [hit["id"] for hit in fused[:5]] == ["u0", "u1", "u2", "u3", "s0"]
+
+
+def test_minmax_normalises_each_list():
+    fused = fusion.fuse({"user": hits("u", [0.3, 0.1]), "seed": hits("s", [0.9, 0.5, 0.1])}, 5, method="minmax")
+    scores = {hit["id"]: hit["fused_score"] for hit in fused}
+    assert scores["u0"] == scores["s0"] == 1.0
+    assert scores["s1"] == pytest.approx(0.5)
+    assert scores["u1"] == scores["s2"] == 0.0
+
+
+def test_duplicates_keep_their_best_score_and_limit_applies():
+    fused = fusion.fuse({"a": hits("x", [0.2, 0.1]), "b": hits("x", [0.9])}, 5, method="raw")
+    assert [(hit["id"], hit["fused_score"]) for hit in fused] == [("x0", 0.9), ("x1", 0.1)]
+    assert fusion.fuse({"a": hits("x", [0.5, 0.4, 0.3])}, 2, method="raw")[-1]["id"] == "x1"
+    assert fusion.fuse({"a": []}, 3) == []
+
+
+def test_default_normalises_each_collection():
+    # Semantic hits carry distances, keyword hits BM25 scores well above 1.
+    fused = fusion.fuse({"user": [{"id": "u0", "distance": 0.4}], "seed": hits("s", [7.5, 3.0])}, 3)
+    assert [hit["id"] for hit in fused] == ["u0", "s0", "s1"]
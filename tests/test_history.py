@@ -0,0 +1,62 @@
+from history import (
+    SUMMARY_PREFIX,
+    StubSummarizer,
+    compact_history,
+    estimate_tokens,
+    needs_summary,
+    split_history,
+)
+
+
+def turn(role: str, text: str, tokens: int) -> dict:
+    return {"role": role, "content": (text + " " + "x" * (tokens * 4)).strip()[: tokens * 4]}
+
+
+def conversation(turns: int, tokens: int) -> list[dict]:
+    return [
+        turn("user" if n % 2 == 0 else "assistant", f"Otázka {n}. Podrobnosti.", tokens) for n in range(turns)
+    ]
+
+
+def test_under_budget_replays_everything_without_summary():
+    items = conversation(4, 100) + [{"role": "system", "content": "ignored"}, {"role": "user", "content": "  "}]
+    assert not needs_summary(items[:4], token_budget=1200)
+    assert compact_history(items, "stored summary", token_budget=1200) == (None, items[:4])
+    assert split_history(items, token_budget=1200) == ([], items[:4])
+
+
+def test_recent_turns_are_capped_and_older_ones_summarised():
+    items = conversation(12, 50)
+    older, recent = split_history(items, token_budget=500, recent_turns=4)
+    assert recent == items[-4:] and older == items[:-4]
+
+    summary, kept = compact_history(items, "Ptal se na koleje.", token_budget=500, recent_turns=4)
+    assert kept == items[-4:]
+    assert summary == SUMMARY_PREFIX + "Ptal se na koleje."
+
+
+def test_verbatim_turns_leave_room_for_the_summary():
+    items = conversation(10, 200)
+    # 1200 budget minus the 300-token summary reserve fits four 200-token turns.
+    summary, kept = compact_history(items, None, token_budget=1200, recent_turns=8)
+    assert kept == items[-4:]
+    assert summary.startswith(SUMMARY_PREFIX + "The user asked: Otázka 0.")
+    assert sum(estimate_tokens(item["content"]) for item in kept) + estimate_tokens(summary) <= 1200 + 1
+
+
+def test_long_stored_summary_is_trimmed_to_the_remaining_budget():
+    items = conversation(10, 200)
+    summary, kept = compact_history(items, "slovo " * 1000, token_budget=1200, recent_turns=8)
+    assert summary.endswith(" …")
+    assert estimate_tokens(summary) <= 1200 - sum(estimate_tokens(item["content"]) for item in kept) + 1
+
+
+def test_stub_summarizer_keeps_first_sentences_of_user_turns():
+    items = [
+        {"role": "user", "content": "Kdy má otevřeno studijní? A kde to je?"},
+        {"role": "assistant", "content": "Po–Čt 9–11."},
+        {"role": "user", "content": "Jaké je číslo účtu."},
+    ]
+    assert StubSummarizer().summarize(items) == "The user asked: Kdy má otevřeno studijní? | Jaké je číslo účtu."
+    assert StubSummarizer(max_tokens=5).summarize(items).endswith(" …")
+    assert StubSummarizer().summarize(items[1:2]) == ""
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+import ingest_jobs
+from ingest_jobs import IngestJobQueue, QueueFullError
+
+
+def wait_for(queue: IngestJobQueue, job_id: str, statuses: set[str], timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.005)
+    raise AssertionError(f"job stayed {queue.get(job_id)['status']}")
+
+
+def test_job_moves_from_queued_to_done():
+    release = threading.Event()
+
+    def handler(job, progress):
+        progress(pages_done=1)
+        release.wait(5)
+        return {"chunks": 3}
+
+    jobs = IngestJobQueue(handler, workers=1, max_pending=4)
+    first = jobs.submit({"file": "a.pdf"})
+    second = jobs.submit({"file": "b.pdf"})
+    assert first["status"] == "queued" and first["attempts"] == 0
+
+    running = wait_for(jobs, first["id"], {"running"})
+    assert running["progress"] == {"pages_done": 1}
+    assert jobs.get(second["id"])["status"] == "queued"
+    assert jobs.active() == 2
+
+    release.set()
+    done = wait_for(jobs, second["id"], {"done"})
+    assert done["result"] == {"chunks": 3} and done["error"] is None
+    assert done["started_at"] <= done["finished_at"]
+    assert jobs.active() == 0
+
+
+def test_retries_back_off_and_reset_progress():
+    attempts = []
+
+    def handler(job, progress):
+        attempts.append((time.monotonic(), dict(job["progress"])))
+        progress(pages_done=len(attempts) * 10)
+        if len(attempts) < 3:
+            raise RuntimeError("weaviate unavailable")
+        return {"ok": True}
+
+    jobs = IngestJobQueue(handler, workers=1, max_attempts=3, retry_delay_s=0.05)
+    job = wait_for(jobs, jobs.submit({})["id"], {"done", "failed"})
+
+    assert job["status"] == "done" and job["attempts"] == 3
+    assert job["progress"] == {"pages_done": 30}
+    # Every attempt starts with empty progress, not the failed attempt's counts.
+    assert [seen for _, seen in attempts] == [{}, {}, {}]
+    gaps = [later - earlier for (earlier, _), (later, _) in zip(attempts, attempts[1:])]
+    assert gaps[0] >= 0.05 and gaps[1] >= 0.1
+
+
+def test_job_fails_after_max_attempts():
+    def handler(job, progress):
+        raise ValueError("corrupt pdf")
+
+    jobs = IngestJobQueue(handler, workers=1, max_attempts=2, retry_delay_s=0.01)
+    job = wait_for(jobs, jobs.submit({})["id"], {"failed"})
+    assert job["attempts"] == 2 and "corrupt pdf" in job["error"] and job["finished_at"]
+
+
+def test_submit_raises_when_the_queue_is_full():
+    release = threading.Event()
+    jobs = IngestJobQueue(lambda job, progress: release.wait(5), workers=1, max_pending=1)
+    running = jobs.submit({})
+    wait_for(jobs, running["id"], {"running"})
+    jobs.submit({})
+    with pytest.raises(QueueFullError):
+        jobs.submit({})
+    release.set()
+
+
+def test_upload_returns_429_when_the_queue_is_full(monkeypatch, tmp_path):
+    import api
+
+    def full(params):
+        raise ingest_jobs.QueueFullError("Ingest queue is full")
+
+    monkeypatch.setattr(api, "UPLOADS_DIR", tmp_path)
+    monkeypatch.setattr(api.ingest_queue, "submit", full)
+
+    async def upload():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(
+                "/documents/upload",
+                data={"name": "Alice"},
+                files={"file": ("guide.pdf", b"%PDF-1.4 test", "application/pdf")},
+            )
+
+    response = asyncio.run(upload())
+    assert response.status_code == 429
+    assert list(tmp_path.rglob("guide.pdf"))
@@ -0,0 +1,89 @@
+import asyncio
+
+from prefetch import SearchPrefetcher, query_coverage
+
+
+class SlowSearch:
+    def __init__(self) -> None:
+        self.running = 0
+        self.peak = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self, query: str, limit: int) -> dict:
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.running -= 1
+        return {"results": [{"id": str(i), "q": query} for i in range(limit)], "missing": [], "partial": False}
+
+
+def test_query_coverage_uses_prefixes():
+    assert query_coverage("úřední hodiny studijního", "jaké jsou úřední hodiny studijního oddělení") == 1.0
+    assert query_coverage("úřední hodiny", "kde je menza") == 0.0
+
+
+def test_prefetches_run_one_at_a_time_and_take_cancels_the_rest():
+    async def scenario():
+        search = SlowSearch()
+        prefetcher = SearchPrefetcher(search, min_words=2, limit=4, max_concurrent=1)
+        prefetcher.on_transcript("úřední hodiny studijního", is_final=True)
+        prefetcher.on_transcript("kde najdu menzu dnes", is_final=True)
+        prefetcher.on_transcript("číslo účtu fakulty", is_final=True)
+        await asyncio.sleep(0.01)
+        assert (search.running, search.peak) == (1, 1)
+
+        take = asyncio.ensure_future(prefetcher.take("úřední hodiny studijního", 3))
+        await asyncio.sleep(0.01)
+        # The matching prefetch is kept, the two others no longer hold on to the pool.
+        assert prefetcher.stats["cancelled"] == 2
+        search.release.set()
+        result = await take
+        assert result["prefetched_from"] == "úřední hodiny studijního"
+        assert len(result["results"]) == 3
+        assert search.peak == 1
+        return prefetcher.close()
+
+    summary = asyncio.run(scenario())
+    assert summary["hits"] == 1 and summary["launched"] == 3
+
+
+def test_miss_cancels_in_flight_prefetches():
+    async def scenario():
+        search = SlowSearch()
+        prefetcher = SearchPrefetcher(search, min_words=2, limit=4)
+        prefetcher.on_transcript("kde najdu menzu dnes", is_final=True)
+        await asyncio.sleep(0.01)
+        assert await prefetcher.take("číslo účtu fakulty", 3) is None
+        await asyncio.sleep(0.01)
+        return search, prefetcher.summary()
+
+    search, summary = asyncio.run(scenario())
+    assert search.cancelled == 1
+    assert (summary["misses"], summary["cancelled"]) == (1, 1)
+
+
+def test_take_serves_smaller_and_covered_larger_requests():
+    async def instant(query: str, limit: int) -> dict:
+        return {"results": [{"id": str(i)} for i in range(limit)], "missing": [], "partial": False}
+
+    async def scenario():
+        # Built like the agent: the prefetch over-fetches candidate_count(5) = 15 hits.
+        prefetcher = SearchPrefetcher(instant, min_words=2, limit=15)
+        served = {}
+        for limit, candidates in ((3, 9), (5, 15), (7, 20), (20, 20)):
+            prefetcher._last_key = ""
+            prefetcher.on_transcript("úřední hodiny studijního", is_final=True)
+            await asyncio.sleep(0)
+            search = await prefetcher.take("úřední hodiny studijního", candidates, min_limit=limit)
+            served[limit] = None if search is None else len(search["results"])
+        return served
+
+    # Fewer candidates are trimmed; more are served with what the prefetch has
+    # as long as that covers the final limit.
+    assert asyncio.run(scenario()) == {3: 9, 5: 15, 7: 15, 20: None}
@@ -0,0 +1,38 @@
+import asyncio
+
+import rerank
+
+
+HITS = [
+    {"id": "menza", "title": "Menza", "content": "Jídelníček menzy a otevírací doba menzy."},
+    {"id": "dean", "title": "Děkanát", "content": "Úřední hodiny studijního oddělení: Po–Čt 9–11."},
+    {"id": "bank", "title": "Platby", "content": "Číslo účtu fakulty pro platbu školného."},
+]
+
+
+def test_candidate_count_overfetches_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(rerank, "RERANK_ENABLED", True)
+    monkeypatch.setattr(rerank, "RERANK_OVERFETCH", 3)
+    monkeypatch.setattr(rerank, "RERANK_MAX_CANDIDATES", 20)
+    assert [rerank.candidate_count(limit) for limit in (3, 5, 7, 30)] == [9, 15, 20, 30]
+    monkeypatch.setattr(rerank, "RERANK_ENABLED", False)
+    assert rerank.candidate_count(5) == 5
+
+
+def test_terms_are_prefix_stemmed():
+    assert rerank.terms("Úřední HODINY, studijního") == ["úředn", "hodin", "studi"]
+
+
+def test_lexical_rerank_promotes_the_matching_hit():
+    ranked = rerank.rerank("úřední hodiny studijního oddělení", HITS, 2, rerank.LexicalScorer())
+    assert [hit["id"] for hit in ranked] == ["dean", "menza"]
+    assert ranked[0]["rerank_score"] > 0 and ranked[1]["rerank_score"] == 0
+    # Hits without any match keep their search order.
+    assert [hit["id"] for hit in rerank.rerank("parkování", HITS, 3, rerank.LexicalScorer())] == ["menza", "dean", "bank"]
+
+
+def test_rerank_hits_reports_and_trims(monkeypatch):
+    monkeypatch.setattr(rerank, "_scorer", rerank.LexicalScorer())
+    ranked, info = asyncio.run(rerank.rerank_hits("číslo účtu", HITS, 1, timeout_s=5))
+    assert [hit["id"] for hit in ranked] == ["bank"]
+    assert info["reranked"] and info["candidates"] == 3 and info["scorer"] == "lexical"
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+import search_cache
+from search_cache import SearchCache
+
+
+HITS = [{"id": "a", "title": "Hodiny", "content": "Po–Pá 9–11"}]
+
+
+@pytest.fixture(autouse=True)
+def marker_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(search_cache, "SEARCH_CACHE_MARKER_DIR", tmp_path)
+
+
+def test_exact_hit_ignores_case_and_punctuation():
+    cache = SearchCache()
+    cache.put("Úřední hodiny?", ["seed"], "hybrid", 3, HITS, latency_s=0.2)
+
+    assert cache.get("úřední   HODINY", ["seed"], "hybrid", 3) == HITS
+    assert cache.get("úřední hodiny", ["seed"], "hybrid", 5) is None
+    assert cache.get("úřední hodiny", ["seed", "user_x"], "hybrid", 3) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert stats["latency_saved_s"] == 0.2
+
+
+def test_near_hit_picks_the_most_similar_vector():
+    cache = SearchCache(near_threshold=0.95)
+    cache.put("a", ["seed"], "hybrid", 3, [{"id": "x"}], 0.1, vector=[1.0, 0.0, 0.0])
+    cache.put("b", ["seed"], "hybrid", 3, [{"id": "y"}], 0.1, vector=[0.96, 0.28, 0.0])
+    cache.put("c", ["seed"], "semantic", 3, [{"id": "z"}], 0.1, vector=[2.0, 0.0, 0.0])
+
+    assert cache.get("d", ["seed"], "hybrid", 3, vector=[3.0, 0.05, 0.0]) == [{"id": "x"}]
+    assert cache.get("e", ["seed"], "hybrid", 3, vector=[0.0, 1.0, 0.0]) is None
+    # Entries stored for another dimension are skipped, not compared.
+    assert cache.get("f", ["seed"], "hybrid", 3, vector=[1.0, 0.0]) is None
+    assert cache.stats()["near_hits"] == 1
+
+
+def test_marker_bump_invalidates_entries():
+    cache = SearchCache()
+    cache.put("q", ["seed"], "hybrid", 3, HITS, 0.1, vector=[1.0, 0.0])
+    search_cache.bump_generation("seed")
+
+    assert cache.get("q", ["seed"], "hybrid", 3) is None
+    assert cache.get("r", ["seed"], "hybrid", 3, vector=[1.0, 0.0]) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_generations_passed_by_caller_are_used():
+    cache = SearchCache()
+    cache.put("q", ["seed"], "hybrid", 3, HITS, 0.1, generations={"seed": 7})
+
+    assert cache.get("q", ["seed"], "hybrid", 3, generations={"seed": 7}) == HITS
+    assert cache.get("q", ["seed"], "hybrid", 3, generations={"seed": 8}) is None
+
+
+def test_ttl_and_lru_eviction(monkeypatch):
+    cache = SearchCache(max_entries=2, ttl_s=10)
+    cache.put("one", ["seed"], "hybrid", 3, HITS, 0.1)
+    cache.put("two", ["seed"], "hybrid", 3, HITS, 0.1)
+    cache.get("one", ["seed"], "hybrid", 3)
+    cache.put("three", ["seed"], "hybrid", 3, HITS, 0.1)
+
+    assert cache.get("two", ["seed"], "hybrid", 3) is None
+    assert cache.get("one", ["seed"], "hybrid", 3) == HITS
+
+    later = time.monotonic() + 11
+    monkeypatch.setattr(search_cache.time, "monotonic", lambda: later)
+    assert cache.get("one", ["seed"], "hybrid", 3) is None
@@ -0,0 +1,63 @@
+import snippets
+
+
+OFFICE = "\n".join(
+    [
+        "Děkanát FPBT",
+        "Kontakty",
+        "Úřední hodiny",
+        "Pondělí 9–11",
+        "Úterý 13–15",
+        "Středa zavřeno",
+        "Čtvrtek 9–11",
+        "Pátek zavřeno",
+        "Sobota zavřeno",
+        "Parkování",
+        "Za budovou A.",
+    ]
+)
+
+
+def test_split_units_keeps_abbreviations_and_dates_whole():
+    units = snippets.split_units("Vedoucí je prof. Novák. Kancelář je v přízemí.\n\nTermín 05. 01. 2026 platí.")
+    assert units == ["Vedoucí je prof. Novák.", "Kancelář je v přízemí.", "Termín 05. 01. 2026 platí."]
+
+
+def test_extract_takes_the_heading_and_the_lines_after_it():
+    snippet = snippets.extract("úřední hodiny", OFFICE, 200)
+    lines = snippet.splitlines()
+    assert lines[0] == snippets.GAP and lines[-1] == snippets.GAP
+    assert lines[1:4] == ["Úřední hodiny", "Pondělí 9–11", "Úterý 13–15"]
+    assert len(lines[1:-1]) == 1 + snippets.SNIPPET_FOLLOW_UNITS
+    assert len(snippet) <= 200
+
+
+def test_extract_respects_tight_budgets_and_falls_back_to_the_lead():
+    for budget in (10, 25, 40, 80):
+        assert len(snippets.extract("úřední hodiny", OFFICE, budget)) <= budget
+    assert snippets.extract("parkování", OFFICE, 40) == f"{snippets.GAP}\nParkování\nZa budovou A."
+    assert snippets.extract("menza", OFFICE, 200).startswith("Děkanát FPBT")
+    assert snippets.extract("menza", OFFICE, 0) == ""
+
+
+def test_select_snippets_shares_the_budget_across_hits():
+    hits = [
+        {"title": "a", "content": OFFICE * 5},
+        {"title": "b", "content": "Platby\nČíslo účtu: 123/0100\n" + "Další text. " * 100},
+        {"title": "c", "content": "Menza " * 300},
+    ]
+    selected, info = snippets.select_snippets("úřední hodiny číslo účtu", hits, 1000)
+
+    assert info["chars_out"] == sum(len(hit["content"]) for hit in selected) <= 1000
+    assert info["chars_in"] == sum(len(hit["content"]) for hit in hits)
+    assert [hit["title"] for hit in selected] == ["a", "b", "c"] and info["dropped"] == 0
+    assert "Číslo účtu: 123/0100" in selected[1]["content"]
+    # Inputs are not modified.
+    assert hits[0]["content"] == OFFICE * 5
+
+
+def test_select_snippets_drops_trailing_hits_when_out_of_budget():
+    hits = [{"title": str(n), "content": OFFICE} for n in range(4)]
+    selected, info = snippets.select_snippets("úřední hodiny", hits, 200)
+    assert info["chars_out"] <= 200
+    assert info["dropped"] == 4 - len(selected) > 0
@@ -0,0 +1,131 @@
+from pathlib import Path
+
+import pymupdf
+
+import structured_chunker
+import weaviate_utils
+from structured_chunker import StructuredChunker, iter_structured_chunks
+
+
+BODY, H1, H2 = 10.0, 16.0, 13.0
+
+
+def paragraph(number: int) -> tuple[str, float]:
+    return (f"Odstavec {number} popisuje provoz fakulty a jeho pravidla podrobně.", BODY)
+
+
+def document(extra_intro: int = 0, page_break_before_contacts: bool = False) -> list[list[tuple[str, float]]]:
+    intro = [("Úvod", H1), *[paragraph(n) for n in range(3 + extra_intro)]]
+    contacts = [
+        ("Kontakty", H1),
+        ("Tajemnice", H2),
+        ("Ing. Jana Nováková, tel. 220 444 111", BODY),
+        *[paragraph(100 + n) for n in range(4)],
+        ("Studijní oddělení", H2),
+        ("Úřední hodiny Po–Čt 9–11", BODY),
+        *[paragraph(200 + n) for n in range(4)],
+    ]
+    if page_break_before_contacts:
+        return [intro, [], contacts]
+    return [intro, contacts]
+
+
+def chunk(pages, **kwargs) -> list[dict]:
+    chunker = StructuredChunker(Path("/data/fpbt.pdf"), BODY, max_chars=400, min_chars=150, **kwargs)
+    chunks = []
+    for page_index, lines in enumerate(pages, start=1):
+        chunks.extend(chunker.feed(page_index, lines))
+    return chunks + chunker.finish()
+
+
+def ids(chunks: list[dict]) -> dict[str, str]:
+    result = {}
+    for item in chunks:
+        properties = weaviate_utils._document_properties(item)
+        doc_id = weaviate_utils.chunk_uuid("c", item["source"], properties[weaviate_utils.DOC_CHUNK_HASH_FIELD])
+        result[doc_id] = item["title"]
+    return result
+
+
+def test_sections_carry_breadcrumbs_and_page_free_titles():
+    chunks = chunk(document())
+    titles = [item["title"] for item in chunks]
+    assert "fpbt: Tajemnice" in titles and "fpbt: Studijní oddělení" in titles
+    assert all(" p1" not in title and " p2" not in title for title in titles)
+    secretary = next(item for item in chunks if item["title"] == "fpbt: Tajemnice")
+    assert secretary["content"].startswith("# fpbt\n\nKontakty › Tajemnice\n\nIng. Jana Nováková")
+    assert secretary["source"] == "/data/fpbt.pdf#page=2"
+
+
+def test_ids_survive_an_insertion_earlier_in_the_document():
+    before = ids(chunk(document()))
+    after = ids(chunk(document(extra_intro=4, page_break_before_contacts=True)))
+    contacts = {doc_id for doc_id, title in before.items() if "Úvod" not in title}
+    assert contacts and contacts <= set(after)
+    # Only the edited section produced new chunks.
+    assert all("Úvod" in after[doc_id] for doc_id in set(after) - set(before))
+
+
+def test_long_lines_are_wrapped_on_sentence_boundaries_without_loss():
+    sentences = [f"Věta číslo {n} obsahuje několik slov o studiu na fakultě." for n in range(20)]
+    line = " ".join(sentences)
+    chunks = chunk([[("Pravidla", H1), (line, BODY)]])
+
+    assert len(chunks) > 1
+    assert [item["title"] for item in chunks[:3]] == ["fpbt: Pravidla", "fpbt: Pravidla (2)", "fpbt: Pravidla (3)"]
+    bodies = [item["content"].split("\n\n", 2)[2] for item in chunks]
+    assert all(len(body) <= 400 for body in bodies)
+    assert " ".join(" ".join(body.splitlines()) for body in bodies) == line
+    assert all(body.endswith(".") for body in bodies)
+
+
+def test_wrap_falls_back_to_words_and_hard_cuts():
+    assert structured_chunker._wrap(" ".join(["slovo"] * 10), 20) == ["slovo slovo slovo", "slovo slovo slovo", "slovo slovo slovo", "slovo"]
+    assert structured_chunker._wrap("x" * 45, 20) == ["x" * 20, "x" * 20, "x" * 5]
+    assert structured_chunker._wrap("krátký řádek", 20) == ["krátký řádek"]
+
+
+def test_iter_structured_chunks_reads_a_pdf(tmp_path):
+    pdf_path = tmp_path / "guide.pdf"
+    with pymupdf.open() as doc:
+        page = doc.new_page()
+        y = 72
+        # The built-in PDF font has no Czech glyphs; stick to ASCII here.
+        lines = [("Knihovna", H1), *[(f"Odstavec {n} o provozu.", BODY) for n in range(3)], ("Vypujcky", H2)]
+        for text, size in [*lines, ("Odstavec 9 o provozu.", BODY)]:
+            page.insert_text((72, y), text, fontsize=size)
+            y += size * 2
+        doc.save(pdf_path)
+
+    chunks = [item for _, page_chunks in iter_structured_chunks(pdf_path) for item in page_chunks]
+    # Both sections are short, so the subsection is packed into its parent's chunk.
+    assert [item["title"] for item in chunks] == ["guide: Knihovna"]
+    assert chunks[0]["content"].startswith("# guide\n\nKnihovna\n\nOdstavec 0")
+    assert "\nVypujcky\nOdstavec 9" in chunks[0]["content"]
+    assert chunks[0]["source"] == f"{pdf_path}#page=1"
+
+
+def test_a_long_section_is_emitted_while_still_open():
+    # 30 pages without a single heading, as in a scanned-then-OCRed PDF.
+    pages = [[paragraph(page * 10 + n) for n in range(4)] for page in range(30)]
+    chunker = StructuredChunker(Path("/data/fpbt.pdf"), BODY, max_chars=400, min_chars=150)
+    per_page = []
+    for page_index, lines in enumerate(pages, start=1):
+        per_page.append(chunker.feed(page_index, lines))
+        assert chunker._section.size() <= 400 + len(paragraph(0)[0]) + 1
+    tail = chunker.finish()
+    chunks = [item for page_chunks in per_page for item in page_chunks] + tail
+
+    # The first piece is out by page 2; only the last, partial one waits for finish().
+    assert per_page[1] and len(tail) == 1 and len(chunks) > 10
+    assert [item["title"] for item in chunks] == ["fpbt"] + [f"fpbt ({n})" for n in range(2, len(chunks) + 1)]
+    bodies = [item["content"].split("\n\n", 1)[1] for item in chunks]
+    assert "\n".join(bodies).splitlines() == [text for lines in pages for text, _ in lines]
+
+
+def test_pending_siblings_are_emitted_before_a_streamed_section():
+    pages = [[("Úvod", H1), paragraph(0)], [("Pravidla", H1), *[paragraph(n) for n in range(1, 20)]]]
+    chunks = chunk(pages)
+    titles = [item["title"] for item in chunks]
+    assert titles[:3] == ["fpbt: Úvod", "fpbt: Pravidla", "fpbt: Pravidla (2)"]
+    assert titles[-1] == f"fpbt: Pravidla ({len(titles) - 1})"
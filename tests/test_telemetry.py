@@ -0,0 +1,51 @@
+import json
+import threading
+
+import telemetry
+
+
+def test_file_exporter_rotates_and_keeps_backups(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter = telemetry._Exporter("file", path, max_bytes=200, backups=2)
+    for number in range(20):
+        exporter.export({"name": "span", "n": number, "pad": "x" * 40})
+        exporter.flush()
+
+    paths = telemetry.rotated_paths(path)
+    assert [p.name for p in paths] == ["spans.jsonl.2", "spans.jsonl.1", "spans.jsonl"]
+    assert all(p.stat().st_size <= 200 for p in paths)
+    numbers = [json.loads(line)["n"] for p in paths for line in p.read_text(encoding="utf-8").splitlines()]
+    # Oldest spans fall off; what is kept is contiguous and ends with the newest.
+    assert numbers == list(range(numbers[0], 20))
+
+
+def test_rotation_without_backups_starts_over(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter = telemetry._Exporter("file", path, max_bytes=100, backups=0)
+    for number in range(5):
+        exporter.export({"name": "span", "n": number, "pad": "x" * 40})
+        exporter.flush()
+
+    assert telemetry.rotated_paths(path) == [path]
+    assert path.stat().st_size <= 100
+
+
+
+def test_writers_sharing_a_file_rotate_without_losing_spans(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    # One exporter per process in production; here each writes from its own thread.
+    exporters = [telemetry._Exporter("file", path, max_bytes=300, backups=400) for _ in range(4)]
+
+    def write(writer: int) -> None:
+        for number in range(50):
+            exporters[writer].export({"name": "span", "writer": writer, "n": number, "pad": "x" * 40})
+            exporters[writer].flush()
+
+    threads = [threading.Thread(target=write, args=(writer,)) for writer in range(len(exporters))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    spans = [json.loads(line) for p in telemetry.rotated_paths(path) for line in p.read_text(encoding="utf-8").splitlines()]
+    assert sorted((span["writer"], span["n"]) for span in spans) == [(w, n) for w in range(4) for n in range(50)]
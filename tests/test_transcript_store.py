@@ -0,0 +1,70 @@
+import sqlite3
+import time
+
+from transcript_store import TranscriptStore, TranscriptWriter
+
+
+class FlakyStore:
+    """Stands in for TranscriptStore; fails the first ``failures`` appends."""
+
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.attempts: list[float] = []
+        self.items: list[dict] = []
+        self.ended = False
+
+    def append_items(self, session_id: int, items: list[dict]) -> None:
+        self.attempts.append(time.monotonic())
+        if len(self.attempts) <= self.failures:
+            raise sqlite3.OperationalError("database is locked")
+        self.items.extend(items)
+
+    def end_session(self, session_id: int, ended_at: float | None = None) -> None:
+        self.ended = True
+
+
+def test_writer_persists_in_order(tmp_path):
+    store = TranscriptStore(tmp_path / "t.sqlite3", legacy_path=None)
+    session_id = store.start_session("alice", room="r1")
+    writer = TranscriptWriter(store, session_id, flush_interval_s=0.01, flush_max_items=2)
+    for number in range(5):
+        writer.append("user", f"item {number}")
+    writer.close()
+    assert writer.wait(5)
+
+    assert [item["content"] for item in store.session_items(session_id)] == [f"item {n}" for n in range(5)]
+    assert store.last_session("alice")["ended_at"] is not None
+    assert writer.metrics()["written"] == 5
+
+
+def test_failed_flush_backs_off_exponentially():
+    store = FlakyStore(failures=3)
+    writer = TranscriptWriter(store, 1, flush_interval_s=0.02, flush_max_items=1, retry_max_s=0.05)
+    writer.append("user", "hello")
+    deadline = time.monotonic() + 5
+    while not store.items and time.monotonic() < deadline:
+        time.sleep(0.01)
+    writer.close()
+    assert writer.wait(5)
+
+    # A full batch is pending the whole time; without back-off this would spin.
+    gaps = [later - earlier for earlier, later in zip(store.attempts, store.attempts[1:])]
+    assert len(store.attempts) == 4
+    assert gaps[0] >= 0.018 and gaps[1] >= 0.038 and gaps[2] >= 0.048
+    assert store.items == [{"role": "user", "content": "hello", "created_at": None}]
+    assert writer.stats["errors"] == 3 and store.ended
+
+
+def test_pending_items_are_bounded_while_failing():
+    store = FlakyStore(failures=1_000_000)
+    writer = TranscriptWriter(store, 1, flush_interval_s=10, flush_max_items=2, max_pending=4)
+    for number in range(10):
+        writer.append("user", f"item {number}")
+    deadline = time.monotonic() + 5
+    # A batch may be out for a failing flush; it is bounded again once re-queued.
+    while writer.stats["dropped"] < 6 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writer.stats["dropped"] == 6
+    assert writer.depth() <= 4
+    writer.close()
+    assert writer.wait(5)
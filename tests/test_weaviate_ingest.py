@@ -0,0 +1,159 @@
+"""Incremental ingest against an in-memory stand-in for a Weaviate collection."""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from weaviate.collections.classes.filters import _FilterAnd, _FilterValue, _Operator
+
+import weaviate_utils
+
+
+def _matches(obj: dict, where) -> bool:
+    if where is None:
+        return True
+    if isinstance(where, _FilterAnd):
+        return all(_matches(obj, part) for part in where.filters)
+    assert isinstance(where, _FilterValue), where
+    value = obj["uuid"] if where.target == "_id" else obj["properties"].get(where.target)
+    if where.operator == _Operator.EQUAL:
+        return value == where.value
+    if where.operator == _Operator.GREATER_THAN_EQUAL:
+        return value >= where.value
+    if where.operator == _Operator.CONTAINS_ANY:
+        return value in where.value
+    raise AssertionError(f"unsupported filter {where.operator}")
+
+
+class FakeCollection:
+    """The parts of a v4 collection that ``_insert_documents`` uses.
+
+    Like the server, ``fetch_objects`` rejects ``offset + limit`` above
+    ``max_results`` (QUERY_MAXIMUM_RESULTS).
+    """
+
+    def __init__(self, max_results: int = 10_000) -> None:
+        self.objects: dict[str, dict] = {}
+        self.max_results = max_results
+        self.writes: list[str] = []
+        self.query = SimpleNamespace(fetch_objects=self._fetch_objects)
+        self.data = SimpleNamespace(
+            exists=lambda uuid: uuid in self.objects,
+            insert=lambda properties, uuid, vector=None: self._put(uuid, properties),
+            replace=lambda uuid, properties, vector=None: self._put(uuid, properties),
+            update=self._update,
+            delete_many=self._delete_many,
+        )
+        self.batch = SimpleNamespace(fixed_size=self._batch, dynamic=self._batch, failed_objects=[])
+
+    def _put(self, uuid: str, properties: dict) -> str:
+        self.objects[str(uuid)] = {"uuid": str(uuid), "properties": dict(properties)}
+        self.writes.append(str(uuid))
+        return str(uuid)
+
+    def _update(self, uuid: str, properties: dict, vector=None) -> None:
+        self.objects[str(uuid)]["properties"].update(properties)
+
+    @contextmanager
+    def _batch(self, **kwargs):
+        yield SimpleNamespace(add_object=lambda properties, uuid, vector=None: self._put(uuid, properties))
+
+    def _fetch_objects(self, filters=None, limit=None, offset=None, sort=None, return_properties=None):
+        if (offset or 0) + (limit or 0) > self.max_results:
+            raise RuntimeError("query maximum results exceeded")
+        found = [obj for obj in self.objects.values() if _matches(obj, filters)]
+        for order in reversed(sort.sorts if sort is not None else []):
+            found.sort(key=lambda obj: obj["properties"].get(order.prop, ""), reverse=not order.ascending)
+        found = found[offset or 0 :][:limit]
+        return SimpleNamespace(
+            objects=[SimpleNamespace(uuid=obj["uuid"], properties=dict(obj["properties"])) for obj in found]
+        )
+
+    def _delete_many(self, where):
+        doomed = [uuid for uuid, obj in self.objects.items() if _matches(obj, where)]
+        for uuid in doomed:
+            del self.objects[uuid]
+        return SimpleNamespace(successful=len(doomed), matches=len(doomed))
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    fake = FakeCollection()
+    monkeypatch.setattr(weaviate_utils, "_open_collection", lambda client, name: fake)
+    monkeypatch.setattr(weaviate_utils, "WEAVIATE_VECTORIZER", "openai")
+    return fake
+
+
+def chunks(source: str, count: int, changed: set[int] = frozenset()) -> list[dict]:
+    return [
+        {
+            "title": f"guide c{n}",
+            "content": f"Odstavec {n}" + (" (upraveno)" if n in changed else ""),
+            "source": f"{source}#page={n // 3 + 1}",
+        }
+        for n in range(count)
+    ]
+
+
+def ingest(items: list[dict], **kwargs) -> dict:
+    return weaviate_utils._insert_documents(None, items, "docs", incremental=True, **kwargs)
+
+
+def test_ids_are_deterministic():
+    first = weaviate_utils._document_properties(chunks("/d/guide.pdf", 1)[0])
+    doc_id = weaviate_utils.chunk_uuid("docs", "/d/guide.pdf#page=1", first["chunk_hash"])
+    assert doc_id == weaviate_utils.chunk_uuid("docs", "/d/guide.pdf#page=1", first["chunk_hash"])
+    assert doc_id != weaviate_utils.chunk_uuid("other", "/d/guide.pdf#page=1", first["chunk_hash"])
+    assert doc_id != weaviate_utils.chunk_uuid("docs", "/d/other.pdf#page=1", first["chunk_hash"])
+
+
+def test_reingest_skips_unchanged_inserts_changed_and_deletes_vanished(collection):
+    report = ingest(chunks("/d/guide.pdf", 6))
+    assert (report["inserted"], report["skipped"], report["deleted"]) == (6, 0, 0)
+    assert ingest(chunks("/d/guide.pdf", 6))["inserted"] == 0
+
+    collection.writes.clear()
+    report = ingest(chunks("/d/guide.pdf", 5, changed={2}))
+    assert (report["inserted"], report["skipped"], report["deleted"]) == (1, 4, 2)
+    assert len(collection.writes) == 1
+    contents = sorted(obj["properties"]["content"] for obj in collection.objects.values())
+    assert contents == ["Odstavec 0", "Odstavec 1", "Odstavec 2 (upraveno)", "Odstavec 3", "Odstavec 4"]
+
+
+def test_section_moved_to_another_page_updates_only_its_source(collection):
+    ingest(chunks("/d/guide.pdf", 6))
+    moved = chunks("/d/guide.pdf", 6)
+    moved[2]["source"] = "/d/guide.pdf#page=2"
+
+    collection.writes.clear()
+    report = ingest(moved)
+    assert (report["inserted"], report["skipped"], report["updated"], report["deleted"]) == (0, 6, 1, 0)
+    assert collection.writes == []
+    sources = sorted(obj["properties"]["source"] for obj in collection.objects.values())
+    assert sources == sorted(item["source"] for item in moved)
+    assert ingest(moved)["updated"] == 0
+
+
+def test_other_sources_are_left_alone(collection):
+    ingest(chunks("/d/guide.pdf", 3))
+    ingest(chunks("/d/other.pdf", 2))
+    report = ingest(chunks("/d/guide.pdf", 1))
+    assert report["deleted"] == 2
+    assert sum(1 for obj in collection.objects.values() if obj["properties"]["source_base"] == "/d/other.pdf") == 2
+
+
+def test_manifest_pages_past_the_query_maximum(collection, monkeypatch):
+    monkeypatch.setattr(weaviate_utils, "_MANIFEST_PAGE_SIZE", 4)
+    collection.max_results = 10
+    items = chunks("/d/big.pdf", 37)
+    ingest(items)
+
+    manifest = weaviate_utils._source_manifest(collection, "/d/big.pdf")
+    assert len(manifest) == 37
+    assert sorted(manifest.values()) == sorted(
+        (weaviate_utils._document_properties(item)["chunk_hash"], item["source"]) for item in items
+    )
+    report = ingest(items)
+    assert (report["inserted"], report["skipped"], report["deleted"]) == (0, 37, 0)
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+import embeddings
+import local_index
+import search_cache
+import weaviate_utils
+
+
+@pytest.fixture
+def fake_embedder(monkeypatch):
+    embedder = embeddings.CachedEmbedder(embeddings.FakeEmbedder(dims=64), None)
+    monkeypatch.setattr(embeddings, "_embedder", embedder)
+    monkeypatch.setattr(weaviate_utils, "WEAVIATE_VECTORIZER", "client")
+    return embedder
+
+
+@pytest.fixture
+def local_backend(monkeypatch, tmp_path, fake_embedder):
+    monkeypatch.setattr(local_index, "LOCAL_INDEX_DIR", tmp_path)
+    monkeypatch.setattr(weaviate_utils, "WEAVIATE_BACKEND", "local")
+    docs = [
+        {"id": "hours", "title": "fpbt p1", "content": "Úřední hodiny děkanátu: pondělí 9:00–11:30", "source": "fpbt.pdf#page=1"},
+        {"id": "dean", "title": "fcht p1", "content": "Děkan fakulty: prof. Petr Zámostný", "source": "fcht.pdf#page=1"},
+        {"id": "bank", "title": "fpbt p2", "content": "Bankovní spojení ČSOB, číslo účtu 130 197 294", "source": "fpbt.pdf#page=2"},
+    ]
+    vectors = fake_embedder.embed([f"{doc['title']}\n{doc['content']}" for doc in docs])
+    local_index.build_index(docs, fake_embedder.model, vectors).save(local_index.index_path("seed_test"))
+    return "seed_test"
+
+
+def test_attach_vectors_embeds_in_groups(fake_embedder, monkeypatch):
+    calls = []
+    original = fake_embedder.embed
+    monkeypatch.setattr(fake_embedder, "embed", lambda texts: calls.append(len(texts)) or original(texts))
+    prepared = [
+        (f"id-{i}", {weaviate_utils.DOC_TITLE_FIELD: f"t{i}", weaviate_utils.DOC_CONTENT_FIELD: f"c{i}"})
+        for i in range(5)
+    ]
+
+    attached = list(weaviate_utils._attach_vectors(iter(prepared), group_size=2))
+
+    assert calls == [2, 2, 1]
+    assert [doc_id for doc_id, _, _ in attached] == [f"id-{i}" for i in range(5)]
+    for _, properties, vector in attached:
+        assert vector == original([weaviate_utils._embedding_text(properties)])[0]
+
+
+def test_attach_vectors_leaves_vectors_to_weaviate(monkeypatch):
+    monkeypatch.setattr(weaviate_utils, "WEAVIATE_VECTORIZER", "openai")
+    prepared = [("id", {weaviate_utils.DOC_TITLE_FIELD: "t", weaviate_utils.DOC_CONTENT_FIELD: "c"})]
+    assert [vector for _, _, vector in weaviate_utils._attach_vectors(prepared, group_size=8)] == [None]
+
+
+def test_search_request_shapes():
+    vector = [0.1, 0.2]
+    method, kwargs = weaviate_utils._search_request("semantic", "q", 3, vector=vector)
+    assert method == "near_vector"
+    assert kwargs["near_vector"] == vector and kwargs["limit"] == 3
+    method, kwargs = weaviate_utils._search_request("semantic", "q", 3)
+    assert method == "near_text" and kwargs["query"] == "q"
+    method, kwargs = weaviate_utils._search_request("hybrid", "q", 4, alpha=0.5, vector=vector)
+    assert method == "hybrid"
+    assert kwargs["vector"] == vector and kwargs["alpha"] == 0.5 and kwargs["limit"] == 4
+
+
+def test_run_search_near_vector_on_local_backend(local_backend, fake_embedder):
+    vector = fake_embedder.embed_one("fpbt p1\nÚřední hodiny děkanátu: pondělí 9:00–11:30")
+    method, kwargs = weaviate_utils._search_request("semantic", "ignored", 2, vector=vector)
+
+    results = weaviate_utils._run_search(local_backend, method, kwargs)
+
+    assert len(results) == 2
+    assert results[0]["id"] == "hours"
+    assert results[0]["distance"] == pytest.approx(0.0, abs=1e-5)
+    assert all(hit["backend"] == "local" for hit in results)
+
+
+def test_run_search_hybrid_embeds_query_when_no_vector(local_backend, fake_embedder):
+    method, kwargs = weaviate_utils._search_request("hybrid", "číslo účtu", 3, vector=None)
+
+    results = weaviate_utils._run_search(local_backend, method, kwargs)
+
+    assert results[0]["id"] == "bank"
+    assert results[0]["score"] == pytest.approx(1.0)
+
+
+def test_search_semantic_uses_client_vector(local_backend):
+    results = weaviate_utils.search_semantic("Děkan fakulty Zámostný", limit=1, collection_name=local_backend)
+    assert [hit["id"] for hit in results] == ["dean"]
+
+
+def test_run_search_without_local_index_raises(local_backend):
+    method, kwargs = weaviate_utils._search_request("keyword", "hodiny", 2)
+    with pytest.raises(RuntimeError):
+        weaviate_utils._run_search("missing_collection", method, kwargs)
+
+
+@pytest.fixture
+def stub_searches(monkeypatch, tmp_path):
+    """search_txt_async replaced by per-collection delays (seconds) or exceptions."""
+    monkeypatch.setattr(search_cache, "SEARCH_CACHE_MARKER_DIR", tmp_path)
+    monkeypatch.setattr(search_cache, "_cache", search_cache.SearchCache())
+    monkeypatch.setattr(weaviate_utils, "WEAVIATE_SEARCH_MODE", "keyword")
+    behaviour: dict[str, object] = {}
+
+    async def search_txt_async(query, limit=5, collection_name="", vector=None):
+        outcome = behaviour[collection_name]
+        if isinstance(outcome, Exception):
+            raise outcome
+        await asyncio.sleep(outcome)
+        return [{"id": f"{collection_name}-{i}", "score": 1.0 - i / 10} for i in range(limit)]
+
+    monkeypatch.setattr(weaviate_utils, "search_txt_async", search_txt_async)
+    return behaviour
+
+
+def _search(names, deadline_s):
+    return asyncio.run(
+        weaviate_utils.search_across_collections_async("hodiny", 2, names, deadline_s=deadline_s)
+    )
+
+
+def test_async_search_keeps_what_answers_by_the_deadline(stub_searches):
+    stub_searches.update(fast=0.0, slow=5.0, broken=RuntimeError("down"))
+    search = _search(["fast", "slow", "broken"], 0.1)
+    assert [hit["id"] for hit in search["results"]] == ["fast-0", "fast-1"]
+    assert search["missing"] == ["broken", "slow"]
+    assert search["partial"] and not search["cached"]
+    # Partial results are not cached; the next call searches again.
+    assert not _search(["fast", "slow", "broken"], 0.1)["cached"]
+
+
+def test_async_search_caches_complete_results(stub_searches):
+    stub_searches.update(user=0.0, seed=0.01)
+    first = _search(["user", "seed"], 1.0)
+    assert not first["partial"] and first["missing"] == []
+    second = _search(["user", "seed"], 1.0)
+    assert second["cached"] and second["results"] == first["results"]
+
+
+def test_async_search_deadline_covers_the_query_embedding(stub_searches, monkeypatch):
+    stub_searches.update(user=0.0)
+    monkeypatch.setattr(weaviate_utils, "WEAVIATE_SEARCH_MODE", "hybrid")
+    monkeypatch.setattr(weaviate_utils, "query_vector", lambda query: time.sleep(0.5) or [1.0])
+    async def timed():
+        started = time.perf_counter()
+        search = await weaviate_utils.search_across_collections_async("hodiny", 2, ["user"], deadline_s=0.1)
+        return search, time.perf_counter() - started
+
+    # asyncio.run itself still waits for the embedding thread on shutdown; the call does not.
+    search, elapsed = asyncio.run(timed())
+    assert elapsed < 0.4
+    assert search == {"results": [], "missing": ["user"], "partial": True, "cached": False}
+
+
+def test_wait_for_weaviate_stops_at_its_deadline(monkeypatch):
+    def unreachable():
+        raise ConnectionError("weaviate down")
+
+    monkeypatch.setattr(weaviate_utils, "pooled_client", unreachable)
+    started = time.perf_counter()
+    assert not weaviate_utils.wait_for_weaviate(max_wait_s=0.3, interval_s=0.2)
+    assert time.perf_counter() - started < 0.45
+
+
+def test_local_fallback_needs_a_mirrored_index(local_backend, monkeypatch):
+    assert weaviate_utils.has_local_fallback(local_backend)
+    assert not weaviate_utils.has_local_fallback("user_nobody")
+    monkeypatch.setattr(weaviate_utils, "WEAVIATE_LOCAL_FALLBACK", False)
+    assert not weaviate_utils.has_local_fallback(local_backend)